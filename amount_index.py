@@ -0,0 +1,130 @@
+import numpy as np
+
+import records as rc
+
+
+class AmountIndex:
+    """
+    Sorted index of transaction amounts (Quantity * UnitPrice) over a loaded
+    list of transaction dicts or a TransactionTable
+
+    Amount range filters become two binary searches plus a sort of the
+    matching row positions, so a query costs O(log n + k) instead of a
+    pass over every row. With by_region the rows are also sorted by region
+    first, so region + amount queries search just that region's block.
+    min_amount / max_amount are O(1).
+    """
+
+    def __init__(self, amounts, regions=None, by_region=True):
+        self.amounts = np.asarray(amounts, dtype=np.float64)
+        self.order = np.argsort(self.amounts, kind="stable")
+        self.sorted = self.amounts[self.order]
+
+        # Region of each row as a code into region_names
+        self.region_names = []
+        self.region_codes = None
+        self.region_blocks = None
+        if regions is not None:
+            lookup = {}
+            codes = [lookup.setdefault(name, len(lookup)) for name in regions]
+            self.region_names = list(lookup)
+            self.region_codes = np.array(codes, dtype=np.int32)
+
+            if by_region:
+                # Rows sorted by region, then amount (lexsort: last key first)
+                self.region_order = np.lexsort((self.amounts, self.region_codes))
+                self.region_sorted = self.amounts[self.region_order]
+                bounds = np.searchsorted(
+                    self.region_codes[self.region_order],
+                    np.arange(len(self.region_names) + 1)
+                ).tolist()
+                self.region_blocks = {
+                    name: (bounds[code], bounds[code + 1])
+                    for code, name in enumerate(self.region_names)
+                }
+
+    @classmethod
+    def from_transactions(cls, transactions, by_region=True):
+        if getattr(transactions, "columnar", False):
+            return cls(transactions.amount, transactions.column("Region"), by_region)
+        if rc.is_compact(transactions):
+            return cls(
+                list(map(rc.getter(True, "amount"), transactions)),
+                list(map(rc.getter(True, "Region"), transactions)),
+                by_region
+            )
+        return cls(
+            [tx["Quantity"] * tx["UnitPrice"] for tx in transactions],
+            [tx["Region"] for tx in transactions],
+            by_region
+        )
+
+    def __len__(self):
+        return len(self.amounts)
+
+    @property
+    def min_amount(self):
+        return self.sorted[0].item() if len(self.sorted) else None
+
+    @property
+    def max_amount(self):
+        return self.sorted[-1].item() if len(self.sorted) else None
+
+    def _bounds(self, sorted_amounts, min_amount, max_amount):
+        # Inclusive on both ends, like validate_and_filter
+        low = 0 if min_amount is None else np.searchsorted(sorted_amounts, min_amount, side="left")
+        high = len(sorted_amounts) if max_amount is None else np.searchsorted(sorted_amounts, max_amount, side="right")
+        return int(low), max(int(low), int(high))
+
+    def _candidates(self, region):
+        """
+        (row positions, their amounts) sorted by amount for one region or all
+        """
+        if not region:
+            return self.order, self.sorted
+        if self.region_codes is None:
+            raise ValueError("AmountIndex was built without regions")
+        if self.region_blocks is not None:
+            start, stop = self.region_blocks.get(region, (0, 0))
+            return self.region_order[start:stop], self.region_sorted[start:stop]
+
+        # No per-region blocks: narrow the global order with a region mask
+        if region not in self.region_names:
+            return self.order[:0], self.sorted[:0]
+        mask = self.region_codes[self.order] == self.region_names.index(region)
+        return self.order[mask], self.sorted[mask]
+
+    def count(self, min_amount=None, max_amount=None, region=None):
+        """
+        Number of rows in the region (if given) with amount in range
+        """
+        _, sorted_amounts = self._candidates(region)
+        low, high = self._bounds(sorted_amounts, min_amount, max_amount)
+        return high - low
+
+    def select(self, min_amount=None, max_amount=None, region=None):
+        """
+        Row positions (ascending, i.e. in input order) of the rows in the
+        region (if given) with min_amount <= amount <= max_amount
+        """
+        order, sorted_amounts = self._candidates(region)
+        low, high = self._bounds(sorted_amounts, min_amount, max_amount)
+        return np.sort(order[low:high])
+
+    def amount_range(self, region=None):
+        """
+        (min, max) amount of the region (or every row); (None, None) if empty
+        """
+        _, sorted_amounts = self._candidates(region)
+        if not len(sorted_amounts):
+            return None, None
+        return sorted_amounts[0].item(), sorted_amounts[-1].item()
+
+
+def take(transactions, positions):
+    """
+    Selects rows by position from a transaction list or TransactionTable
+    """
+    if getattr(transactions, "columnar", False):
+        return transactions.take(positions)
+    return [transactions[position] for position in positions.tolist()]
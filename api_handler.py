@@ -1,128 +1,453 @@
-import pandas as pd
-
-import requests
-
-
-
-url = "https://dummyjson.com/products"
-headers = {"Authorization": "Bearer YOUR_TOKEN"}
-
-response = requests.get(url, headers=headers)
-
-print(response.json())
-
-response = requests.get('https://dummyjson.com/products')
-data = response.json()
-# data['products'] contains list of all products
-# data['total'] gives total count
-
-print("single product:")
-response = requests.get('https://dummyjson.com/products/1')
-singleproduct = response.json()
-print(singleproduct)
-# Returns single product object
-
-print("Specific number of products:")
-specificresponse = requests.get('https://dummyjson.com/products?limit=100')
-data = specificresponse.json()
-products = data.get('products', [])
-print(specificresponse.json())
-
-
-
-#search products
-response = requests.get('https://dummyjson.com/products/search?q=phone')
-
-searchdata = response.json()
-print("search products:")   
-print(searchdata)  # List of products matching the search query
-
-
-
-#fetch all products
-
-print(" products:")
-specificresponse = requests.get('https://dummyjson.com/products?limit=100')
-data = specificresponse.json()
-products = data.get('products', [])
-print(specificresponse.json())
-
-#Create Product Mapping 
-def create_product_mapping(api_products):
-    
-    product_mapping = {}
-
-    for product in api_products:
-        product_id = product.get("id")
-
-        if product_id is None:
-            continue
-
-        product_mapping[product_id] = {
-            "title": product.get("title"),
-            "category": product.get("category"),
-            "brand": product.get("brand"),
-            "rating": product.get("rating")
-        }
-    print("Product mapping created successfully")
-    print(product_mapping)
-    return product_mapping
-
-#Enrich Sales Data
-# import os
-
-def enrich_sales_data(transactions, product_mapping):
-    import os
-    enriched_transactions = []
-
-    # Ensure output directory exists
-    os.makedirs("data", exist_ok=True)
-    output_path = "data/enriched_sales_data.txt"
-
-    for txn in transactions:
-        enriched_txn = txn.copy()
-
-        try:
-            # Extract numeric product ID (P101 → 101)
-            product_id = txn.get("ProductID", "")
-            numeric_id = int(product_id.replace("P", ""))
-
-            api_data = product_mapping.get(numeric_id)
-
-            if api_data:
-                enriched_txn["API_Category"] = api_data.get("category")
-                enriched_txn["API_Brand"] = api_data.get("brand")
-                enriched_txn["API_Rating"] = api_data.get("rating")
-                enriched_txn["API_Match"] = True
-            else:
-                enriched_txn["API_Category"] = None
-                enriched_txn["API_Brand"] = None
-                enriched_txn["API_Rating"] = None
-                enriched_txn["API_Match"] = False
-
-        except Exception:
-            enriched_txn["API_Category"] = None
-            enriched_txn["API_Brand"] = None
-            enriched_txn["API_Rating"] = None
-            enriched_txn["API_Match"] = False
-
-        enriched_transactions.append(enriched_txn)
-
-    # Write enriched data to file (pipe-delimited)
-    headers = [
-        "TransactionID", "Date", "ProductID", "ProductName",
-        "Quantity", "UnitPrice", "CustomerID", "Region",
-        "API_Category", "API_Brand", "API_Rating", "API_Match"
-    ]
-
-    with open(output_path, "w", encoding="utf-8") as file:
-        file.write("|".join(headers) + "\n")
-        for txn in enriched_transactions:
-            row = [str(txn.get(col, "")) for col in headers]
-            file.write("|".join(row) + "\n")
-
-    return enriched_transactions
- 
-
-
-
+import json
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import logs
+
+log = logs.get_logger(__name__)
+
+BASE_URL = "https://dummyjson.com/products"
+
+# On-disk catalog cache, revalidated with ETag / Last-Modified after CACHE_TTL
+CACHE_FILE = os.path.join("data", "product_catalog_cache.json")
+CACHE_TTL = 3600
+
+PAGE_SIZE = 100
+MAX_PARALLEL = 4
+TIMEOUT = 10
+RETRIES = 3
+BACKOFF = 0.5
+RETRY_STATUSES = (429, 500, 502, 503, 504)
+
+
+class CatalogClient:
+    """
+    Product catalog client
+
+    - one pooled requests.Session per thread (requests.Session is not
+      thread-safe), created on first use
+    - pages fetched concurrently, at most max_parallel at a time
+    - timeouts, and retries with exponential backoff on connection
+      errors and 429 / 5xx responses
+    - on-disk cache: fresh for ttl seconds, then revalidated with
+      If-None-Match / If-Modified-Since so an unchanged catalog costs a
+      single 304 instead of a full download; a stale cache is still
+      returned when the API cannot be reached
+    """
+
+    def __init__(self, base_url=BASE_URL, cache_file=CACHE_FILE, ttl=CACHE_TTL,
+                 page_size=PAGE_SIZE, max_parallel=MAX_PARALLEL, timeout=TIMEOUT,
+                 retries=RETRIES, backoff=BACKOFF):
+        self.base_url = base_url.rstrip("/")
+        self.cache_file = cache_file
+        self.ttl = ttl
+        self.page_size = page_size
+        self.max_parallel = max_parallel
+        self.timeout = timeout
+        self.retries = retries
+        self.backoff = backoff
+        self._local = threading.local()
+        self._sessions = []
+        self._lock = threading.Lock()
+
+    @property
+    def session(self):
+        """
+        The calling thread's requests.Session
+        """
+        session = getattr(self._local, "session", None)
+        if session is None:
+            # requests is only imported once an API call is actually made
+            import requests
+
+            session = self._local.session = requests.Session()
+            with self._lock:
+                self._sessions.append(session)
+        return session
+
+    def close(self):
+        with self._lock:
+            sessions, self._sessions = self._sessions, []
+        for session in sessions:
+            session.close()
+        self._local = threading.local()
+
+    def get(self, path="", params=None, headers=None):
+        """
+        GET base_url + path with timeout and retry / backoff
+        """
+        import requests
+
+        url = self.base_url + path
+        for attempt in range(self.retries + 1):
+            last_attempt = attempt == self.retries
+            try:
+                response = self.session.get(url, params=params, headers=headers, timeout=self.timeout)
+                if response.status_code not in RETRY_STATUSES or last_attempt:
+                    response.raise_for_status()
+                    return response
+            except (requests.ConnectionError, requests.Timeout):
+                if last_attempt:
+                    raise
+            time.sleep(self.backoff * (2 ** attempt))
+
+    def get_json(self, path="", params=None):
+        return self.get(path, params=params).json()
+
+    # ---- Cache ----
+    def _load_cache(self):
+        if not self.cache_file:
+            return None
+        try:
+            with open(self.cache_file, "r", encoding="utf-8") as file:
+                cache = json.load(file)
+        except (FileNotFoundError, ValueError):
+            return None
+        if cache.get("base_url") != self.base_url:
+            return None
+        if "pages" in cache:
+            cache["products"] = [product for page in cache["pages"] for product in page["products"]]
+        return cache
+
+    def _save_cache(self, cache):
+        if not self.cache_file:
+            return
+        directory = os.path.dirname(self.cache_file)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        temp_path = self.cache_file + ".tmp"
+        with open(temp_path, "w", encoding="utf-8") as file:
+            json.dump(cache, file)
+        os.replace(temp_path, self.cache_file)
+
+    # ---- Catalog ----
+    def _fetch_page(self, skip, cached=None):
+        """
+        Returns one page as {"skip", "total", "etag", "last_modified",
+        "products"}; a cached page is revalidated with its own validators
+        and returned as is on 304
+        """
+        headers = {}
+        if cached:
+            if cached.get("etag"):
+                headers["If-None-Match"] = cached["etag"]
+            if cached.get("last_modified"):
+                headers["If-Modified-Since"] = cached["last_modified"]
+
+        response = self.get(params={"limit": self.page_size, "skip": skip}, headers=headers or None)
+        if response.status_code == 304 and cached:
+            return cached
+
+        data = response.json()
+        products = data.get("products", [])
+        return {
+            "skip": skip,
+            "total": data.get("total", len(products)),
+            "etag": response.headers.get("ETag"),
+            "last_modified": response.headers.get("Last-Modified"),
+            "products": products
+        }
+
+    def fetch_all(self):
+        """
+        Returns every product, from cache when possible
+
+        When the catalog cannot be fetched (no network, errors left after
+        the retries) an expired cache is returned as is; without a cache
+        the error is raised.
+        """
+        import requests
+
+        cache = self._load_cache()
+        now = time.time()
+
+        if cache and now - cache.get("fetched_at", 0) < self.ttl:
+            return cache["products"]
+
+        try:
+            return self._download(cache, now)
+        except requests.RequestException as error:
+            if not cache:
+                raise
+            log.warning("Catalog fetch failed; using the stale cache",
+                        extra={"fields": {"error": str(error), "fetched_at": cache.get("fetched_at")}})
+            return cache["products"]
+
+    def _download(self, cache, now):
+        """
+        Revalidates or downloads every page of the catalog and refreshes
+        the cache
+
+        Each page keeps its own ETag / Last-Modified, so a change on any
+        page is fetched even when the others answer 304.
+        """
+        cached_pages = {}
+        if cache and cache.get("page_size") == self.page_size:
+            cached_pages = {page["skip"]: page for page in cache.get("pages", [])}
+
+        # The first page tells us the total
+        first = self._fetch_page(0, cached_pages.get(0))
+        pages = [first]
+
+        skips = range(len(first["products"]), first["total"], self.page_size)
+        if skips and first["products"]:
+            with ThreadPoolExecutor(max_workers=self.max_parallel) as pool:
+                # map keeps page order, so the result is deterministic
+                pages.extend(pool.map(lambda skip: self._fetch_page(skip, cached_pages.get(skip)), skips))
+
+        products = [product for page in pages for product in page["products"]]
+        self._save_cache({
+            "base_url": self.base_url,
+            "fetched_at": now,
+            "page_size": self.page_size,
+            "pages": pages
+        })
+        return products
+
+
+_default_client = None
+
+
+def get_client():
+    global _default_client
+    if _default_client is None:
+        _default_client = CatalogClient()
+    return _default_client
+
+
+#fetch all products
+def fetch_all_products(client=None):
+    """
+    Fetches every product from the API (all pages, cached on disk)
+    """
+    return (client or get_client()).fetch_all()
+
+
+#single product
+def fetch_product(product_id, client=None):
+    # Returns single product object
+    return (client or get_client()).get_json(f"/{product_id}")
+
+
+#search products
+def search_products(query, client=None):
+    # List of products matching the search query
+    return (client or get_client()).get_json("/search", params={"q": query}).get('products', [])
+
+
+#Create Product Mapping 
+def create_product_mapping(api_products):
+    
+    product_mapping = {}
+
+    for product in api_products:
+        product_id = product.get("id")
+
+        if product_id is None:
+            continue
+
+        product_mapping[product_id] = {
+            "title": product.get("title"),
+            "category": product.get("category"),
+            "brand": product.get("brand"),
+            "rating": product.get("rating")
+        }
+    log.info("Product mapping created", extra={"fields": {"products": len(product_mapping)}})
+    return product_mapping
+
+#Enrich Sales Data
+TRANSACTION_FIELDS = (
+    "TransactionID", "Date", "ProductID", "ProductName",
+    "Quantity", "UnitPrice", "CustomerID", "Region"
+)
+API_FIELDS = ("API_Category", "API_Brand", "API_Rating", "API_Match")
+ENRICHED_HEADERS = TRANSACTION_FIELDS + API_FIELDS
+
+# Slot 0 of every catalog holds the values for an unmatched product
+_NO_MATCH = (None, None, None, False)
+
+
+class ProductIndex:
+    """
+    Dense ProductID -> catalog lookup
+
+    Each distinct ProductID is parsed (P101 -> 101) and looked up in the
+    product mapping once; after that a row costs one dict lookup (or one
+    array gather for a TransactionTable). Reuse one index across the
+    batches of a stream so IDs seen in earlier batches are not resolved
+    again.
+    """
+
+    def __init__(self, product_mapping):
+        self.product_mapping = product_mapping
+        self.catalog = [_NO_MATCH]
+        self.slots = {}
+        self._numeric_slots = {}
+
+    def slot(self, product_id):
+        """
+        Catalog slot for a ProductID (0 when it has no catalog entry)
+        """
+        slot = self.slots.get(product_id)
+        if slot is None:
+            slot = self.slots[product_id] = self._resolve(product_id)
+        return slot
+
+    def _resolve(self, product_id):
+        try:
+            numeric_id = int(product_id.replace("P", ""))
+        except (AttributeError, ValueError):
+            return 0
+
+        slot = self._numeric_slots.get(numeric_id)
+        if slot is None:
+            api_data = self.product_mapping.get(numeric_id)
+            if not api_data:
+                slot = 0
+            else:
+                slot = len(self.catalog)
+                self.catalog.append((
+                    api_data.get("category"),
+                    api_data.get("brand"),
+                    api_data.get("rating"),
+                    True
+                ))
+            self._numeric_slots[numeric_id] = slot
+        return slot
+
+    def join(self, transactions):
+        """
+        Joins a batch (list of transaction dicts or a TransactionTable)
+        against the catalog without copying any record
+        """
+        if getattr(transactions, "columnar", False):
+            import numpy as np
+
+            code_slots = np.fromiter(
+                (self.slot(product_id) for product_id in transactions.categories["ProductID"]),
+                dtype=np.int32
+            )
+            if len(code_slots):
+                slots = code_slots[transactions.codes["ProductID"]]
+            else:
+                slots = np.zeros(len(transactions), dtype=np.int32)
+            matched = int(np.count_nonzero(slots))
+        else:
+            slot = self.slot
+            slots = [slot(txn.get("ProductID", "")) for txn in transactions]
+            matched = len(slots) - slots.count(0)
+
+        return EnrichedSales(transactions, slots, self.catalog, matched)
+
+
+class EnrichedSales:
+    """
+    A transaction batch plus its catalog columns
+
+    The transactions are kept as they are; the API_* values are held as one
+    catalog slot per row and only materialised when a row or column is read.
+    """
+
+    def __init__(self, transactions, slots, catalog, matched):
+        self.transactions = transactions
+        self.slots = slots
+        self.catalog = catalog
+        self.matched = matched
+
+    def __len__(self):
+        return len(self.slots)
+
+    @property
+    def match_rate(self):
+        """
+        Percentage of rows with a catalog match
+        """
+        return (self.matched / len(self)) * 100 if len(self) else 0
+
+    def _slot_list(self):
+        slots = self.slots
+        return slots.tolist() if hasattr(slots, "tolist") else slots
+
+    def column(self, field):
+        """
+        Returns the values of a transaction or API_* column as a list
+        """
+        if field in API_FIELDS:
+            position = API_FIELDS.index(field)
+            values = [entry[position] for entry in self.catalog]
+            return [values[slot] for slot in self._slot_list()]
+        if getattr(self.transactions, "columnar", False):
+            return self.transactions.column(field)
+        return [txn.get(field, "") for txn in self.transactions]
+
+    def batches(self, batch_size):
+        """
+        Yields consecutive slices of at most batch_size rows as
+        EnrichedSales sharing this catalog (no rows are copied)
+        """
+        for start in range(0, len(self), batch_size):
+            stop = min(start + batch_size, len(self))
+            if getattr(self.transactions, "columnar", False):
+                transactions = self.transactions.take(slice(start, stop))
+            else:
+                transactions = self.transactions[start:stop]
+            slots = self.slots[start:stop]
+            matched = len(slots) - (slots.tolist() if hasattr(slots, "tolist") else slots).count(0)
+            yield EnrichedSales(transactions, slots, self.catalog, matched)
+
+    def iter_rows(self):
+        """
+        Yields one tuple per row in ENRICHED_HEADERS order
+        """
+        catalog = self.catalog
+        if getattr(self.transactions, "columnar", False):
+            columns = [self.transactions.column(field) for field in TRANSACTION_FIELDS]
+            for values, slot in zip(zip(*columns), self._slot_list()):
+                yield values + catalog[slot]
+        else:
+            for txn, slot in zip(self.transactions, self._slot_list()):
+                yield tuple(txn.get(field, "") for field in TRANSACTION_FIELDS) + catalog[slot]
+
+    def __iter__(self):
+        """
+        Compatibility adapter: yields one enriched dictionary per row
+        """
+        for values in self.iter_rows():
+            yield dict(zip(ENRICHED_HEADERS, values))
+
+    def to_records(self):
+        return list(self)
+
+
+def enrich_sales_data(transactions, product_mapping, index=None):
+    """
+    Joins transactions with the API catalog
+
+    Returns an EnrichedSales (write it with save_enriched_data); pass a
+    ProductIndex to reuse resolved ProductIDs across calls.
+    """
+    if index is None:
+        index = ProductIndex(product_mapping)
+    return index.join(transactions)
+
+
+#Save Enriched Data
+ENRICHED_FILE = os.path.join("data", "enriched_sales_data.txt")
+
+
+def save_enriched_data(enriched, output_path=ENRICHED_FILE, fmt=None, compression=None):
+    """
+    Writes enriched data (an EnrichedSales or an iterable of them, e.g.
+    one per streamed chunk) batch by batch; see output_writer for the
+    formats. Returns the number of rows written.
+    """
+    import output_writer
+
+    if isinstance(enriched, EnrichedSales):
+        enriched = [enriched]
+    with output_writer.EnrichedWriter(output_path, fmt=fmt, compression=compression) as writer:
+        for batch in enriched:
+            writer.write(batch)
+    return writer.rows
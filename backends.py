@@ -0,0 +1,98 @@
+import data_processor as dp
+import file_handler as fh
+import records as rc
+
+# Execution backends: name -> read(filename) -> parsed rows
+# Each backend parses into its own row container; validate_and_filter and
+# aggregate_sales dispatch on that container, so every analysis view
+# (region_wise_sales, top_selling_products, ...) runs on any backend and
+# the ranking and formatting code is shared.
+_backends = {}
+
+
+def register_backend(name, read):
+    """
+    Registers an execution backend
+
+    read(filename) -> parsed rows that file_handler.validate_and_filter
+                      and data_processor.aggregate_sales accept
+    """
+    _backends[name] = read
+
+
+def backends():
+    return tuple(_backends)
+
+
+def _read_python(filename):
+    return fh.parse_transactions(fh.read_sales_data(filename))
+
+
+def _read_numpy(filename):
+    import fast_parser as fp
+    return fp.read_table(filename)[0]
+
+
+def _read_pandas(filename):
+    import pandas_backend
+    return pandas_backend.read_frame(filename)
+
+
+# Pure-Python records (the reference), NumPy TransactionTable, pandas
+# DataFrame with categorical columns
+register_backend("python", _read_python)
+register_backend("numpy", _read_numpy)
+register_backend("pandas", _read_pandas)
+
+
+def read(filename, backend="python"):
+    """
+    Parses a sales file with the named backend (no validation)
+    """
+    if backend not in _backends:
+        raise ValueError(f"Unknown backend '{backend}' (choose from {', '.join(_backends)})")
+    return _backends[backend](filename)
+
+
+def parsed_stats(rows):
+    """
+    Regions and amount range of every parsed row (valid or not), for the
+    rows of any backend; NaN amounts are skipped
+    """
+    if getattr(rows, "columnar", False):
+        regions = rows.categories["Region"]
+        amounts = rows.amount.tolist()
+    elif getattr(rows, "frame", False):
+        regions = rows.df["Region"].unique().tolist()
+        amounts = rows.df["amount"].tolist()
+    else:
+        regions = map(rc.getter(rc.is_compact(rows), "Region"), rows)
+        amounts = map(rc.getter(rc.is_compact(rows), "amount"), rows)
+    amounts = [amount for amount in amounts if amount == amount]
+    return {
+        "regions": sorted({region for region in regions if region}),
+        "min_amount": min(amounts) if amounts else None,
+        "max_amount": max(amounts) if amounts else None
+    }
+
+
+def load(filename, backend="python", region=None, min_amount=None, max_amount=None,
+         date_from=None, date_to=None):
+    """
+    Reads, validates and filters a sales file with the named backend
+    Returns (valid rows, filter summary) as from validate_and_filter
+    """
+    valid, _, summary = fh.validate_and_filter(
+        read(filename, backend), region=region, min_amount=min_amount, max_amount=max_amount,
+        date_from=date_from, date_to=date_to, verbose=False
+    )
+    return valid, summary
+
+
+def analyze(filename, backend="python", **filters):
+    """
+    load() followed by aggregate_sales: the SalesAggregates every view
+    in data_processor accepts
+    """
+    valid, _ = load(filename, backend, **filters)
+    return dp.aggregate_sales(valid)
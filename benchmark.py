@@ -0,0 +1,755 @@
+import argparse
+import json
+import os
+import subprocess
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.abspath(__file__))
+
+# ---------------------------------------------------------------
+# Startup: cold import time of every module
+# ---------------------------------------------------------------
+MODULES = ("file_handler", "data_processor", "api_handler", "backends", "main")
+
+# Must not be imported as a side effect of importing MODULES
+HEAVY_MODULES = ("pandas", "numpy", "requests")
+
+# Seconds allowed for a cold import of a single module
+IMPORT_BUDGET = 0.25
+
+_IMPORT_SCRIPT = """
+import json, sys, time
+start = time.perf_counter()
+import {module}
+elapsed = time.perf_counter() - start
+print(json.dumps({{
+    "seconds": elapsed,
+    "heavy": [name for name in {heavy!r} if name in sys.modules]
+}}))
+"""
+
+
+def bench_import(modules=MODULES, repeat=5):
+    """
+    Times a cold import of each module in a fresh interpreter
+    Returns {module: {"seconds": best time, "heavy": [heavy modules loaded]}}
+    """
+    results = {}
+    for module in modules:
+        script = _IMPORT_SCRIPT.format(module=module, heavy=HEAVY_MODULES)
+        runs = []
+        for _ in range(repeat):
+            output = subprocess.run(
+                [sys.executable, "-c", script],
+                cwd=ROOT,
+                capture_output=True,
+                text=True,
+                check=True
+            ).stdout
+            runs.append(json.loads(output))
+        results[module] = min(runs, key=lambda run: run["seconds"])
+    return results
+
+
+def check_startup(results, budget=IMPORT_BUDGET):
+    """
+    Returns a list of budget violations (empty when everything passed)
+    """
+    failures = []
+    for module, result in results.items():
+        if result["seconds"] > budget:
+            failures.append(f"{module}: import took {result['seconds']:.3f}s (budget {budget:.3f}s)")
+        if result["heavy"]:
+            failures.append(f"{module}: imported {', '.join(result['heavy'])} at import time")
+    return failures
+
+
+def run_startup(args):
+    results = bench_import(repeat=args.repeat)
+    for module, result in results.items():
+        print(f"{module:<16} {result['seconds'] * 1000:8.2f} ms")
+
+    failures = check_startup(results, budget=args.budget)
+    for failure in failures:
+        print(f"FAIL {failure}")
+    return 1 if failures else 0
+
+
+# ---------------------------------------------------------------
+# Column cache: cold text parse vs warm memory-mapped load
+# ---------------------------------------------------------------
+def _best_of(repeat, func):
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+
+def bench_cache(filename, repeat=3):
+    """
+    Returns best-of-repeat seconds for a cold parse and a warm cache load
+    (followed by a full aggregate, so the mapped columns are really read)
+    """
+    import column_cache as cc
+    import data_processor as dp
+
+    cache_dir = cc.default_cache_dir(filename)
+
+    def cold():
+        dp.aggregate_sales(cc.build_table(filename)[0])
+
+    def warm():
+        dp.aggregate_sales(cc.load_table(filename, cache_dir)[0])
+
+    cc.load_table(filename, cache_dir)
+    return {"cold_parse": _best_of(repeat, cold), "warm_mmap": _best_of(repeat, warm)}
+
+
+def run_cache(args):
+    results = bench_cache(args.input, repeat=args.repeat)
+    size_mb = os.path.getsize(args.input) / 1e6
+    for name, seconds in results.items():
+        print(f"{name:<12} {seconds * 1000:10.2f} ms  ({size_mb / seconds:8.1f} MB/s)")
+    print(f"speedup      {results['cold_parse'] / results['warm_mmap']:10.1f}x")
+    return 0
+
+
+# ---------------------------------------------------------------
+# Parse: line-by-line parser vs the block parser, in MB/s
+# ---------------------------------------------------------------
+def bench_parse(filename, repeat=3):
+    """
+    Parses filename into a TransactionTable with the line-by-line parser
+    (iter_sales_lines + parse_rows) and with fast_parser.read_table
+    Returns ({parser: best seconds}, mismatches between the two results)
+    """
+    import fast_parser as fp
+    import file_handler as fh
+    from transaction_table import FIELDS, TransactionTable
+
+    results = {}
+
+    def lines():
+        lines = [line for line in fh.iter_sales_lines(filename)]
+        results["lines"] = (TransactionTable.from_rows(fh.parse_rows(lines)), len(lines))
+
+    def block():
+        table, stats = fp.read_table(filename)
+        results["block"] = (table, stats["lines"])
+
+    seconds = {"lines": _best_of(repeat, lines), "block": _best_of(repeat, block)}
+
+    (expected, expected_lines), (table, table_lines) = results["lines"], results["block"]
+    mismatches = []
+    if table_lines != expected_lines or len(table) != len(expected):
+        mismatches.append(
+            f"rows {len(table)} / {table_lines} lines, expected {len(expected)} / {expected_lines}"
+        )
+    else:
+        for field in FIELDS:
+            if table.column(field) != expected.column(field):
+                mismatches.append(f"column {field} differs")
+    return seconds, mismatches
+
+
+def run_parse(args):
+    seconds, mismatches = bench_parse(args.input, repeat=args.repeat)
+    size_mb = os.path.getsize(args.input) / 1e6
+    for name, elapsed in seconds.items():
+        print(f"{name:<12} {elapsed * 1000:10.2f} ms  ({size_mb / elapsed:8.1f} MB/s)")
+    print(f"speedup      {seconds['lines'] / seconds['block']:10.1f}x")
+
+    for mismatch in mismatches:
+        print(f"MISMATCH {mismatch}")
+    return 1 if mismatches else 0
+
+
+# ---------------------------------------------------------------
+# Logging: quiet vs traced calculate_total_revenue
+# ---------------------------------------------------------------
+def _print_total_revenue(transactions):
+    # The old per-row print loop, kept as the reference point
+    total_revenue = 0.0
+    for tx in transactions:
+        total_revenue += tx["Quantity"] * tx["UnitPrice"]
+        print(f"Transaction ID: {tx['TransactionID']}, Quantity: {tx['Quantity']}, Unit Price: {tx['UnitPrice']}, Subtotal: {tx['Quantity'] * tx['UnitPrice']}")
+        print(f"Accumulated Total Revenue: {total_revenue}")
+    return total_revenue
+
+
+def bench_logging(rows=200000, sample=100, repeat=3):
+    """
+    Returns {mode: best seconds} for calculate_total_revenue over rows
+    transactions: quiet (default), traced with 1-in-sample records kept,
+    fully traced, and the old print-per-row loop; output goes to devnull
+    """
+    import contextlib
+
+    import data_processor as dp
+    import logs
+
+    transactions = [
+        {"TransactionID": f"T{i}", "Quantity": i % 7 + 1, "UnitPrice": 10.0 + i % 50}
+        for i in range(rows)
+    ]
+    results = {}
+    with open(os.devnull, "w") as devnull:
+        results["quiet"] = _best_of(repeat, lambda: dp.calculate_total_revenue(transactions))
+
+        for mode, keep in (("trace_sampled", sample), ("trace_all", 1)):
+            def traced():
+                logs.configure(verbosity=3, sample=keep, stream=devnull)
+                try:
+                    dp.calculate_total_revenue(transactions)
+                finally:
+                    logs.shutdown()
+            results[mode] = _best_of(repeat, traced)
+
+        with contextlib.redirect_stdout(devnull):
+            results["print_per_row"] = _best_of(repeat, lambda: _print_total_revenue(transactions))
+    return results
+
+
+def run_logging(args):
+    results = bench_logging(args.rows, args.sample, args.repeat)
+    for mode, seconds in results.items():
+        print(f"{mode:<14} {seconds * 1000:10.1f} ms  {args.rows / seconds:14,.0f} rows/s")
+    print(f"quiet is {results['print_per_row'] / results['quiet']:.0f}x faster than print per row")
+    return 0
+
+
+# ---------------------------------------------------------------
+# Memory: bytes per parsed transaction (tracemalloc)
+# ---------------------------------------------------------------
+def bench_memory(filename):
+    """
+    Returns {layout: bytes per transaction} still allocated after parsing
+    filename into transaction dicts, records.Transaction rows and a
+    TransactionTable (raw lines excluded)
+    """
+    import gc
+    import tracemalloc
+
+    import file_handler as fh
+    import records as rc
+
+    lines = list(fh.iter_sales_lines(filename))
+    layouts = {
+        "dict": lambda: [dict(zip(rc.FIELDS, row)) for row in fh.parse_rows(lines)],
+        "transaction": lambda: fh.parse_transactions(lines),
+        "table": lambda: fh.parse_transactions(lines, columnar=True),
+    }
+
+    results = {}
+    for name, build in layouts.items():
+        gc.collect()
+        tracemalloc.start()
+        rows = build()
+        gc.collect()
+        allocated = tracemalloc.get_traced_memory()[0]
+        tracemalloc.stop()
+        results[name] = allocated / max(len(rows), 1)
+        del rows
+    return results
+
+
+def run_memory(args):
+    import tempfile
+
+    import generate_sales_data as gen
+
+    with tempfile.TemporaryDirectory() as scratch:
+        filename = args.input
+        if filename is None:
+            filename = os.path.join(scratch, "sales_data.txt")
+            gen.generate(filename, args.rows, seed=args.seed)
+        results = bench_memory(filename)
+
+    for name, per_row in results.items():
+        print(f"{name:<12} {per_row:10.1f} bytes/transaction  {results['dict'] / per_row:8.2f}x vs dict")
+    return 0
+
+
+# ---------------------------------------------------------------
+# Backends: python vs numpy vs pandas, results and crossover
+# ---------------------------------------------------------------
+def _same(a, b):
+    """
+    Exact equality that also holds for NaN == NaN (and keeps key order)
+    """
+    if isinstance(a, float) and isinstance(b, float) and a != a:
+        return b != b
+    if isinstance(a, dict):
+        return isinstance(b, dict) and list(a) == list(b) and all(_same(a[key], b[key]) for key in a)
+    if isinstance(a, (list, tuple)):
+        return (isinstance(b, (list, tuple)) and len(a) == len(b) and
+                all(_same(x, y) for x, y in zip(a, b)))
+    return a == b
+
+
+def _backend_views(filename, backend):
+    """
+    Every backend-dependent view of a file, computed end to end
+    """
+    import backends
+    import data_processor as dp
+
+    valid, summary = backends.load(filename, backend)
+    aggregates = dp.aggregate_sales(valid)
+    return [
+        summary,
+        dp.region_wise_sales(aggregates),
+        dp.top_selling_products(aggregates, top_n=None),
+        dp.customer_purchase_analysis(aggregates),
+        dp.daily_sales_trend(aggregates),
+        dp.find_peak_sales_day(aggregates),
+        dp.low_performing_products(aggregates)
+    ]
+
+
+def bench_backends(filename, repeat=3):
+    """
+    Returns {backend: (best seconds, same results as python)} for reading,
+    validating and aggregating filename and building every view
+    """
+    import backends
+
+    results = {}
+    reference = _backend_views(filename, "python")
+    for backend in backends.backends():
+        views = _backend_views(filename, backend)
+        seconds = _best_of(repeat, lambda: _backend_views(filename, backend))
+        results[backend] = (seconds, _same(reference, views))
+    return results
+
+
+def run_backends(args):
+    import tempfile
+
+    import backends
+    import generate_sales_data as gen
+
+    names = backends.backends()
+    # Imported once up front; the per-size timings are warm
+    imports = bench_import(("pandas_backend",), repeat=1)["pandas_backend"]["seconds"]
+    print(f"pandas_backend import: {imports * 1000:.0f} ms (not included below)")
+    print(f"{'rows':>10} " + " ".join(f"{name:>10}" for name in names))
+
+    failed = False
+    crossover = {}
+    with tempfile.TemporaryDirectory() as scratch:
+        for rows in args.rows:
+            filename = os.path.join(scratch, f"sales_{rows}.txt")
+            gen.generate(filename, rows, seed=args.seed, products=args.products,
+                         customers=args.customers, days=args.days)
+            results = bench_backends(filename, repeat=args.repeat)
+
+            cells = []
+            for name in names:
+                seconds, same = results[name]
+                cells.append(f"{seconds * 1000:8.1f}ms" if same else "  MISMATCH")
+                failed = failed or not same
+                if name != "python" and seconds < results["python"][0]:
+                    crossover.setdefault(name, rows)
+            print(f"{rows:>10} " + " ".join(f"{cell:>10}" for cell in cells))
+            os.remove(filename)
+
+    for name in names[1:]:
+        if name in crossover:
+            print(f"{name} is faster than python from {crossover[name]:,} rows")
+        else:
+            print(f"{name} was not faster than python at any size tried")
+    return 1 if failed else 0
+
+
+# ---------------------------------------------------------------
+# Partitions: flat file scan vs partition pruning
+# ---------------------------------------------------------------
+PARTITION_QUERIES = (
+    ("all", {}),
+    ("region", {"region": "North"}),
+    ("month", {"date_from": "2024-12-01", "date_to": "2024-12-31"}),
+    ("region+month", {"region": "North", "date_from": "2024-12-01", "date_to": "2024-12-31"}),
+)
+
+
+def bench_partitions(filename, root, repeat=3):
+    """
+    Ingests filename into root, then returns {query: result} comparing a
+    flat read + validate_and_filter with the same filters on the
+    partitioned directory: best seconds for both, partitions read and
+    whether the filter summaries match
+    """
+    import file_handler as fh
+    import partitions as pt
+
+    start = time.perf_counter()
+    pt.ingest(filename, root)
+    results = {"ingest_seconds": time.perf_counter() - start}
+
+    dataset = pt.PartitionedSales(root)
+
+    def flat(filters):
+        rows = fh.parse_transactions(fh.read_sales_data(filename))
+        return fh.validate_and_filter(rows, verbose=False, **filters)[2]
+
+    def partitioned(filters):
+        return fh.validate_and_filter(dataset, verbose=False, **filters)[2]
+
+    for name, filters in PARTITION_QUERIES:
+        same = flat(filters) == partitioned(filters)
+        results[name] = {
+            "flat_seconds": _best_of(repeat, lambda: flat(filters)),
+            "partitioned_seconds": _best_of(repeat, lambda: partitioned(filters)),
+            "partitions_read": len(dataset.read_paths),
+            "partitions": len(dataset.partitions),
+            "same": same
+        }
+    return results
+
+
+def run_partitions(args):
+    import tempfile
+
+    import generate_sales_data as gen
+
+    with tempfile.TemporaryDirectory() as scratch:
+        filename = args.input
+        if filename is None:
+            filename = os.path.join(scratch, "sales_data.txt")
+            # A year of data, so December is one month in twelve
+            gen.generate(filename, args.rows, seed=args.seed, days=365, start_date="2024-06-01")
+        results = bench_partitions(filename, os.path.join(scratch, "parts"), repeat=args.repeat)
+
+    print(f"ingest {results.pop('ingest_seconds'):.3f} s")
+    failed = False
+    for name, result in results.items():
+        status = "" if result["same"] else "  MISMATCH"
+        failed = failed or not result["same"]
+        print(f"{name:<14} flat {result['flat_seconds']:8.3f} s  "
+              f"partitioned {result['partitioned_seconds']:8.3f} s  "
+              f"({result['partitions_read']}/{result['partitions']} partitions read){status}")
+    return 1 if failed else 0
+
+
+# ---------------------------------------------------------------
+# Overlap: file work and catalog fetch, sequential vs pipelined
+# ---------------------------------------------------------------
+def bench_overlap(filename, latency=1.0, products=100, repeat=3):
+    """
+    Returns {mode: best seconds} for main.py's work on filename with a
+    fake catalog fetch that sleeps latency seconds: the file steps alone,
+    the fetch alone, both one after the other, and run_pipeline with the
+    two overlapped; console output goes to devnull
+    """
+    import asyncio
+    import contextlib
+    import tempfile
+
+    import main
+
+    catalog = [
+        {"id": number, "title": f"Product {number}", "category": "misc",
+         "brand": "Generic", "rating": 4.0}
+        for number in range(1, products + 1)
+    ]
+
+    def fetch_products():
+        time.sleep(latency)
+        return catalog
+
+    results = {}
+    with tempfile.TemporaryDirectory() as scratch, open(os.devnull, "w") as devnull:
+        args = main.parse_args(["--file", filename, "--output", os.path.join(scratch, "enriched.txt")])
+
+        def sequential():
+            api_products = main.fetch_catalog(fetch_products)
+            result = main.analyze_file(args)
+            main.enrich_and_save(args, result, api_products)
+
+        with contextlib.redirect_stdout(devnull):
+            results["file_only"] = _best_of(repeat, lambda: main.analyze_file(args))
+            results["fetch_only"] = _best_of(repeat, lambda: main.fetch_catalog(fetch_products))
+            results["sequential"] = _best_of(repeat, sequential)
+            results["pipelined"] = _best_of(repeat, lambda: asyncio.run(main.run_pipeline(args, fetch_products)))
+    return results
+
+
+def run_overlap(args):
+    import tempfile
+
+    import generate_sales_data as gen
+
+    with tempfile.TemporaryDirectory() as scratch:
+        filename = args.input
+        if filename is None:
+            filename = os.path.join(scratch, "sales_data.txt")
+            gen.generate(filename, args.rows, seed=args.seed)
+        results = bench_overlap(filename, args.latency, repeat=args.repeat)
+
+    for mode, seconds in results.items():
+        print(f"{mode:<12} {seconds:8.3f} s")
+    # Enrich and save follow both in either mode, so at best the shorter
+    # of the two is hidden entirely
+    possible = min(results["file_only"], results["fetch_only"])
+    saved = results["sequential"] - results["pipelined"]
+    print(f"overlap saved {saved:.3f} s of {possible:.3f} s possible ({saved / possible:.0%})")
+    return 0
+
+
+# ---------------------------------------------------------------
+# Pipeline: per-stage latency, throughput and peak RSS
+# ---------------------------------------------------------------
+def _peak_rss_mb():
+    import resource
+
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is in bytes on macOS and kilobytes elsewhere
+    return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+
+
+def _git_revision():
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            cwd=ROOT, capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def bench_pipeline(filename):
+    """
+    Runs every pipeline stage once on filename and returns a list of
+    {stage, seconds, rows, rows_per_sec, peak_rss_mb}
+    """
+    import contextlib
+    import tempfile
+
+    import api_handler as ah
+    import data_processor as dp
+    import file_handler as fh
+
+    stages = []
+
+    def stage(name, rows, func, *args):
+        start = time.perf_counter()
+        result = func(*args)
+        elapsed = time.perf_counter() - start
+        stages.append({
+            "stage": name,
+            "seconds": elapsed,
+            "rows": rows,
+            "rows_per_sec": rows / elapsed if rows and elapsed else None,
+            "peak_rss_mb": _peak_rss_mb()
+        })
+        return result
+
+    filename = os.path.abspath(filename)
+    with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+        raw_lines = stage("read_sales_data", None, fh.read_sales_data, filename)
+        stages[-1]["rows"] = len(raw_lines)
+        stages[-1]["rows_per_sec"] = len(raw_lines) / stages[-1]["seconds"]
+
+        transactions = stage("parse_transactions", len(raw_lines), fh.parse_transactions, raw_lines)
+        valid, _, _ = stage("validate_and_filter", len(transactions), fh.validate_and_filter, transactions)
+
+        rows = len(valid)
+        stage("calculate_total_revenue", rows, dp.calculate_total_revenue, valid)
+        for func in (
+            dp.region_wise_sales,
+            dp.top_selling_products,
+            dp.customer_purchase_analysis,
+            dp.daily_sales_trend,
+            dp.find_peak_sales_day,
+            dp.find_peak_periods,
+            dp.rolling_revenue,
+            dp.low_performing_products,
+        ):
+            stage(func.__name__, rows, func, valid)
+
+        aggregates = stage("aggregate_sales", rows, dp.aggregate_sales, valid)
+        stage("all_views_from_aggregates", rows, lambda: [
+            dp.region_wise_sales(aggregates),
+            dp.top_selling_products(aggregates),
+            dp.customer_purchase_analysis(aggregates),
+            dp.daily_sales_trend(aggregates),
+            dp.find_peak_sales_day(aggregates),
+            dp.find_peak_periods(aggregates),
+            dp.rolling_revenue(aggregates),
+            dp.low_performing_products(aggregates),
+        ])
+
+        # Offline catalog: every other product ID has a match
+        product_ids = {int(tx["ProductID"][1:]) for tx in valid if tx["ProductID"][1:].isdigit()}
+        mapping = ah.create_product_mapping([
+            {"id": pid, "title": f"Product {pid}", "category": "bench", "brand": "bench", "rating": 4.0}
+            for pid in sorted(product_ids)[::2]
+        ])
+        enriched = stage("enrich_sales_data", rows, ah.enrich_sales_data, valid, mapping)
+        with tempfile.TemporaryDirectory() as scratch:
+            for name, suffix in (("save_enriched_txt", ".txt"), ("save_enriched_gzip", ".txt.gz")):
+                stage(name, rows, ah.save_enriched_data, enriched, os.path.join(scratch, "enriched" + suffix))
+
+    return stages
+
+
+def compare_results(current, baseline, tolerance=0.2):
+    """
+    Returns [(stage, ratio)] for stages more than tolerance slower than baseline
+    """
+    previous = {entry["stage"]: entry["seconds"] for entry in baseline["stages"]}
+    regressions = []
+    for entry in current["stages"]:
+        before = previous.get(entry["stage"])
+        if before and entry["seconds"] > before * (1 + tolerance):
+            regressions.append((entry["stage"], entry["seconds"] / before))
+    return regressions
+
+
+def run_pipeline(args):
+    import tempfile
+
+    import generate_sales_data as gen
+
+    with tempfile.TemporaryDirectory() as scratch:
+        filename = args.input
+        if filename is None:
+            rows = args.rows if args.rows is not None else gen.SIZES[args.size]
+            filename = os.path.join(scratch, "sales_data.txt")
+            gen.generate(
+                filename,
+                rows,
+                dirty_ratio=args.dirty,
+                regions=args.regions,
+                products=args.products,
+                customers=args.customers,
+                days=args.days,
+                seed=args.seed
+            )
+
+        size_mb = os.path.getsize(filename) / 1e6
+        stages = bench_pipeline(filename)
+
+    results = {
+        "meta": {
+            "input": args.input,
+            "file_mb": size_mb,
+            "rows": stages[0]["rows"],
+            "git_revision": _git_revision(),
+            "python": sys.version.split()[0],
+            "platform": sys.platform,
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S")
+        },
+        "stages": stages
+    }
+
+    print(f"{'stage':<28}{'ms':>12}{'rows/s':>14}{'peak RSS MB':>14}")
+    for entry in stages:
+        rate = f"{entry['rows_per_sec']:,.0f}" if entry["rows_per_sec"] else "-"
+        print(f"{entry['stage']:<28}{entry['seconds'] * 1000:12.1f}{rate:>14}{entry['peak_rss_mb']:14.1f}")
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as file:
+            json.dump(results, file, indent=2)
+        print(f"Saved results to {args.output}")
+
+    if args.compare:
+        with open(args.compare, "r", encoding="utf-8") as file:
+            baseline = json.load(file)
+        regressions = compare_results(results, baseline, args.tolerance)
+        for name, ratio in regressions:
+            print(f"REGRESSION {name}: {ratio:.2f}x slower than {args.compare}")
+        return 1 if regressions else 0
+
+    return 0
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Sales analytics benchmarks")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    startup = commands.add_parser("startup", help="cold import time of every module")
+    startup.add_argument("--repeat", type=int, default=5)
+    startup.add_argument("--budget", type=float, default=IMPORT_BUDGET,
+                         help="seconds allowed per module import")
+    startup.set_defaults(run=run_startup)
+
+    cache = commands.add_parser("cache", help="cold parse vs warm column cache load")
+    cache.add_argument("--input", default="sales_data.txt")
+    cache.add_argument("--repeat", type=int, default=3)
+    cache.set_defaults(run=run_cache)
+
+    parse = commands.add_parser("parse", help="line-by-line parser vs block parser throughput")
+    parse.add_argument("--input", default="sales_data.txt")
+    parse.add_argument("--repeat", type=int, default=3)
+    parse.set_defaults(run=run_parse)
+
+    logging_ = commands.add_parser("logging", help="quiet vs traced calculate_total_revenue")
+    logging_.add_argument("--rows", type=int, default=200000)
+    logging_.add_argument("--sample", type=int, default=100,
+                          help="keep one in N trace records for trace_sampled")
+    logging_.add_argument("--repeat", type=int, default=3)
+    logging_.set_defaults(run=run_logging)
+
+    memory = commands.add_parser("memory", help="bytes per parsed transaction by layout")
+    memory_source = memory.add_mutually_exclusive_group()
+    memory_source.add_argument("--input", help="existing sales file (default: generate one)")
+    memory_source.add_argument("--rows", type=int, default=200000)
+    memory.add_argument("--seed", type=int, default=42)
+    memory.set_defaults(run=run_memory)
+
+    backends_ = commands.add_parser("backends", help="python vs numpy vs pandas: same results and crossover size")
+    backends_.add_argument("--rows", type=int, nargs="+", default=[1000, 10000, 100000, 1000000])
+    backends_.add_argument("--products", type=int, default=20)
+    backends_.add_argument("--customers", type=int, default=100)
+    backends_.add_argument("--days", type=int, default=31)
+    backends_.add_argument("--seed", type=int, default=42)
+    backends_.add_argument("--repeat", type=int, default=3)
+    backends_.set_defaults(run=run_backends)
+
+    partitions = commands.add_parser("partitions", help="flat file scan vs partition pruning")
+    partitions_source = partitions.add_mutually_exclusive_group()
+    partitions_source.add_argument("--input", help="existing sales file (default: generate a year of data)")
+    partitions_source.add_argument("--rows", type=int, default=300000)
+    partitions.add_argument("--seed", type=int, default=42)
+    partitions.add_argument("--repeat", type=int, default=3)
+    partitions.set_defaults(run=run_partitions)
+
+    overlap = commands.add_parser("overlap", help="sequential vs overlapped file work and catalog fetch")
+    overlap_source = overlap.add_mutually_exclusive_group()
+    overlap_source.add_argument("--input", help="existing sales file (default: generate one)")
+    overlap_source.add_argument("--rows", type=int, default=200000)
+    overlap.add_argument("--latency", type=float, default=1.0,
+                         help="seconds the fake catalog fetch takes")
+    overlap.add_argument("--seed", type=int, default=42)
+    overlap.add_argument("--repeat", type=int, default=3)
+    overlap.set_defaults(run=run_overlap)
+
+    pipeline = commands.add_parser("pipeline", help="per-stage latency, throughput and peak RSS")
+    source = pipeline.add_mutually_exclusive_group()
+    source.add_argument("--input", help="existing sales file (default: generate one)")
+    source.add_argument("--rows", type=int)
+    source.add_argument("--size", choices=("small", "medium", "large"), default="small")
+    pipeline.add_argument("--dirty", type=float, default=0.1)
+    pipeline.add_argument("--regions", type=int, default=4)
+    pipeline.add_argument("--products", type=int, default=20)
+    pipeline.add_argument("--customers", type=int, default=100)
+    pipeline.add_argument("--days", type=int, default=31)
+    pipeline.add_argument("--seed", type=int, default=42)
+    pipeline.add_argument("--output", help="write JSON results here")
+    pipeline.add_argument("--compare", help="baseline JSON to check for regressions")
+    pipeline.add_argument("--tolerance", type=float, default=0.2,
+                          help="allowed slowdown per stage before flagging (0.2 = 20%%)")
+    pipeline.set_defaults(run=run_pipeline)
+
+    args = parser.parse_args(argv)
+    return args.run(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,108 @@
+import os
+import shutil
+import tempfile
+
+import file_handler as fh
+
+# Bump when the cache contents change shape (independent of the parser)
+CACHE_VERSION = 2
+
+
+def default_cache_dir(filename):
+    return filename + ".colcache"
+
+
+def source_fingerprint(filename):
+    """
+    Size, mtime and sample hash identifying one version of the source file
+    """
+    with open(filename, "rb") as file:
+        stat = os.fstat(file.fileno())
+        return {
+            "size": stat.st_size,
+            "mtime_ns": stat.st_mtime_ns,
+            "sha256": fh.sample_hash(file, stat.st_size)
+        }
+
+
+def _cache_key(filename):
+    return {
+        "cache_version": CACHE_VERSION,
+        "parser_version": fh.PARSER_VERSION,
+        "source": source_fingerprint(filename)
+    }
+
+
+def build_table(filename):
+    """
+    Parses and validates filename into a TransactionTable (no filters)
+    Returns (table, parse_summary): total_input and invalid counts, plus
+    the line_count, regions and amount range of every parsed row (the
+    stats parallel.process_file reports)
+    """
+    import numpy as np
+
+    import fast_parser as fp
+
+    table, stats = fp.read_table(filename)
+    valid, invalid_count, _ = fh.validate_and_filter(table, verbose=False)
+    # NaN amounts (from "nan" prices) never win a Python min() / max()
+    amounts = table.amount[~np.isnan(table.amount)]
+    return valid, {
+        "total_input": len(table),
+        "invalid": invalid_count,
+        "line_count": stats["lines"],
+        "regions": sorted(region for region in table.categories["Region"] if region),
+        "min_amount": float(amounts.min()) if len(amounts) else None,
+        "max_amount": float(amounts.max()) if len(amounts) else None
+    }
+
+
+def load_table(filename, cache_dir=None, mmap=True):
+    """
+    Returns (table, parse_summary) for filename, memory-mapping the binary
+    columnar cache when it matches the file and parser version, and
+    re-parsing (then refreshing the cache) otherwise
+    """
+    from transaction_table import TransactionTable
+
+    if cache_dir is None:
+        cache_dir = default_cache_dir(filename)
+    key = _cache_key(filename)
+
+    if os.path.isdir(cache_dir):
+        try:
+            table, meta = TransactionTable.load(cache_dir, mmap=mmap)
+        except (OSError, ValueError, KeyError):
+            table, meta = None, None
+        if table is not None and meta.get("key") == key:
+            return table, meta["summary"]
+
+    table, summary = build_table(filename)
+
+    # Write next to the final location under a name of its own, so
+    # concurrent runs never write into the same directory, then swap it in
+    parent = os.path.dirname(os.path.abspath(cache_dir))
+    prefix = os.path.basename(cache_dir) + "."
+    os.makedirs(parent, exist_ok=True)
+    temp_dir = tempfile.mkdtemp(prefix=prefix, suffix=".tmp", dir=parent)
+    old_dir = None
+    try:
+        table.save(temp_dir, meta={"key": key, "summary": summary})
+        try:
+            # os.replace cannot overwrite a non-empty directory: move the
+            # previous cache aside first
+            if os.path.exists(cache_dir):
+                old_dir = tempfile.mkdtemp(prefix=prefix, suffix=".old", dir=parent)
+                os.replace(cache_dir, os.path.join(old_dir, "data"))
+            os.replace(temp_dir, cache_dir)
+        except OSError:
+            # Another run swapped its cache in meanwhile; keep that one
+            # (the next load checks it against the file like any other)
+            pass
+    finally:
+        shutil.rmtree(temp_dir, ignore_errors=True)
+        if old_dir is not None:
+            shutil.rmtree(old_dir, ignore_errors=True)
+
+    return table, summary
@@ -0,0 +1,349 @@
+from operator import itemgetter
+
+import data_processor as dp
+import records as rc
+
+# Cube dimensions, in the order used for cell keys
+DIMENSIONS = ("Region", "ProductName", "Date", "CustomerID")
+
+# Rollups behind the aggregate_sales-shaped views (CubeAggregates)
+VIEW_ROLLUPS = (
+    ("Region",),
+    ("ProductName",),
+    ("Date",),
+    ("CustomerID",),
+    ("ProductName", "CustomerID"),
+    ("Date", "CustomerID"),
+)
+
+
+def _canonical(dimensions):
+    for dimension in dimensions:
+        if dimension not in DIMENSIONS:
+            raise ValueError(f"Unknown cube dimension: {dimension}")
+    return tuple(dimension for dimension in DIMENSIONS if dimension in dimensions)
+
+
+def _as_set(value):
+    if value is None:
+        return None
+    if isinstance(value, str):
+        return {value}
+    return set(value)
+
+
+class SalesCube:
+    """
+    Materialized cube of sum(amount), sum(quantity) and count over
+    Region x ProductName x Date x CustomerID
+
+    The base cuboid holds one cell per distinct combination of all four
+    dimensions. Any rollup (group-by over a subset of the dimensions) is
+    computed from the smallest rollup already materialized that contains
+    it and is then kept, so repeated slicing only touches small tables.
+    Cells and rollups keep first-seen order, like aggregate_sales.
+    """
+
+    # Lets data_processor detect a cube
+    cube = True
+
+    def __init__(self):
+        self.base = {}
+        self.cuboids = {DIMENSIONS: self.base}
+
+    @classmethod
+    def from_transactions(cls, transactions):
+        cube = cls()
+        cube.add(transactions)
+        return cube
+
+    def __len__(self):
+        return len(self.base)
+
+    def add(self, transactions):
+        """
+        Folds a batch (list of transaction dicts or a TransactionTable) into
+        the base cuboid; rollups built so far are dropped
+        """
+        if getattr(transactions, "columnar", False):
+            self._add_table(transactions)
+        else:
+            base = self.base
+            compact = rc.is_compact(transactions)
+            measures = rc.getter(compact, "Quantity", "UnitPrice")
+            cell_key = rc.getter(compact, *DIMENSIONS)
+            for tx in transactions:
+                qty, price = measures(tx)
+                key = cell_key(tx)
+                cell = base.get(key)
+                if cell is None:
+                    cell = base[key] = [0.0, 0, 0]
+                cell[0] += qty * price
+                cell[1] += qty
+                cell[2] += 1
+
+        self.cuboids = {DIMENSIONS: self.base}
+        return self
+
+    def _add_table(self, table):
+        import numpy as np
+
+        if not len(table):
+            return
+
+        # Mixed-radix cell id over the four category codes, renumbered
+        # densely whenever the next step could overflow int64
+        keys = np.zeros(len(table), dtype=np.int64)
+        for dimension in DIMENSIONS:
+            width = max(len(table.categories[dimension]), 1)
+            if (int(keys.max()) + 1) * width >= 2 ** 62:
+                keys = np.unique(keys, return_inverse=True)[1].astype(np.int64)
+            keys = keys * width + table.codes[dimension]
+
+        unique, first_index, inverse = np.unique(keys, return_index=True, return_inverse=True)
+        order = np.argsort(first_index, kind="stable")
+        size = len(unique)
+        amounts = np.bincount(inverse, weights=table.amount, minlength=size)[order]
+        quantities = np.bincount(inverse, weights=table.quantity, minlength=size)[order]
+        counts = np.bincount(inverse, minlength=size)[order]
+
+        rows = first_index[order]
+        columns = [
+            [table.categories[dimension][code] for code in table.codes[dimension][rows].tolist()]
+            for dimension in DIMENSIONS
+        ]
+
+        base = self.base
+        for key, amount, qty, count in zip(zip(*columns), amounts.tolist(),
+                                           quantities.tolist(), counts.tolist()):
+            cell = base.get(key)
+            if cell is None:
+                cell = base[key] = [0.0, 0, 0]
+            cell[0] += amount
+            cell[1] += int(qty)
+            cell[2] += count
+
+    def merge(self, other):
+        """
+        Adds another cube's cells into this one (in place)
+        """
+        base = self.base
+        for key, (amount, qty, count) in other.base.items():
+            cell = base.get(key)
+            if cell is None:
+                cell = base[key] = [0.0, 0, 0]
+            cell[0] += amount
+            cell[1] += qty
+            cell[2] += count
+        self.cuboids = {DIMENSIONS: self.base}
+        return self
+
+    def cuboid(self, dimensions):
+        """
+        Returns the rollup over dimensions: {key tuple: [amount, quantity, count]}
+        with key parts in DIMENSIONS order. Treat the result as read-only.
+        """
+        dimensions = _canonical(dimensions)
+        rollup = self.cuboids.get(dimensions)
+        if rollup is not None:
+            return rollup
+
+        source_dims, source = min(
+            ((dims, cells) for dims, cells in self.cuboids.items() if set(dimensions) <= set(dims)),
+            key=lambda item: len(item[1])
+        )
+        rollup = self._roll_up(source_dims, source, dimensions)
+        self.cuboids[dimensions] = rollup
+        return rollup
+
+    def materialize(self, rollups=VIEW_ROLLUPS):
+        """
+        Precomputes rollups (default: the ones behind the views)
+        """
+        for dimensions in sorted(rollups, key=len, reverse=True):
+            self.cuboid(dimensions)
+        return self
+
+    @staticmethod
+    def _roll_up(source_dims, cells, dimensions, predicate=None):
+        positions = [source_dims.index(dimension) for dimension in dimensions]
+        if not positions:
+            project = lambda key: ()
+        elif len(positions) == 1:
+            position = positions[0]
+            project = lambda key: (key[position],)
+        else:
+            project = itemgetter(*positions)
+
+        rollup = {}
+        for key, (amount, qty, count) in cells.items():
+            if predicate is not None and not predicate(key):
+                continue
+            target = project(key)
+            cell = rollup.get(target)
+            if cell is None:
+                cell = rollup[target] = [0.0, 0, 0]
+            cell[0] += amount
+            cell[1] += qty
+            cell[2] += count
+        return rollup
+
+    def _slice(self, dimensions, region=None, product=None, date_from=None, date_to=None,
+               customer=None):
+        filters = {
+            "Region": _as_set(region),
+            "ProductName": _as_set(product),
+            "CustomerID": _as_set(customer),
+        }
+        filtered = [dimension for dimension, values in filters.items() if values is not None]
+        if date_from is not None or date_to is not None:
+            filtered.append("Date")
+
+        if not filtered:
+            return self.cuboid(dimensions)
+
+        source_dims = _canonical(set(dimensions) | set(filtered))
+        source = self.cuboid(source_dims)
+
+        checks = [
+            (source_dims.index(dimension), filters[dimension])
+            for dimension in filtered if dimension != "Date"
+        ]
+        date_position = source_dims.index("Date") if "Date" in filtered else None
+
+        def predicate(key):
+            for position, values in checks:
+                if key[position] not in values:
+                    return False
+            if date_position is not None:
+                date = key[date_position]
+                if date_from is not None and date < date_from:
+                    return False
+                if date_to is not None and date > date_to:
+                    return False
+            return True
+
+        return self._roll_up(source_dims, source, _canonical(dimensions), predicate)
+
+    def query(self, by=(), region=None, product=None, date_from=None, date_to=None,
+              customer=None):
+        """
+        Totals of a slice grouped by the dimensions in by
+
+        region / product / customer take a value or a collection of values;
+        date_from / date_to bound Date inclusively (YYYY-MM-DD strings).
+        Returns {key: (amount, quantity, count)}; keys are single values
+        for one dimension and tuples in by order otherwise.
+        """
+        by = tuple(by)
+        dimensions = _canonical(by)
+        cells = self._slice(dimensions, region, product, date_from, date_to, customer)
+
+        order = [dimensions.index(dimension) for dimension in by]
+        result = {}
+        for key, (amount, qty, count) in cells.items():
+            if len(order) == 1:
+                key = key[0]
+            elif order != sorted(order):
+                key = tuple(key[position] for position in order)
+            result[key] = (amount, qty, count)
+        return result
+
+    def total(self, region=None, product=None, date_from=None, date_to=None, customer=None):
+        """
+        Returns (amount, quantity, count) for a slice
+        """
+        cell = self._slice((), region, product, date_from, date_to, customer).get(())
+        return tuple(cell) if cell else (0.0, 0, 0)
+
+    def aggregates(self, region=None, product=None, date_from=None, date_to=None,
+                   customer=None):
+        """
+        aggregate_sales-shaped view of a slice, accepted by every
+        data_processor analysis function
+        """
+        return CubeAggregates(self, {
+            "region": region,
+            "product": product,
+            "date_from": date_from,
+            "date_to": date_to,
+            "customer": customer,
+        })
+
+
+def _totals(cube, filters, dimension):
+    return cube._slice((dimension,), **filters)
+
+
+def _distinct(cube, filters, dimension, member):
+    """
+    {dimension value: {member value: None}} in first-seen order
+    """
+    distinct = {}
+    position = _canonical((dimension, member)).index(dimension)
+    for key in cube._slice((dimension, member), **filters):
+        distinct.setdefault(key[position], {})[key[1 - position]] = None
+    return distinct
+
+
+def _regions(cube, filters):
+    return {key[0]: [amount, count] for key, (amount, _, count) in _totals(cube, filters, "Region").items()}
+
+
+def _products(cube, filters):
+    return {key[0]: [amount, qty] for key, (amount, qty, _) in _totals(cube, filters, "ProductName").items()}
+
+
+def _customers(cube, filters):
+    products = _distinct(cube, filters, "CustomerID", "ProductName")
+    return {
+        key[0]: [amount, count, products[key[0]]]
+        for key, (amount, _, count) in _totals(cube, filters, "CustomerID").items()
+    }
+
+
+def _daily(cube, filters):
+    customers = _distinct(cube, filters, "Date", "CustomerID")
+    return {
+        key[0]: [amount, count, customers[key[0]]]
+        for key, (amount, _, count) in _totals(cube, filters, "Date").items()
+    }
+
+
+_VIEW_TABLES = {
+    "regions": _regions,
+    "products": _products,
+    "customers": _customers,
+    "daily": _daily,
+}
+
+
+class CubeAggregates(dp.SalesAggregates):
+    """
+    SalesAggregates for a cube slice
+
+    The regions / products / customers / daily tables are rolled up from
+    the cube the first time they are read, so region_wise_sales or
+    daily_sales_trend only pay for their own rollups. Registered metrics
+    are not available (the cube keeps sums only).
+    """
+
+    def __init__(self, cube, filters):
+        amount, _, count = cube.total(**filters)
+        super().__init__(
+            approx_error=None,
+            top_k=None,
+            total_revenue=amount,
+            transaction_count=count,
+            metric_fns={},
+            metrics={}
+        )
+        self.source = cube
+        self.filters = filters
+
+    def __missing__(self, key):
+        build = _VIEW_TABLES.get(key)
+        if build is None:
+            raise KeyError(key)
+        value = self[key] = build(self.source, self.filters)
+        return value
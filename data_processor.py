@@ -1,232 +1,576 @@
-import pandas as pd
-
-# Read file with encoding handling
-df = pd.read_csv(
-    "sales_data.txt",
-    delimiter="|",
-    encoding="latin1",
-    engine="python"
-)
-# Display the first few rows of the DataFrame
-print(df.to_string())
-
-
-#a.Calculate Total Revenue from transactions
-def calculate_total_revenue(transactions):
-   
-    
-    total_revenue = 0.0
-
-    for tx in transactions:
-        total_revenue += tx["Quantity"] * tx["UnitPrice"]
-        print(f"Transaction ID: {tx['TransactionID']}, Quantity: {tx['Quantity']}, Unit Price: {tx['UnitPrice']}, Subtotal: {tx['Quantity'] * tx['UnitPrice']}")
-        print(f"Accumulated Total Revenue: {total_revenue}")
-    return total_revenue
-
-
-#b.Analyzes sales by region
-def region_wise_sales(transactions):  
-       
-    region_data = {}
-    grand_total = 0.0
-
-    # First pass: calculate totals and counts
-    for tx in transactions:
-        region = tx["Region"]
-        amount = tx["Quantity"] * tx["UnitPrice"]
-        grand_total += amount
-
-        if region not in region_data:
-            region_data[region] = {
-                "total_sales": 0.0,
-                "transaction_count": 0
-            }
-
-        region_data[region]["total_sales"] += amount
-        region_data[region]["transaction_count"] += 1
-
-    # Second pass: calculate percentage
-    for region in region_data:
-        percentage = (region_data[region]["total_sales"] / grand_total) * 100
-        region_data[region]["percentage"] = round(percentage, 2)
-
-    # Sort by total_sales (descending)
-    sorted_regions = dict(
-        sorted(
-            region_data.items(),
-            key=lambda item: item[1]["total_sales"],
-            reverse=True
-        )
-    )
-
-    return sorted_regions
-
-#c.Top Selling Products
-def top_selling_products(transactions, top_n=5):
-    
-    product_sales = {}
-
-    for tx in transactions:
-        product = tx["ProductName"]
-        amount = tx["Quantity"] * tx["UnitPrice"]
-
-        if product not in product_sales:
-            product_sales[product] = 0.0
-
-        product_sales[product] += amount
-
-    # Sort products by sales amount (descending)
-    sorted_products = sorted(
-        product_sales.items(),
-        key=lambda item: item[1],
-        reverse=True
-    )
-
-    return sorted_products[:top_n]
-
-#d.Customer Purchase Analysis
-def customer_purchase_analysis(transactions):    
-     
-    customer_data = {}
-
-    # Aggregate data per customer
-    for tx in transactions:
-        cid = tx["CustomerID"]
-        product = tx["ProductName"]
-        amount = tx["Quantity"] * tx["UnitPrice"]
-
-        if cid not in customer_data:
-            customer_data[cid] = {
-                "total_spent": 0.0,
-                "purchase_count": 0,
-                "products_bought": set()
-            }
-
-        customer_data[cid]["total_spent"] += amount
-        customer_data[cid]["purchase_count"] += 1
-        customer_data[cid]["products_bought"].add(product)
-
-    # Calculate averages and format output
-    for cid in customer_data:
-        total = customer_data[cid]["total_spent"]
-        count = customer_data[cid]["purchase_count"]
-
-        customer_data[cid]["avg_order_value"] = round(total / count, 2)
-        customer_data[cid]["products_bought"] = list(
-            customer_data[cid]["products_bought"]
-        )
-
-    # Sort by total_spent (descending)
-    sorted_customers = dict(
-        sorted(
-            customer_data.items(),
-            key=lambda item: item[1]["total_spent"],
-            reverse=True
-        )
-    )
-
-    return sorted_customers
-
-#Daily Sales Trends
-def daily_sales_trend(transactions):
-    """
-    Analyzes sales trends by date
-    """
-    daily_data = {}
-
-    # Aggregate data by date
-    for tx in transactions:
-        date = tx["Date"]
-        amount = tx["Quantity"] * tx["UnitPrice"]
-        customer = tx["CustomerID"]
-
-        if date not in daily_data:
-            daily_data[date] = {
-                "revenue": 0.0,
-                "transaction_count": 0,
-                "unique_customers": set()
-            }
-
-        daily_data[date]["revenue"] += amount
-        daily_data[date]["transaction_count"] += 1
-        daily_data[date]["unique_customers"].add(customer)
-
-    # Convert unique_customers set to count
-    for date in daily_data:
-        daily_data[date]["unique_customers"] = len(
-            daily_data[date]["unique_customers"]
-        )
-
-    # Sort by date (chronological order)
-    sorted_daily = dict(
-        sorted(daily_data.items(), key=lambda item: item[0])
-    )
-
-    return sorted_daily
-
-#Find peak sales day
-def find_peak_sales_day(transactions):
-    
-    daily_revenue = {}
-
-    # Aggregate revenue and transaction count by date
-    for tx in transactions:
-        date = tx["Date"]
-        amount = tx["Quantity"] * tx["UnitPrice"]
-
-        if date not in daily_revenue:
-            daily_revenue[date] = {
-                "revenue": 0.0,
-                "transaction_count": 0
-            }
-
-        daily_revenue[date]["revenue"] += amount
-        daily_revenue[date]["transaction_count"] += 1
-
-    # Find peak sales day
-    peak_date = None
-    peak_revenue = 0.0
-    peak_tx_count = 0
-
-    for date, data in daily_revenue.items():
-        if data["revenue"] > peak_revenue:
-            peak_date = date
-            peak_revenue = data["revenue"]
-            peak_tx_count = data["transaction_count"]
-
-    return peak_date, peak_revenue, peak_tx_count
-
-#Find low performing products
-def low_performing_products(transactions, threshold=10):
-    """
-    Identifies products with low sales
-    """
-    product_data = {}
-
-    # Aggregate quantity and revenue by ProductName
-    for tx in transactions:
-        name = tx["ProductName"]
-        qty = tx["Quantity"]
-        revenue = qty * tx["UnitPrice"]
-
-        if name not in product_data:
-            product_data[name] = {
-                "quantity": 0,
-                "revenue": 0.0
-            }
-
-        product_data[name]["quantity"] += qty
-        product_data[name]["revenue"] += revenue
-
-    # Filter products with total quantity < threshold
-    low_products = [
-        (name, data["quantity"], data["revenue"])
-        for name, data in product_data.items()
-        if data["quantity"] < threshold
-    ]
-
-    # Sort by TotalQuantity (ascending)
-    low_products.sort(key=lambda x: x[1])
-
-    return low_products
-
+import heapq
+from itertools import islice
+
+import instrumentation as ins
+import logs
+import records as rc
+import timeseries as ts
+
+log = logs.get_logger(__name__)
+
+
+#a.Calculate Total Revenue from transactions
+REVENUE_TRACE_COLUMNS = ("transaction_id", "quantity", "unit_price", "subtotal", "total_revenue")
+
+
+@ins.traced()
+def calculate_total_revenue(transactions):
+    """
+    Sum of Quantity * UnitPrice, added row by row
+    Each row is traced when TRACE output is enabled (logs.configure)
+    """
+    tracer = logs.row_tracer(log, "revenue row", REVENUE_TRACE_COLUMNS)
+    if tracer is not None:
+        with tracer:
+            return _traced_total_revenue(transactions, tracer.add)
+    if getattr(transactions, "columnar", False):
+        return transactions.total_amount()
+    if rc.is_compact(transactions):
+        return sum(map(rc.getter(True, "amount"), transactions), 0.0)
+    return sum((tx["Quantity"] * tx["UnitPrice"] for tx in transactions), 0.0)
+
+
+def _traced_total_revenue(transactions, trace):
+    total_revenue = 0.0
+    for tx in transactions:
+        subtotal = tx["Quantity"] * tx["UnitPrice"]
+        total_revenue += subtotal
+        trace(tx["TransactionID"], tx["Quantity"], tx["UnitPrice"], subtotal, total_revenue)
+    return total_revenue
+
+
+#Single-pass aggregation engine
+# Extra metrics registered here are computed in the same pass as the
+# built-in region / product / customer / daily aggregates.
+_registered_metrics = {}
+
+
+def register_metric(name, init, update, finalize=None, merge=None):
+    """
+    Registers an extra metric for aggregate_sales
+
+    init()                    -> initial state
+    update(state, tx, amount) -> updated state
+    finalize(state)           -> final result (optional)
+    merge(state, other)       -> combined state (needed by merge_aggregates)
+    """
+    _registered_metrics[name] = (init, update, finalize, merge)
+
+
+def unregister_metric(name):
+    _registered_metrics.pop(name, None)
+
+
+def registered_metrics():
+    return dict(_registered_metrics)
+
+
+class SalesAggregates(dict):
+    """
+    Result of aggregate_sales. Every analysis function below accepts it in
+    place of a transaction list (or TransactionTable), so the data is only
+    scanned once. A cube.SalesCube is accepted too.
+    """
+
+    def metric(self, name):
+        finalize = self["metric_fns"][name][2]
+        state = self["metrics"][name]
+        return finalize(state) if finalize else state
+
+
+def new_aggregates(approx_error=None, top_k=None):
+    """
+    Creates an empty aggregate_sales result
+
+    Exact by default. Opt-in approximate modes bound memory:
+    - approx_error: distinct products per customer and customers per day
+      are HyperLogLog sketches with this relative error instead of sets
+    - top_k: product totals are kept in a TopK heavy-hitter sketch of
+      this capacity; revenues are overestimated by at most about
+      total revenue / top_k (low_performing_products then needs exact
+      mode)
+    """
+    products = {}
+    if top_k:
+        from sketches import TopK
+        products = TopK(top_k)
+
+    return SalesAggregates(
+        approx_error=approx_error,
+        top_k=top_k,
+        total_revenue=0.0,
+        transaction_count=0,
+        regions={},         # region -> [total_sales, transaction_count]
+        products=products,  # product -> [revenue, quantity]
+        # Distinct products / customers are dicts used as insertion-ordered
+        # sets, so products_bought keeps first-seen order across merges
+        # (HyperLogLog sketches in approximate mode)
+        customers={},       # customer -> [total_spent, purchase_count, products]
+        daily={},           # date -> [revenue, transaction_count, customers]
+        metric_fns=dict(_registered_metrics),
+        metrics={name: fns[0]() for name, fns in _registered_metrics.items()},
+    )
+
+
+@ins.traced()
+def aggregate_sales(transactions, aggregates=None):
+    """
+    Aggregates transactions in a single pass
+    Accepts a list of transaction dicts, a TransactionTable or a
+    pandas_backend.SalesFrame
+    Pass a previous result as aggregates to keep accumulating into it
+    """
+    if aggregates is None:
+        aggregates = new_aggregates()
+    log.debug("Aggregating transactions", extra={"fields": {"rows": len(transactions)}})
+
+    if getattr(transactions, "columnar", False):
+        return _aggregate_table(transactions, aggregates)
+    if getattr(transactions, "frame", False):
+        import pandas_backend
+        return pandas_backend.aggregate_frame(transactions, aggregates)
+
+    regions = aggregates["regions"]
+    products = aggregates["products"]
+    customers = aggregates["customers"]
+    daily = aggregates["daily"]
+    metrics = aggregates["metrics"]
+    extra = [(name, fns[1]) for name, fns in aggregates["metric_fns"].items()]
+
+    approx_error = aggregates["approx_error"]
+    top_k = aggregates["top_k"]
+    if approx_error:
+        from sketches import HyperLogLog
+
+    total_revenue = aggregates["total_revenue"]
+    count = 0
+
+    fields = rc.getter(
+        rc.is_compact(transactions),
+        "Quantity", "UnitPrice", "ProductName", "CustomerID", "Region", "Date"
+    )
+
+    for tx in transactions:
+        qty, price, product, customer, region, date = fields(tx)
+        amount = qty * price
+        total_revenue += amount
+        count += 1
+
+        entry = regions.get(region)
+        if entry is None:
+            entry = regions[region] = [0.0, 0]
+        entry[0] += amount
+        entry[1] += 1
+
+        if top_k:
+            products.add(product, amount, qty)
+        else:
+            entry = products.get(product)
+            if entry is None:
+                entry = products[product] = [0.0, 0]
+            entry[0] += amount
+            entry[1] += qty
+
+        entry = customers.get(customer)
+        if entry is None:
+            entry = customers[customer] = [0.0, 0, HyperLogLog(approx_error) if approx_error else {}]
+        entry[0] += amount
+        entry[1] += 1
+        if approx_error:
+            entry[2].add(product)
+        else:
+            entry[2][product] = None
+
+        entry = daily.get(date)
+        if entry is None:
+            entry = daily[date] = [0.0, 0, HyperLogLog(approx_error) if approx_error else {}]
+        entry[0] += amount
+        entry[1] += 1
+        if approx_error:
+            entry[2].add(customer)
+        else:
+            entry[2][customer] = None
+
+        for name, update in extra:
+            metrics[name] = update(metrics[name], tx, amount)
+
+    aggregates["total_revenue"] = total_revenue
+    aggregates["transaction_count"] += count
+    return aggregates
+
+
+def aggregate_stream(chunks, aggregates=None):
+    """
+    Feeds an iterable of transaction chunks (e.g. from
+    file_handler.stream_transactions) into aggregate_sales
+    """
+    if aggregates is None:
+        aggregates = new_aggregates()
+    for chunk in chunks:
+        aggregate_sales(chunk, aggregates)
+    return aggregates
+
+
+def merge_aggregates(target, other):
+    """
+    Merges a partial aggregate_sales result into target (in place)
+    Merging the same partials in the same order always gives the same sums
+    """
+    approx_error = target["approx_error"]
+    top_k = target["top_k"]
+    if (other["approx_error"], other["top_k"]) != (approx_error, top_k):
+        raise ValueError("Cannot merge aggregates built with different approximation settings")
+
+    target["total_revenue"] += other["total_revenue"]
+    target["transaction_count"] += other["transaction_count"]
+
+    for region, (total, count) in other["regions"].items():
+        entry = target["regions"].setdefault(region, [0.0, 0])
+        entry[0] += total
+        entry[1] += count
+
+    if top_k:
+        target["products"].merge(other["products"])
+    else:
+        for product, (revenue, qty) in other["products"].items():
+            entry = target["products"].setdefault(product, [0.0, 0])
+            entry[0] += revenue
+            entry[1] += qty
+
+    for key in ("customers", "daily"):
+        for name, (total, count, distinct) in other[key].items():
+            entry = target[key].get(name)
+            if entry is None:
+                # Partials are not reused after merging, so take their sets as-is
+                target[key][name] = [total, count, distinct]
+                continue
+            entry[0] += total
+            entry[1] += count
+            if approx_error:
+                entry[2].merge(distinct)
+            else:
+                entry[2].update(distinct)
+
+    for name, state in other["metrics"].items():
+        merge = target["metric_fns"][name][3]
+        if merge is None:
+            raise ValueError(f"Metric '{name}' has no merge function")
+        target["metrics"][name] = merge(target["metrics"][name], state)
+
+    return target
+
+
+def _aggregate_table(table, aggregates):
+    """
+    Vectorized aggregate_sales for a TransactionTable
+    """
+    categories = table.categories
+    amount = table.amount
+
+    approx_error = aggregates["approx_error"]
+    if approx_error:
+        from sketches import HyperLogLog
+
+    def new_distinct():
+        return HyperLogLog(approx_error) if approx_error else {}
+
+    # Region totals
+    regions = aggregates["regions"]
+    names = categories["Region"]
+    codes, sums, counts = table.group_by("Region", amount)
+    for code, total, count in zip(codes.tolist(), sums.tolist(), counts.tolist()):
+        entry = regions.setdefault(names[code], [0.0, 0])
+        entry[0] += total
+        entry[1] += count
+
+    # Product revenue and quantity
+    products = aggregates["products"]
+    names = categories["ProductName"]
+    codes, sums, _ = table.group_by("ProductName", amount)
+    _, quantities, _ = table.group_by("ProductName", table.quantity)
+    for code, total, qty in zip(codes.tolist(), sums.tolist(), quantities.tolist()):
+        if aggregates["top_k"]:
+            products.add(names[code], total, int(qty))
+            continue
+        entry = products.setdefault(names[code], [0.0, 0])
+        entry[0] += total
+        entry[1] += int(qty)
+
+    # Customer spend and distinct products
+    customers = aggregates["customers"]
+    names = categories["CustomerID"]
+    codes, sums, counts = table.group_by("CustomerID", amount)
+    for code, total, count in zip(codes.tolist(), sums.tolist(), counts.tolist()):
+        entry = customers.get(names[code])
+        if entry is None:
+            entry = customers[names[code]] = [0.0, 0, new_distinct()]
+        entry[0] += total
+        entry[1] += count
+    products_bought = categories["ProductName"]
+    for customer, product in table.distinct_pairs("CustomerID", "ProductName"):
+        if approx_error:
+            customers[names[customer]][2].add(products_bought[product])
+        else:
+            customers[names[customer]][2][products_bought[product]] = None
+
+    # Daily revenue and distinct customers
+    daily = aggregates["daily"]
+    dates = categories["Date"]
+    codes, sums, counts = table.group_by("Date", amount)
+    for code, total, count in zip(codes.tolist(), sums.tolist(), counts.tolist()):
+        entry = daily.get(dates[code])
+        if entry is None:
+            entry = daily[dates[code]] = [0.0, 0, new_distinct()]
+        entry[0] += total
+        entry[1] += count
+    for date, customer in table.distinct_pairs("Date", "CustomerID"):
+        if approx_error:
+            daily[dates[date]][2].add(names[customer])
+        else:
+            daily[dates[date]][2][names[customer]] = None
+
+    aggregates["total_revenue"] = table.total_amount(aggregates["total_revenue"])
+    aggregates["transaction_count"] += len(table)
+
+    # Registered metrics still see one dictionary per row
+    metrics = aggregates["metrics"]
+    extra = [(name, fns[1]) for name, fns in aggregates["metric_fns"].items()]
+    if extra:
+        for tx, tx_amount in zip(table.iter_records(), amount.tolist()):
+            for name, update in extra:
+                metrics[name] = update(metrics[name], tx, tx_amount)
+
+    return aggregates
+
+
+def _as_aggregates(transactions):
+    if isinstance(transactions, SalesAggregates):
+        return transactions
+    if getattr(transactions, "cube", False):
+        return transactions.aggregates()
+    return aggregate_sales(transactions)
+
+
+#Ranking helpers
+# Views return at most top_n / bottom_n / limit entries using bounded heaps;
+# every item is only sorted when none of them is given.
+def _iter_ranked(items, key, reverse=True):
+    """
+    Yields items in rank order, one heap pop at a time (ties keep input order)
+    """
+    heap = [
+        (-key(item) if reverse else key(item), position, item)
+        for position, item in enumerate(items)
+    ]
+    heapq.heapify(heap)
+    while heap:
+        yield heapq.heappop(heap)[2]
+
+
+def _pages(items, page_size, build):
+    items = iter(items)
+    while True:
+        page = list(islice(items, page_size))
+        if not page:
+            return
+        yield build(page)
+
+
+def _rank(items, key, build, reverse=True, top_n=None, bottom_n=None, limit=None, page_size=None):
+    """
+    Ranks items by key and passes the selected ones to build
+
+    top_n    -> the top_n highest, highest first
+    bottom_n -> the bottom_n lowest, lowest first
+    limit    -> at most limit items in the view's own order (reverse)
+    With none of them every item is sorted. With page_size a generator of
+    built pages of that size is returned instead; the pages are ranked
+    lazily from a heap, so unread pages cost nothing to order.
+    """
+    if top_n is not None and bottom_n is not None:
+        raise ValueError("top_n and bottom_n cannot be combined")
+
+    count = None
+    if top_n is not None:
+        reverse, count = True, top_n
+    elif bottom_n is not None:
+        reverse, count = False, bottom_n
+    if limit is not None:
+        count = limit if count is None else min(count, limit)
+    if count is not None:
+        count = max(count, 0)
+
+    if page_size is not None:
+        if page_size < 1:
+            raise ValueError("page_size must be at least 1")
+        if count is None:
+            return _pages(_iter_ranked(items, key, reverse), page_size, build)
+        selected = (heapq.nlargest if reverse else heapq.nsmallest)(count, items, key=key)
+        return _pages(selected, page_size, build)
+
+    if count is None:
+        return build(sorted(items, key=key, reverse=reverse))
+    return build((heapq.nlargest if reverse else heapq.nsmallest)(count, items, key=key))
+
+
+def _total(item):
+    return item[1][0]
+
+
+#b.Analyzes sales by region
+@ins.traced()
+def region_wise_sales(transactions, top_n=None, bottom_n=None, limit=None, page_size=None):
+    """
+    Region totals, highest total_sales first
+    """
+    aggregates = _as_aggregates(transactions)
+    grand_total = aggregates["total_revenue"]
+
+    def build(regions):
+        region_data = {}
+        for region, (total_sales, count) in regions:
+            percentage = (total_sales / grand_total) * 100
+            region_data[region] = {
+                "total_sales": total_sales,
+                "transaction_count": count,
+                "percentage": round(percentage, 2)
+            }
+        return region_data
+
+    return _rank(
+        aggregates["regions"].items(), _total, build,
+        top_n=top_n, bottom_n=bottom_n, limit=limit, page_size=page_size
+    )
+
+#c.Top Selling Products
+@ins.traced()
+def top_selling_products(transactions, top_n=5, bottom_n=None, limit=None, page_size=None):
+    """
+    (product, sales) pairs, best sellers first; bottom_n lists the worst
+    sellers first instead, and top_n=None ranks every product
+    """
+    products = _as_aggregates(transactions)["products"]
+    if bottom_n is not None:
+        top_n = None
+
+    return _rank(
+        ((product, data[0]) for product, data in products.items()),
+        lambda item: item[1], list,
+        top_n=top_n, bottom_n=bottom_n, limit=limit, page_size=page_size
+    )
+
+#d.Customer Purchase Analysis
+@ins.traced()
+def customer_purchase_analysis(transactions, top_n=None, bottom_n=None, limit=None, page_size=None):
+    """
+    Per-customer totals, highest total_spent first; only the customers
+    selected are turned into result dictionaries
+    """
+    aggregates = _as_aggregates(transactions)
+
+    # Only an estimated count of products is kept in approximate mode
+    if aggregates["approx_error"]:
+        products_key, products_value = "unique_products", len
+    else:
+        products_key, products_value = "products_bought", list
+
+    def build(customers):
+        customer_data = {}
+        for cid, (total, count, products) in customers:
+            customer_data[cid] = {
+                "total_spent": total,
+                "purchase_count": count,
+                products_key: products_value(products),
+                "avg_order_value": round(total / count, 2)
+            }
+        return customer_data
+
+    return _rank(
+        aggregates["customers"].items(), _total, build,
+        top_n=top_n, bottom_n=bottom_n, limit=limit, page_size=page_size
+    )
+
+#Daily Sales Trends
+@ins.traced()
+def daily_sales_trend(transactions, granularity="day"):
+    """
+    Analyzes sales trends by date (or by hour / week / month bucket)
+
+    Dates are parsed once into day ordinals and ordered chronologically;
+    dates that do not parse are listed after them, as given
+    """
+    series = ts.TimeSeries(_as_aggregates(transactions)["daily"])
+    trend = series.series(granularity)
+    for date, (revenue, count, customers) in sorted(series.unparsed.items()):
+        trend[date] = {
+            "revenue": revenue,
+            "transaction_count": count,
+            "unique_customers": len(customers)
+        }
+    return trend
+
+
+@ins.traced()
+def rolling_revenue(transactions, window=7, granularity="day"):
+    """
+    Revenue of the last window days (or buckets) at every day of the range
+    """
+    return ts.TimeSeries(_as_aggregates(transactions)["daily"]).rolling(window, granularity)
+
+#Find peak sales day
+@ins.traced()
+def find_peak_sales_day(transactions):
+    
+    # Find peak sales day
+    peak_date = None
+    peak_revenue = 0.0
+    peak_tx_count = 0
+
+    for date, (revenue, count, _) in _as_aggregates(transactions)["daily"].items():
+        if revenue > peak_revenue:
+            peak_date = date
+            peak_revenue = revenue
+            peak_tx_count = count
+
+    return peak_date, peak_revenue, peak_tx_count
+
+
+@ins.traced()
+def find_peak_periods(transactions, granularities=("day", "week", "month")):
+    """
+    Peak day, week and month in one pass over the daily totals
+    Returns {granularity: (label, revenue, transaction_count)}
+    """
+    return ts.TimeSeries(_as_aggregates(transactions)["daily"]).peaks(granularities)
+
+#Find low performing products
+@ins.traced()
+def low_performing_products(transactions, threshold=10, top_n=None, bottom_n=None, limit=None, page_size=None):
+    """
+    Identifies products with low sales: (name, quantity, revenue) for every
+    product with total quantity < threshold, lowest quantity first
+
+    top_n picks the top_n lowest performers (like bottom_n here), so a
+    ranked page is always a prefix of the full list
+    """
+    if top_n is not None:
+        if bottom_n is not None:
+            raise ValueError("top_n and bottom_n cannot be combined")
+        top_n, bottom_n = None, top_n
+
+    aggregates = _as_aggregates(transactions)
+    if aggregates["top_k"]:
+        raise ValueError("low_performing_products needs exact product totals (aggregate without top_k)")
+
+    # Filter products with total quantity < threshold
+    low_products = (
+        (name, quantity, revenue)
+        for name, (revenue, quantity) in aggregates["products"].items()
+        if quantity < threshold
+    )
+
+    # Rank by TotalQuantity (ascending)
+    return _rank(
+        low_products, lambda x: x[1], list, reverse=False,
+        top_n=top_n, bottom_n=bottom_n, limit=limit, page_size=page_size
+    )
@@ -0,0 +1,278 @@
+import numpy as np
+
+import file_handler as fh
+from transaction_table import CATEGORICAL_FIELDS, FIELDS, TransactionTable
+
+# Bytes str.strip() removes from an ASCII line
+_WHITESPACE = np.zeros(256, dtype=bool)
+_WHITESPACE[[9, 10, 11, 12, 13, 28, 29, 30, 31, 32]] = True
+
+# Longest numbers converted in bulk: Quantity fits in int64, and a price
+# with at most 15 digits is exact as an integer, so digits / 10**k is
+# the correctly rounded result float() gives
+MAX_QUANTITY_DIGITS = 18
+MAX_PRICE_DIGITS = 15
+MAX_PRICE_WIDTH = 32
+_POWERS_OF_TEN = np.array([float(10 ** k) for k in range(MAX_PRICE_DIGITS + 1)])
+
+# Text fields are copied into arrays as wide as the longest one; rows
+# with a longer field go to parse_rows so one huge field cannot widen
+# every cell of the block
+MAX_STRING_WIDTH = 64
+_STRING_POSITIONS = [FIELDS.index(field) for field in FIELDS if field not in ("Quantity", "UnitPrice")]
+
+_PIPE, _NEWLINE, _RETURN = ord("|"), ord("\n"), ord("\r")
+_COMMA, _DOT, _ZERO, _NINE = ord(","), ord("."), ord("0"), ord("9")
+
+
+def _gather(buf, starts, lengths, width):
+    """
+    Copies variable-length fields into an (n, width) zero-padded byte matrix
+    """
+    width = max(width, 1)
+    # Overlapping width-byte windows over the buffer: one row copy per field
+    padded = np.concatenate((buf, np.zeros(width, dtype=np.uint8)))
+    windows = np.lib.stride_tricks.as_strided(padded, shape=(len(buf) + 1, width), strides=(1, 1))
+    mask = np.arange(width) < lengths[:, None]
+    chars = windows[starts]
+    chars[~mask] = 0
+    return chars, mask
+
+
+def _parse_quantity(buf, starts, lengths):
+    width = min(int(lengths.max()), MAX_QUANTITY_DIGITS + 1)
+    chars, mask = _gather(buf, starts, lengths, width)
+    digits = (chars >= _ZERO) & (chars <= _NINE)
+    ok = (lengths >= 1) & (lengths <= MAX_QUANTITY_DIGITS) & np.all(digits | ~mask, axis=1)
+
+    values = np.zeros(len(starts), dtype=np.int64)
+    numbers = chars.astype(np.int64) - _ZERO
+    for column in range(chars.shape[1]):
+        values = np.where(mask[:, column], values * 10 + numbers[:, column], values)
+    return values, ok
+
+
+def _parse_price(buf, starts, lengths):
+    width = min(int(lengths.max()), MAX_PRICE_WIDTH + 1)
+    chars, mask = _gather(buf, starts, lengths, width)
+    digits = (chars >= _ZERO) & (chars <= _NINE) & mask
+    dots = (chars == _DOT) & mask
+    allowed = digits | dots | (chars == _COMMA) | ~mask
+
+    digit_count = digits.sum(axis=1)
+    ok = (
+        (lengths <= MAX_PRICE_WIDTH) &
+        np.all(allowed, axis=1) &
+        (dots.sum(axis=1) <= 1) &
+        (digit_count >= 1) &
+        (digit_count <= MAX_PRICE_DIGITS)
+    )
+
+    # Commas are thousands separators (dropped); digits after the dot scale
+    integer = np.zeros(len(starts), dtype=np.int64)
+    numbers = chars.astype(np.int64) - _ZERO
+    for column in range(chars.shape[1]):
+        integer = np.where(digits[:, column], integer * 10 + numbers[:, column], integer)
+    decimals = (digits & (np.cumsum(dots, axis=1) > 0)).sum(axis=1)
+    decimals = np.minimum(decimals, MAX_PRICE_DIGITS)
+    return integer / _POWERS_OF_TEN[decimals], ok
+
+
+def _strings(buf, starts, lengths):
+    """
+    Fields as a fixed-width bytes array and as rows of 64-bit words
+    """
+    width = -(-max(int(lengths.max()) if len(lengths) else 0, 1) // 8) * 8
+    chars, _ = _gather(buf, starts, lengths, width)
+    return chars.view(f"S{width}").ravel(), chars.view(np.uint64)
+
+
+def _unique(keys):
+    """
+    Like np.unique(keys, return_index=True, return_inverse=True) but with
+    an unstable sort; the index is still each key's first occurrence
+    """
+    order = np.argsort(keys)
+    ordered = keys[order]
+    new_group = np.empty(len(keys), dtype=bool)
+    new_group[:1] = True
+    np.not_equal(ordered[1:], ordered[:-1], out=new_group[1:])
+    group_starts = np.flatnonzero(new_group)
+
+    inverse = np.empty(len(keys), dtype=np.int64)
+    inverse[order] = np.cumsum(new_group) - 1
+    first_index = np.minimum.reduceat(order, group_starts) if len(keys) else order
+    return first_index, inverse
+
+
+def _factorize(raw_values, words):
+    """
+    Distinct values (first_index, inverse) without sorting strings: the
+    fields' 64-bit words are hashed to one integer, and the result is
+    checked word for word so a hash collision can never merge two values
+    """
+    hashed = words[:, 0].copy()
+    for column in range(1, words.shape[1]):
+        hashed = hashed * np.uint64(0x9E3779B97F4A7C15) + words[:, column]
+    first_index, inverse = _unique(hashed)
+    if not np.array_equal(words, words[first_index[inverse]]):
+        _, first_index, inverse = np.unique(raw_values, return_index=True, return_inverse=True)
+    return first_index, inverse.ravel()
+
+
+def _encode(strings, slow_values, order, clean=None):
+    """
+    Dictionary-encodes the fast rows' byte strings plus the slow rows'
+    strings; returns (codes in row order, categories in first-seen order)
+    """
+    raw_values = strings[0]
+    first_index, inverse = _factorize(*strings)
+    values = raw_values[first_index].astype(str).tolist()
+    if clean:
+        values = [clean(value) for value in values]
+
+    if not slow_values and len(set(values)) == len(values):
+        # Common case: the fast rows are all rows, already in line order
+        first_seen = np.argsort(first_index, kind="stable")
+        renumber = np.empty(len(values), dtype=np.int32)
+        renumber[first_seen] = np.arange(len(values), dtype=np.int32)
+        return renumber[inverse], [values[code] for code in first_seen.tolist()]
+
+    lookup = {}
+    ids = np.array([lookup.setdefault(value, len(lookup)) for value in values], dtype=np.int64)
+    slow_ids = [lookup.setdefault(value, len(lookup)) for value in slow_values]
+    combined = np.concatenate((ids[inverse], np.array(slow_ids, dtype=np.int64)))[order]
+
+    present, first_index = np.unique(combined, return_index=True)
+    first_seen = present[np.argsort(first_index, kind="stable")]
+    renumber = np.zeros(len(lookup), dtype=np.int32)
+    renumber[first_seen] = np.arange(len(first_seen), dtype=np.int32)
+    names = list(lookup)
+    return renumber[combined], [names[code] for code in first_seen.tolist()]
+
+
+def parse_block(block, encodings):
+    """
+    Parses a block of whole lines into a TransactionTable holding exactly
+    the rows parse_rows(iter_sales_lines(...)) gives for those lines
+
+    Clean ASCII lines are split on "|" and newline and converted with array
+    operations. Any line the bulk rules cannot prove equivalent (non-ASCII
+    bytes, whitespace to strip, numbers in an unusual form) or with a text
+    field longer than MAX_STRING_WIDTH is decoded and parsed by
+    parse_rows, and the two sets of rows are merged in line order.
+
+    Returns (table, number of stripped non-empty lines)
+    """
+    buf = np.frombuffer(block, dtype=np.uint8)
+    line_ends = np.flatnonzero(buf == _NEWLINE)
+    if not block.endswith(b"\n"):
+        line_ends = np.append(line_ends, len(buf))
+    starts = np.concatenate(([0], line_ends[:-1] + 1))
+    ends = line_ends - ((line_ends > starts) & (buf[np.maximum(line_ends - 1, 0)] == _RETURN))
+
+    nonempty = ends > starts
+    last = np.maximum(ends - 1, 0)
+    unusual = np.flatnonzero((buf >= 128) | (buf == 0))
+    slow = nonempty & (
+        (np.searchsorted(unusual, ends) > np.searchsorted(unusual, starts)) |
+        _WHITESPACE[buf[np.minimum(starts, len(buf) - 1)]] |
+        _WHITESPACE[buf[last]]
+    )
+
+    # Rows with incorrect number of fields are skipped
+    pipe_positions = np.flatnonzero(buf == _PIPE)
+    first_pipe = np.searchsorted(pipe_positions, starts)
+    pipe_count = np.searchsorted(pipe_positions, ends) - first_pipe
+    candidates = np.flatnonzero(nonempty & ~slow & (pipe_count == 7))
+    fast_lines = int(np.count_nonzero(nonempty & ~slow))
+
+    separators = pipe_positions[first_pipe[candidates][:, None] + np.arange(7)]
+    field_starts = np.column_stack((starts[candidates], separators + 1))
+    field_lengths = np.column_stack((separators, ends[candidates])) - field_starts
+
+    if len(candidates):
+        quantity, quantity_ok = _parse_quantity(buf, field_starts[:, 4], field_lengths[:, 4])
+        price, price_ok = _parse_price(buf, field_starts[:, 5], field_lengths[:, 5])
+        short = np.all(field_lengths[:, _STRING_POSITIONS] <= MAX_STRING_WIDTH, axis=1)
+        fast = quantity_ok & price_ok & short
+    else:
+        quantity = np.zeros(0, dtype=np.int64)
+        price = np.zeros(0, dtype=np.float64)
+        fast = np.zeros(0, dtype=bool)
+
+    # Lines left to the row-by-row parser, in line order
+    retry = np.sort(np.concatenate((np.flatnonzero(slow), candidates[~fast])))
+    slow_rows = []
+    slow_line_numbers = []
+    line_count = fast_lines - int(np.count_nonzero(~fast))
+    for number in retry.tolist():
+        line = fh._decode_line(block[starts[number]:line_ends[number]], encodings).strip()
+        if not line:
+            continue
+        line_count += 1
+        for row in fh.parse_rows([line]):
+            slow_rows.append(row)
+            slow_line_numbers.append(number)
+
+    candidates = candidates[fast]
+    field_starts = field_starts[fast]
+    field_lengths = field_lengths[fast]
+    order = np.argsort(
+        np.concatenate((candidates, np.array(slow_line_numbers, dtype=candidates.dtype))),
+        kind="stable"
+    )
+
+    def strings(position):
+        return _strings(buf, field_starts[:, position], field_lengths[:, position])
+
+    transaction_ids = np.concatenate((
+        strings(0)[0].astype(str),
+        np.array([row[0] for row in slow_rows], dtype=str)
+    ))[order]
+
+    codes = {}
+    categories = {}
+    for field in CATEGORICAL_FIELDS:
+        position = FIELDS.index(field)
+        # Clean ProductName (remove commas) once per distinct value
+        clean = (lambda value: value.replace(",", "")) if field == "ProductName" else None
+        codes[field], categories[field] = _encode(
+            strings(position), [row[position] for row in slow_rows], order, clean
+        )
+
+    table = TransactionTable(
+        transaction_ids,
+        np.concatenate((quantity[fast], np.array([row[4] for row in slow_rows], dtype=np.int64)))[order],
+        np.concatenate((price[fast], np.array([row[5] for row in slow_rows], dtype=np.float64)))[order],
+        codes,
+        categories
+    )
+    return table, line_count
+
+
+def iter_tables(filename, start=None, end=None, encoding=None, block_size=fh.PARSE_BLOCK_SIZE):
+    """
+    Yields (TransactionTable, line count) per block of the file; same
+    start / end semantics as file_handler.iter_line_blocks
+    """
+    encodings = fh._encodings_for(filename, encoding)
+    for block in fh.iter_byte_blocks(filename, start, end, block_size):
+        yield parse_block(block, encodings)
+
+
+def read_table(filename, start=None, end=None, encoding=None, block_size=fh.PARSE_BLOCK_SIZE):
+    """
+    Parses a whole file (or byte range) into one TransactionTable
+
+    Returns (table, stats) where stats counts the stripped non-empty
+    lines, the parsed rows and the lines parse_rows rejected
+    """
+    tables = []
+    lines = 0
+    for table, line_count in iter_tables(filename, start, end, encoding, block_size):
+        tables.append(table)
+        lines += line_count
+
+    table = TransactionTable.concat(tables)
+    return table, {"lines": lines, "rows": len(table), "rejected": lines - len(table)}
@@ -1,204 +1,525 @@
-import pandas as pd
-
-if __name__ == "__main__":
-    print("File handler running")
-
-df = pd.read_csv(
-    "sales_data.txt",
-    delimiter="|",
-    encoding="latin1",
-    engine="python"
-)
-
-# Display the first few rows of the DataFrame
-print(df.to_string())
-
-
-def read_sales_data(df):
-    print("Reading sales data from file...")
-    #Reads sales data from file handling encoding issues
-
-    #Returns: list of raw lines (strings)
-
-    #Expected Output Format:
-    #['T001|2024-12-01|P101|Laptop|2|45000|C001|North', ...]
-
-    #Requirements:
-    #- Use 'with' statement
-    #- Handle different encodings (try 'utf-8', 'latin-1', 'cp1252')
-    #- Handle FileNotFoundError with appropriate error message
-    #- Skip the header row
-    #- Remove empty lines
-   
-
-    encodings = ['utf-8', 'latin-1', 'cp1252']
-    lines = []
-    
-    for encoding in encodings:
-        try:
-            with open(df, 'r', encoding=encoding) as file:
-                # Read lines, skip header, and remove empty lines
-                lines = [line.strip() for i, line in enumerate(file) if i > 0 and line.
-                         strip()]
-                
-                lines = [
-                line.strip()
-                for line in lines[1:]
-                if line.strip()
-            ]
-            return lines
-        except FileNotFoundError:
-            print(f"Error: The file '{df}' was not found.")
-            return []
-        except UnicodeDecodeError:
-            continue
-    print(f"Error: Unable to read the file '{df}' with the specified encodings.")
-    return lines
-
-
-  
-def parse_transactions(raw_lines):
-    """
-    Parses raw lines into clean list of dictionaries
-    """
-    parsed_data = []
-    expected_fields = 8
-
-    for line in raw_lines:
-        parts = line.split("|")
-
-        # Skip rows with incorrect number of fields
-        if len(parts) != expected_fields:
-            continue
-
-        (
-            transaction_id,
-            date,
-            product_id,
-            product_name,
-            quantity,
-            unit_price,
-            customer_id,
-            region
-        ) = parts
-
-        try:
-            # Clean ProductName (remove commas)
-            product_name = product_name.replace(",", "")
-
-            # Clean and convert Quantity
-            quantity = int(quantity)
-
-            # Clean and convert UnitPrice
-            unit_price = float(unit_price.replace(",", ""))
-
-            record = {
-                "TransactionID": transaction_id,
-                "Date": date,
-                "ProductID": product_id,
-                "ProductName": product_name,
-                "Quantity": quantity,
-                "UnitPrice": unit_price,
-                "CustomerID": customer_id,
-                "Region": region
-            }
-
-            parsed_data.append(record)
-
-        except ValueError:
-            # Skip rows with conversion errors
-            continue
-
-    return parsed_data
-  
-def validate_and_filter(transactions, region=None, min_amount=None, max_amount=None):
-    """
-    Validates transactions and applies optional filters
-    """
-    valid_transactions = []
-    invalid_count = 0
-
-    # ---- Validation ----
-    for tx in transactions:
-        try:
-            # Required fields check
-            required_fields = [
-                "TransactionID", "Date", "ProductID",
-                "ProductName", "Quantity", "UnitPrice",
-                "CustomerID", "Region"
-            ]
-
-            if not all(field in tx for field in required_fields):
-                invalid_count += 1
-                continue
-
-            # Business rules
-            if (
-                tx["Quantity"] <= 0 or
-                tx["UnitPrice"] <= 0 or
-                not tx["TransactionID"].startswith("T") or
-                not tx["ProductID"].startswith("P") or
-                not tx["CustomerID"].startswith("C")
-            ):
-                invalid_count += 1
-                continue
-
-            valid_transactions.append(tx)
-
-        except Exception:
-            invalid_count += 1
-
-    # ---- Display available regions ----
-    available_regions = sorted(
-        set(tx["Region"] for tx in valid_transactions if tx.get("Region"))
-    )
-    print("Available regions:", available_regions)
-
-    # ---- Compute transaction amount range ----
-    amounts = [
-        tx["Quantity"] * tx["UnitPrice"]
-        for tx in valid_transactions
-    ]
-
-    if amounts:
-        print(f"Transaction amount range: min={min(amounts)}, max={max(amounts)}")
-
-    total_input = len(transactions)
-    filtered_by_region = 0
-    filtered_by_amount = 0
-
-    filtered_transactions = valid_transactions
-
-    # ---- Region Filter ----
-    if region:
-        before = len(filtered_transactions)
-        filtered_transactions = [
-            tx for tx in filtered_transactions
-            if tx["Region"] == region
-        ]
-        filtered_by_region = before - len(filtered_transactions)
-        print(f"Records after region filter ({region}): {len(filtered_transactions)}")
-
-    # ---- Amount Filters ----
-    if min_amount is not None or max_amount is not None:
-        before = len(filtered_transactions)
-        filtered_transactions = [
-            tx for tx in filtered_transactions
-            if (
-                (min_amount is None or tx["Quantity"] * tx["UnitPrice"] >= min_amount) and
-                (max_amount is None or tx["Quantity"] * tx["UnitPrice"] <= max_amount)
-            )
-        ]
-        filtered_by_amount = before - len(filtered_transactions)
-        print(f"Records after amount filter: {len(filtered_transactions)}")
-
-    # ---- Summary ----
-    filter_summary = {
-        "total_input": total_input,
-        "invalid": invalid_count,
-        "filtered_by_region": filtered_by_region,
-        "filtered_by_amount": filtered_by_amount,
-        "final_count": len(filtered_transactions)
-    }
-
-    return filtered_transactions, invalid_count, filter_summary
+import codecs
+import hashlib
+from itertools import chain, islice
+
+import logs
+import records as rc
+
+log = logs.get_logger(__name__)
+
+ENCODINGS = ['utf-8', 'latin-1', 'cp1252']
+
+# Bytes read from the start of the file to pick an encoding
+SAMPLE_SIZE = 64 * 1024
+
+# Default number of lines per chunk for stream_transactions
+CHUNK_SIZE = 50000
+
+
+def detect_encoding(filename, sample_size=SAMPLE_SIZE):
+    """
+    Returns the first of ENCODINGS that decodes a sample of the file
+    """
+    with open(filename, 'rb') as file:
+        sample = file.read(sample_size)
+
+    for encoding in ENCODINGS:
+        try:
+            # Incremental decoder tolerates a character cut off at the end of the sample
+            codecs.getincrementaldecoder(encoding)().decode(sample, final=False)
+            return encoding
+        except UnicodeDecodeError:
+            continue
+    return None
+
+
+# Bump whenever parse_rows or the validation rules change, so cached
+# parse results (see column_cache) are rebuilt
+PARSER_VERSION = 2
+
+# Quantity is stored as int64 by the columnar backends; larger values are
+# rejected like any other number that does not convert
+MIN_QUANTITY = -2 ** 63
+MAX_QUANTITY = 2 ** 63 - 1
+
+# Bytes hashed at the start of the file and just before an offset
+FINGERPRINT_SIZE = 64 * 1024
+
+
+def sample_hash(file, offset):
+    """
+    SHA-256 of the first FINGERPRINT_SIZE bytes and of the FINGERPRINT_SIZE
+    bytes ending at offset of an open binary file. Detects a rewritten file
+    without reading all of it.
+    """
+    digest = hashlib.sha256()
+    file.seek(0)
+    digest.update(file.read(min(FINGERPRINT_SIZE, offset)))
+    tail_start = max(0, offset - FINGERPRINT_SIZE)
+    file.seek(tail_start)
+    digest.update(file.read(offset - tail_start))
+    return digest.hexdigest()
+
+
+def _decode_line(raw, encodings):
+    for encoding in encodings:
+        try:
+            return raw.decode(encoding)
+        except UnicodeDecodeError:
+            continue
+    raise UnicodeDecodeError(encodings[0], raw, 0, len(raw), "no matching encoding")
+
+
+def _encodings_for(filename, encoding=None):
+    if encoding is None:
+        encoding = detect_encoding(filename) or ENCODINGS[0]
+    return [encoding] + [e for e in ENCODINGS if e != encoding]
+
+
+def iter_sales_lines(filename, encoding=None):
+    """
+    Yields stripped, non-empty data lines one at a time (header skipped)
+    The encoding is detected from a sample; a line that does not decode
+    with it falls back to the other ENCODINGS.
+    """
+    encodings = _encodings_for(filename, encoding)
+
+    with open(filename, 'rb') as file:
+        # Skip the header row
+        next(file, None)
+        for raw in file:
+            line = _decode_line(raw, encodings).strip()
+            if line:
+                yield line
+
+
+def iter_range_lines(filename, start, end, encoding=None):
+    """
+    Yields stripped, non-empty lines between byte offsets start and end
+    Both offsets must sit on line boundaries (see parallel.plan_ranges)
+    """
+    encodings = _encodings_for(filename, encoding)
+
+    with open(filename, 'rb') as file:
+        file.seek(start)
+        position = start
+        for raw in file:
+            if position >= end:
+                break
+            position += len(raw)
+            line = _decode_line(raw, encodings).strip()
+            if line:
+                yield line
+
+
+# Bytes read at a time by iter_line_blocks
+PARSE_BLOCK_SIZE = 8 * 1024 * 1024
+
+
+def _block_lines(block, encodings):
+    try:
+        pieces = block.decode(encodings[0]).split("\n")
+    except UnicodeDecodeError:
+        # Some line needs a fallback encoding: decode this block line by line
+        pieces = [_decode_line(raw, encodings) for raw in block.split(b"\n")]
+    return list(filter(None, map(str.strip, pieces)))
+
+
+def iter_byte_blocks(filename, start=None, end=None, block_size=PARSE_BLOCK_SIZE):
+    """
+    Yields raw blocks of about block_size bytes that end on a line boundary
+    (the last one may lack its newline); the header is skipped unless
+    start / end byte offsets are given
+    """
+    with open(filename, 'rb') as file:
+        if start is None:
+            file.readline()
+        else:
+            file.seek(start)
+        remaining = None if end is None else end - file.tell()
+
+        carry = b""
+        while True:
+            size = block_size if remaining is None else min(block_size, remaining)
+            block = file.read(size) if size > 0 else b""
+            if remaining is not None:
+                remaining -= len(block)
+
+            if not block:
+                # Last line without a trailing newline
+                if carry:
+                    yield carry
+                return
+
+            block = carry + block
+            cut = block.rfind(b"\n") + 1
+            carry = block[cut:]
+            if cut:
+                yield block[:cut]
+
+
+def iter_line_blocks(filename, start=None, end=None, encoding=None, block_size=PARSE_BLOCK_SIZE):
+    """
+    Block reader: yields lists of stripped, non-empty lines, decoding and
+    splitting block_size bytes at a time
+
+    Gives the same lines as iter_sales_lines (header skipped), or as
+    iter_range_lines when start / end byte offsets are given.
+    """
+    encodings = _encodings_for(filename, encoding)
+    for block in iter_byte_blocks(filename, start, end, block_size):
+        lines = _block_lines(block, encodings)
+        if lines:
+            yield lines
+
+
+def iter_chunks(items, chunk_size=CHUNK_SIZE):
+    """
+    Groups any iterable into lists of at most chunk_size items
+    """
+    items = iter(items)
+    while True:
+        chunk = list(islice(items, chunk_size))
+        if not chunk:
+            return
+        yield chunk
+
+
+def read_sales_data(filename):
+    log.info("Reading sales data", extra={"fields": {"file": filename}})
+    #Reads sales data from file handling encoding issues
+
+    #Returns: list of raw lines (strings)
+
+    #Expected Output Format:
+    #['T001|2024-12-01|P101|Laptop|2|45000|C001|North', ...]
+
+    #Requirements:
+    #- Use 'with' statement
+    #- Handle different encodings (try 'utf-8', 'latin-1', 'cp1252')
+    #- Handle FileNotFoundError with appropriate error message
+    #- Skip the header row
+    #- Remove empty lines
+    #For large files use iter_sales_lines / stream_transactions instead
+
+    try:
+        return list(chain.from_iterable(iter_line_blocks(filename)))
+    except FileNotFoundError:
+        print(f"Error: The file '{filename}' was not found.")
+        return []
+
+
+def stream_transactions(filename, chunk_size=CHUNK_SIZE, region=None, min_amount=None,
+                        max_amount=None, summary=None, columnar=False, date_from=None, date_to=None):
+    """
+    Yields parsed, validated and filtered transactions in chunks of at most
+    chunk_size rows, so memory stays bounded whatever the file size
+    If summary (a dict) is given, filter_summary counts are added into it
+    """
+    run = compile_filter(region, min_amount, max_amount, date_from, date_to)
+    symbols = rc.SymbolTable()
+
+    for raw_chunk in iter_chunks(iter_sales_lines(filename), chunk_size):
+        transactions = parse_transactions(raw_chunk, columnar=columnar, symbols=symbols)
+        valid, counts, _ = run(transactions)
+
+        chunk_summary = {"total_input": len(transactions), **counts, "final_count": len(valid)}
+        if summary is not None:
+            for key, value in chunk_summary.items():
+                summary[key] = summary.get(key, 0) + value
+
+        if len(valid):
+            yield valid
+
+
+FIELDS = (
+    "TransactionID", "Date", "ProductID", "ProductName",
+    "Quantity", "UnitPrice", "CustomerID", "Region"
+)
+
+
+def parse_quantity(text):
+    """
+    int(text), raising ValueError when it does not fit in int64
+    """
+    quantity = int(text)
+    if not MIN_QUANTITY <= quantity <= MAX_QUANTITY:
+        raise ValueError(f"quantity out of range: {text}")
+    return quantity
+
+
+def parse_rows(raw_lines):
+    """
+    Parses raw lines into clean tuples in FIELDS order
+    """
+    expected_fields = 8
+
+    for line in raw_lines:
+        parts = line.split("|")
+
+        # Skip rows with incorrect number of fields
+        if len(parts) != expected_fields:
+            continue
+
+        (
+            transaction_id,
+            date,
+            product_id,
+            product_name,
+            quantity,
+            unit_price,
+            customer_id,
+            region
+        ) = parts
+
+        try:
+            # Clean ProductName (remove commas)
+            product_name = product_name.replace(",", "")
+
+            # Clean and convert Quantity
+            quantity = parse_quantity(quantity)
+
+            # Clean and convert UnitPrice
+            unit_price = float(unit_price.replace(",", ""))
+
+        except ValueError:
+            # Skip rows with conversion errors
+            continue
+
+        yield (
+            transaction_id,
+            date,
+            product_id,
+            product_name,
+            quantity,
+            unit_price,
+            customer_id,
+            region
+        )
+
+
+def parse_transactions(raw_lines, columnar=False, symbols=None):
+    """
+    Parses raw lines into a clean list of records.Transaction (read like
+    dictionaries; repeated values are shared through symbols, a
+    records.SymbolTable, or a new one per call)
+    With columnar=True returns a TransactionTable instead
+    """
+    if columnar:
+        from transaction_table import TransactionTable
+        return TransactionTable.from_rows(parse_rows(raw_lines))
+
+    return rc.from_rows(parse_rows(raw_lines), symbols)
+  
+REQUIRED_FIELDS = frozenset(FIELDS)
+
+
+def compile_filter(region=None, min_amount=None, max_amount=None, date_from=None, date_to=None):
+    """
+    Compiles the validation rules and the optional region / date / amount
+    filters once into a single function:
+
+        run(transactions, collect_stats=False) -> (kept, counts, stats)
+
+    run evaluates everything in one fused loop over transaction dicts, or
+    as vectorized masks over a TransactionTable or a pandas SalesFrame; a
+    partitions.PartitionedSales only reads the partitions that can match.
+    date_from / date_to bound Date inclusively (YYYY-MM-DD strings).
+    counts holds invalid, filtered_by_region, filtered_by_date and
+    filtered_by_amount; stats (only with collect_stats) holds the regions
+    and amount range of the valid rows.
+    """
+    check_date = date_from is not None or date_to is not None
+    check_amount = min_amount is not None or max_amount is not None
+
+    def in_dates(date):
+        return (date_from is None or date >= date_from) and (date_to is None or date <= date_to)
+
+    low_limit = float("-inf") if min_amount is None else min_amount
+    high_limit = float("inf") if max_amount is None else max_amount
+
+    def run_records(transactions, collect_stats):
+        kept = []
+        keep = kept.append
+        invalid = by_region = by_date = by_amount = 0
+        regions = set()
+        low = high = None
+        # Date check result per distinct date
+        dates = {}
+
+        # Transactions always carry every field
+        compact = rc.is_compact(transactions)
+        fields = rc.getter(compact, "Quantity", "UnitPrice", "TransactionID", "ProductID", "CustomerID", "Region")
+        date_of = rc.getter(compact, "Date")
+
+        for tx in transactions:
+            # Validation
+            try:
+                if not compact and not tx.keys() >= REQUIRED_FIELDS:
+                    invalid += 1
+                    continue
+
+                qty, price, transaction_id, product_id, customer_id, tx_region = fields(tx)
+                if (
+                    qty <= 0 or
+                    price <= 0 or
+                    not transaction_id.startswith("T") or
+                    not product_id.startswith("P") or
+                    not customer_id.startswith("C")
+                ):
+                    invalid += 1
+                    continue
+
+                amount = qty * price
+            except Exception:
+                invalid += 1
+                continue
+
+            if collect_stats:
+                if tx_region:
+                    regions.add(tx_region)
+                if low is None or amount < low:
+                    low = amount
+                if high is None or amount > high:
+                    high = amount
+
+            # Filters
+            if region and tx_region != region:
+                by_region += 1
+                continue
+            if check_date:
+                date = date_of(tx)
+                matched = dates.get(date)
+                if matched is None:
+                    matched = dates[date] = in_dates(date)
+                if not matched:
+                    by_date += 1
+                    continue
+            if check_amount and not (low_limit <= amount <= high_limit):
+                by_amount += 1
+                continue
+
+            keep(tx)
+
+        counts = {
+            "invalid": invalid,
+            "filtered_by_region": by_region,
+            "filtered_by_date": by_date,
+            "filtered_by_amount": by_amount
+        }
+        stats = {"regions": regions, "min_amount": low, "max_amount": high} if collect_stats else None
+        return kept, counts, stats
+
+    def run_table(table, collect_stats):
+        import numpy as np
+
+        # Validation: prefix rules are evaluated once per distinct value
+        valid = (
+            # Written as "not <= 0" like the Python rules, so NaN prices stay valid
+            ~(table.quantity <= 0) &
+            ~(table.unit_price <= 0) &
+            np.char.startswith(table.transaction_ids, "T") &
+            table.category_mask("ProductID", lambda v: isinstance(v, str) and v.startswith("P")) &
+            table.category_mask("CustomerID", lambda v: isinstance(v, str) and v.startswith("C"))
+        )
+        valid_count = int(np.count_nonzero(valid))
+
+        stats = None
+        if collect_stats:
+            names = table.categories["Region"]
+            amounts = table.amount[valid]
+            stats = {
+                "regions": {names[code] for code in np.unique(table.codes["Region"][valid]).tolist() if names[code]},
+                "min_amount": amounts.min().item() if len(amounts) else None,
+                "max_amount": amounts.max().item() if len(amounts) else None
+            }
+
+        # Filters
+        keep = valid
+        by_region = 0
+        if region:
+            keep = keep & table.category_mask("Region", lambda v: v == region)
+            by_region = valid_count - int(np.count_nonzero(keep))
+
+        by_date = 0
+        if check_date:
+            before = int(np.count_nonzero(keep))
+            keep = keep & table.category_mask("Date", lambda v: isinstance(v, str) and in_dates(v))
+            by_date = before - int(np.count_nonzero(keep))
+
+        by_amount = 0
+        if check_amount:
+            before = int(np.count_nonzero(keep))
+            keep = keep & (table.amount >= low_limit) & (table.amount <= high_limit)
+            by_amount = before - int(np.count_nonzero(keep))
+
+        counts = {
+            "invalid": len(table) - valid_count,
+            "filtered_by_region": by_region,
+            "filtered_by_date": by_date,
+            "filtered_by_amount": by_amount
+        }
+        return table.take(keep), counts, stats
+
+    def run(transactions, collect_stats=False):
+        if getattr(transactions, "columnar", False):
+            return run_table(transactions, collect_stats)
+        if getattr(transactions, "frame", False):
+            import pandas_backend
+            return pandas_backend.filter_frame(transactions, region, min_amount, max_amount,
+                                               date_from, date_to, collect_stats)
+        if getattr(transactions, "partitioned", False):
+            # Partitions that cannot match are counted from their metadata;
+            # the rest are read and filtered row by row
+            return transactions.scan(run, region, date_from, date_to, collect_stats)
+        return run_records(transactions, collect_stats)
+
+    return run
+
+
+def validate_and_filter(transactions, region=None, min_amount=None, max_amount=None, verbose=True,
+                        date_from=None, date_to=None):
+    """
+    Validates transactions and applies optional filters
+    Accepts a list of transaction dicts, a TransactionTable, a SalesFrame
+    or a PartitionedSales (only the partitions that can match are read)
+    date_from / date_to bound Date inclusively (YYYY-MM-DD strings)
+    verbose=False suppresses the region / amount printouts
+    """
+    run = compile_filter(region, min_amount, max_amount, date_from, date_to)
+    filtered_transactions, counts, stats = run(transactions, collect_stats=verbose)
+    invalid_count = counts["invalid"]
+
+    if verbose:
+        # ---- Display available regions ----
+        print("Available regions:", sorted(stats["regions"]))
+
+        # ---- Compute transaction amount range ----
+        if stats["min_amount"] is not None:
+            print(f"Transaction amount range: min={stats['min_amount']}, max={stats['max_amount']}")
+
+        valid_count = len(transactions) - invalid_count
+        if region:
+            print(f"Records after region filter ({region}): {valid_count - counts['filtered_by_region']}")
+        if date_from is not None or date_to is not None:
+            remaining = valid_count - counts["filtered_by_region"] - counts["filtered_by_date"]
+            print(f"Records after date filter: {remaining}")
+        if min_amount is not None or max_amount is not None:
+            print(f"Records after amount filter: {len(filtered_transactions)}")
+
+    # ---- Summary ----
+    filter_summary = {
+        "total_input": len(transactions),
+        "invalid": invalid_count,
+        "filtered_by_region": counts["filtered_by_region"],
+        "filtered_by_date": counts["filtered_by_date"],
+        "filtered_by_amount": counts["filtered_by_amount"],
+        "final_count": len(filtered_transactions)
+    }
+    log.debug("Validated transactions", extra={"fields": filter_summary})
+
+    return filtered_transactions, invalid_count, filter_summary
+
+
+if __name__ == "__main__":
+    print("File handler running")
@@ -0,0 +1,130 @@
+import argparse
+import datetime
+import random
+
+HEADER = "TransactionID|Date|ProductID|ProductName|Quantity|UnitPrice|CustomerID|Region"
+
+# Named sizes used by the benchmark suite
+SIZES = {"small": 10_000, "medium": 1_000_000, "large": 50_000_000}
+
+REGION_NAMES = ["North", "South", "East", "West", "Central", "Northeast", "Northwest", "Southeast", "Southwest"]
+PRODUCT_WORDS = ["Wireless", "USB", "Laptop", "Mouse", "Keyboard", "Monitor", "Cable", "Charger",
+                 "Headphones", "Webcam", "Speaker", "Stand", "Hub", "Adapter", "Drive"]
+
+# Kinds of dirty row, picked with equal probability for each dirty row.
+# The first two are cleaned by the parser; the rest are rejected.
+DIRTY_KINDS = (
+    "price_comma",      # UnitPrice with a thousands separator: 1,916
+    "name_comma",       # ProductName with commas: Mouse,Wireless
+    "zero_quantity",    # Quantity of 0
+    "bad_transaction",  # TransactionID without the T prefix
+    "bad_product",      # ProductID without the P prefix
+    "bad_customer",     # CustomerID without the C prefix
+    "missing_region",   # empty Region
+)
+
+
+def _product_catalog(count, rng):
+    catalog = []
+    for number in range(count):
+        name = " ".join(rng.sample(PRODUCT_WORDS, 2))
+        if count > len(PRODUCT_WORDS) ** 2 // 2:
+            name += f" {number}"
+        catalog.append((f"P{101 + number}", name, rng.randint(50, 60000)))
+    return catalog
+
+
+def iter_rows(rows, dirty_ratio=0.1, regions=4, products=20, customers=100,
+              days=31, start_date="2024-12-01", seed=42):
+    """
+    Yields pipe-delimited lines (without newline) in sales_data.txt format
+    """
+    rng = random.Random(seed)
+    region_names = REGION_NAMES[:regions] + [f"Region{i}" for i in range(len(REGION_NAMES), regions)]
+    catalog = _product_catalog(products, rng)
+    first_day = datetime.date.fromisoformat(start_date)
+    dates = [(first_day + datetime.timedelta(days=offset)).isoformat() for offset in range(days)]
+
+    for number in range(1, rows + 1):
+        product_id, name, price = catalog[rng.randrange(products)]
+        fields = [
+            f"T{number:03d}",
+            dates[rng.randrange(days)],
+            product_id,
+            name,
+            str(rng.randint(1, 10)),
+            str(price),
+            f"C{rng.randint(1, customers):03d}",
+            region_names[rng.randrange(regions)]
+        ]
+
+        if rng.random() < dirty_ratio:
+            kind = DIRTY_KINDS[rng.randrange(len(DIRTY_KINDS))]
+            if kind == "price_comma":
+                fields[5] = f"{price:,}"
+            elif kind == "name_comma":
+                fields[3] = name.replace(" ", ",")
+            elif kind == "zero_quantity":
+                fields[4] = "0"
+            elif kind == "bad_transaction":
+                fields[0] = "X" + fields[0][1:]
+            elif kind == "bad_product":
+                fields[2] = "Q" + fields[2][1:]
+            elif kind == "bad_customer":
+                fields[6] = "D" + fields[6][1:]
+            elif kind == "missing_region":
+                fields[7] = ""
+
+        yield "|".join(fields)
+
+
+def generate(path, rows, batch_size=100_000, **options):
+    """
+    Writes a synthetic sales file in batches (memory stays flat for any size)
+    """
+    lines = iter_rows(rows, **options)
+    with open(path, "w", encoding="utf-8", newline="\n") as file:
+        file.write(HEADER + "\n")
+        batch = []
+        for line in lines:
+            batch.append(line)
+            if len(batch) >= batch_size:
+                file.write("\n".join(batch) + "\n")
+                batch = []
+        if batch:
+            file.write("\n".join(batch) + "\n")
+    return path
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Generate synthetic sales data")
+    parser.add_argument("output")
+    size = parser.add_mutually_exclusive_group()
+    size.add_argument("--rows", type=int)
+    size.add_argument("--size", choices=SIZES, default="small")
+    parser.add_argument("--dirty", type=float, default=0.1, help="share of dirty rows (0-1)")
+    parser.add_argument("--regions", type=int, default=4)
+    parser.add_argument("--products", type=int, default=20)
+    parser.add_argument("--customers", type=int, default=100)
+    parser.add_argument("--days", type=int, default=31)
+    parser.add_argument("--start-date", default="2024-12-01")
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args(argv)
+
+    rows = args.rows if args.rows is not None else SIZES[args.size]
+    generate(
+        args.output,
+        rows,
+        dirty_ratio=args.dirty,
+        regions=args.regions,
+        products=args.products,
+        customers=args.customers,
+        days=args.days,
+        start_date=args.start_date,
+        seed=args.seed
+    )
+    print(f"Wrote {rows:,} rows to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
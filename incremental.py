@@ -0,0 +1,273 @@
+import hashlib
+import json
+import os
+import sys
+
+import data_processor as dp
+import file_handler as fh
+import logs
+import records as rc
+
+log = logs.get_logger(__name__)
+
+STATE_VERSION = 3
+
+# Bytes hashed per read when fingerprinting the processed part of the file
+HASH_BLOCK_SIZE = 1024 * 1024
+
+
+def default_state_file(filename):
+    return filename + ".state"
+
+
+def _complete_end(file, size):
+    """
+    Offset just past the last newline; a half-written last line is left
+    for the next refresh
+    """
+    position = size
+    while position > 0:
+        start = max(0, position - 8192)
+        file.seek(start)
+        block = file.read(position - start)
+        index = block.rfind(b"\n")
+        if index != -1:
+            return start + index + 1
+        position = start
+    return 0
+
+
+def _hash_range(file, digest, start, end):
+    """
+    Feeds bytes start..end of an open binary file into digest
+    """
+    file.seek(start)
+    remaining = end - start
+    while remaining > 0:
+        block = file.read(min(HASH_BLOCK_SIZE, remaining))
+        if not block:
+            break
+        digest.update(block)
+        remaining -= len(block)
+    return digest
+
+
+def _dump_aggregates(aggregates):
+    """
+    aggregate_sales result as JSON-compatible data: the distinct-value
+    dicts become lists, metric functions come from the registry on load
+    """
+    data = {key: value for key, value in aggregates.items() if key != "metric_fns"}
+    for key in ("customers", "daily"):
+        data[key] = {
+            name: [total, count, list(distinct)]
+            for name, (total, count, distinct) in aggregates[key].items()
+        }
+    return data
+
+
+def _load_aggregates(data):
+    aggregates = dp.SalesAggregates(data)
+    for key in ("customers", "daily"):
+        aggregates[key] = {
+            name: [total, count, dict.fromkeys(distinct)]
+            for name, (total, count, distinct) in data[key].items()
+        }
+    aggregates["metric_fns"] = dp.registered_metrics()
+    return aggregates
+
+
+def _load_state(state_file):
+    try:
+        with open(state_file, "r", encoding="utf-8") as file:
+            state = json.load(file)
+    except (FileNotFoundError, ValueError):
+        return None
+    if not isinstance(state, dict) or state.get("version") != STATE_VERSION:
+        return None
+    state["aggregates"] = _load_aggregates(state["aggregates"])
+    return state
+
+
+def _save_state(state_file, state):
+    """
+    Writes the state as JSON; metric states that JSON cannot hold leave
+    the previous state in place (the next refresh rebuilds)
+    """
+    temp_path = state_file + ".tmp"
+    data = dict(state, aggregates=_dump_aggregates(state["aggregates"]))
+    try:
+        with open(temp_path, "w", encoding="utf-8") as file:
+            json.dump(data, file)
+    except TypeError as error:
+        os.remove(temp_path)
+        log.warning("Incremental state not saved", extra={"fields": {"error": str(error)}})
+        return
+    os.replace(temp_path, state_file)
+
+
+def _new_state(filters):
+    return {
+        "version": STATE_VERSION,
+        "filters": filters,
+        "metrics": sorted(dp.registered_metrics()),
+        "offset": 0,
+        "size": None,
+        "mtime_ns": None,
+        "sha256": None,
+        "aggregates": dp.new_aggregates(),
+        # Stats over every parsed row, like parallel.process_file
+        "line_count": 0,
+        "regions": [],
+        "min_amount": None,
+        "max_amount": None,
+        "summary": {
+            "total_input": 0,
+            "invalid": 0,
+            "filtered_by_region": 0,
+            "filtered_by_date": 0,
+            "filtered_by_amount": 0,
+            "final_count": 0
+        }
+    }
+
+
+def _update_stats(state, transactions):
+    regions = {region for region in map(rc.getter(True, "Region"), transactions) if region}
+    state["regions"] = sorted(regions.union(state["regions"]))
+    amounts = [amount for amount in map(rc.getter(True, "amount"), transactions) if amount == amount]
+    if amounts:
+        low, high = min(amounts), max(amounts)
+        if state["min_amount"] is None or low < state["min_amount"]:
+            state["min_amount"] = low
+        if state["max_amount"] is None or high > state["max_amount"]:
+            state["max_amount"] = high
+
+
+def refresh(filename, state_file=None, region=None, min_amount=None, max_amount=None,
+            date_from=None, date_to=None, chunk_size=fh.CHUNK_SIZE):
+    """
+    Brings the saved aggregates for filename up to date
+
+    Only the lines appended since the last checkpoint are parsed. The
+    state (JSON) records the size, mtime and SHA-256 of the part already
+    processed: a file with the same size and mtime is unchanged, otherwise
+    that part is hashed again and any difference, a file that shrank,
+    different filters, or a different set of registered metrics trigger
+    a full rebuild.
+
+    The checkpoint ends at the last newline. A last line without one
+    (the file's final row, or a row still being written) is added to the
+    returned result on every call, as a full run would count it, but
+    never saved: if the line later grows it is read again from its
+    offset and counted once.
+
+    Returns (state, mode) with mode one of "full", "incremental" or
+    "unchanged"; state holds the aggregates, the filter summary and the
+    line_count / regions / min_amount / max_amount of every parsed row
+    """
+    if state_file is None:
+        state_file = default_state_file(filename)
+
+    filters = [region, min_amount, max_amount, date_from, date_to]
+    state = _load_state(state_file)
+    mode = "incremental"
+
+    with open(filename, "rb") as file:
+        stat = os.fstat(file.fileno())
+        size = stat.st_size
+
+        if (
+            state is None or
+            state["filters"] != filters or
+            state["metrics"] != sorted(dp.registered_metrics()) or
+            state["offset"] > size
+        ):
+            state = _new_state(filters)
+            mode = "full"
+        elif (state["size"], state["mtime_ns"]) == (size, stat.st_mtime_ns):
+            state["aggregates"]["metric_fns"] = dp.registered_metrics()
+            _add_tail(state, filename, size, filters)
+            return state, "unchanged"
+
+        # The processed part is hashed once: checked against the state,
+        # then extended to the new end for the next refresh
+        digest = _hash_range(file, hashlib.sha256(), 0, state["offset"])
+        if mode == "incremental" and digest.hexdigest() != state["sha256"]:
+            state = _new_state(filters)
+            mode = "full"
+            digest = hashlib.sha256()
+
+        end = _complete_end(file, size)
+        start = state["offset"]
+        _hash_range(file, digest, start, end)
+
+        if start == 0:
+            # Skip the header row
+            file.seek(0)
+            file.readline()
+            start = min(file.tell(), end)
+
+    state["aggregates"]["metric_fns"] = dp.registered_metrics()
+
+    if start >= end == size:
+        mode = "unchanged" if mode == "incremental" else mode
+
+    lines = fh.iter_range_lines(filename, start, end) if start < end else ()
+    _add_lines(state, lines, filters, chunk_size)
+
+    state["offset"] = end
+    state["sha256"] = digest.hexdigest()
+    state["size"] = size
+    state["mtime_ns"] = stat.st_mtime_ns
+    _save_state(state_file, state)
+
+    _add_tail(state, filename, size, filters)
+    return state, mode
+
+
+def _add_lines(state, lines, filters, chunk_size=fh.CHUNK_SIZE):
+    """
+    Parses, validates, filters and aggregates lines into state
+    """
+    region, min_amount, max_amount, date_from, date_to = filters
+    aggregates = state["aggregates"]
+    symbols = rc.SymbolTable()
+    for raw_chunk in fh.iter_chunks(lines, chunk_size):
+        state["line_count"] += len(raw_chunk)
+        transactions = fh.parse_transactions(raw_chunk, symbols=symbols)
+        _update_stats(state, transactions)
+        valid, _, chunk_summary = fh.validate_and_filter(
+            transactions,
+            region=region,
+            min_amount=min_amount,
+            max_amount=max_amount,
+            date_from=date_from,
+            date_to=date_to,
+            verbose=False
+        )
+        for key, value in chunk_summary.items():
+            state["summary"][key] += value
+        dp.aggregate_sales(valid, aggregates)
+
+
+def _add_tail(state, filename, size, filters):
+    """
+    Adds the last line, when it has no newline yet, to the in-memory
+    state only (after it was saved)
+    """
+    # Offset 0 means there is no newline at all: the file is just a header
+    if 0 < state["offset"] < size:
+        _add_lines(state, fh.iter_range_lines(filename, state["offset"], size), filters)
+
+
+if __name__ == "__main__":
+    source = sys.argv[1] if len(sys.argv) > 1 else "sales_data.txt"
+    state, mode = refresh(source)
+    aggregates, summary = state["aggregates"], state["summary"]
+
+    print(f"Refresh mode: {mode}")
+    print(f"Valid transactions: {summary['final_count']} | Invalid: {summary['invalid']}")
+    print(f"Total revenue: {aggregates['total_revenue']:,.2f}")
+    for name, data in dp.region_wise_sales(aggregates).items():
+        print(f"  {name}: {data['total_sales']:,.2f} ({data['percentage']}%)")
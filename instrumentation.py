@@ -0,0 +1,211 @@
+import functools
+import json
+import os
+import sys
+import threading
+import time
+
+# Disabled by default: span() then returns a shared no-op object and
+# traced functions call straight through, so the cost is one flag check.
+_enabled = False
+_trace_memory = False
+_records = []
+# Open spans per thread, so stages running concurrently nest separately
+_local = threading.local()
+
+
+def _stack():
+    stack = getattr(_local, "stack", None)
+    if stack is None:
+        stack = _local.stack = []
+    return stack
+
+
+def enable(trace_memory=False):
+    """
+    Starts recording spans; trace_memory adds tracemalloc peak tracking
+    (accurate per-span peaks, but it slows allocation-heavy code)
+    """
+    global _enabled, _trace_memory
+    _enabled = True
+    _trace_memory = trace_memory
+    if trace_memory:
+        import tracemalloc
+        if not tracemalloc.is_tracing():
+            tracemalloc.start()
+
+
+def disable():
+    global _enabled, _trace_memory
+    _enabled = False
+    if _trace_memory:
+        import tracemalloc
+        tracemalloc.stop()
+    _trace_memory = False
+
+
+def is_enabled():
+    return _enabled
+
+
+def reset():
+    _records.clear()
+    _stack().clear()
+
+
+def _peak_rss_mb():
+    try:
+        import resource
+    except ImportError:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is in bytes on macOS and kilobytes elsewhere
+    return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+
+
+class _NoopSpan:
+    rows = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+
+_NOOP = _NoopSpan()
+
+
+class Span:
+    """
+    One timed stage; set .rows inside the block to record a row count
+    """
+
+    __slots__ = ("name", "rows", "depth", "wall", "cpu", "traced_peak")
+
+    def __init__(self, name, rows=None):
+        self.name = name
+        self.rows = rows
+        self.traced_peak = 0
+
+    def __enter__(self):
+        stack = _stack()
+        if _trace_memory:
+            import tracemalloc
+            # Fold the peak so far into the parent before resetting it
+            if stack:
+                stack[-1].traced_peak = max(stack[-1].traced_peak, tracemalloc.get_traced_memory()[1])
+            tracemalloc.reset_peak()
+        self.depth = len(stack)
+        stack.append(self)
+        self.cpu = time.thread_time()
+        self.wall = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        wall = time.perf_counter() - self.wall
+        cpu = time.thread_time() - self.cpu
+        stack = _stack()
+        stack.pop()
+
+        record = {
+            "stage": self.name,
+            "depth": self.depth,
+            "wall_seconds": wall,
+            "cpu_seconds": cpu,
+            "rows": self.rows,
+            "peak_rss_mb": _peak_rss_mb()
+        }
+        if _trace_memory:
+            import tracemalloc
+            peak = max(self.traced_peak, tracemalloc.get_traced_memory()[1])
+            record["peak_traced_mb"] = peak / (1024 * 1024)
+            if stack:
+                stack[-1].traced_peak = max(stack[-1].traced_peak, peak)
+        if exc_type is not None:
+            record["error"] = exc_type.__name__
+
+        _records.append(record)
+        return False
+
+
+def span(name, rows=None):
+    """
+    with span("parse") as s: ...; s.rows = n
+    """
+    if not _enabled:
+        return _NOOP
+    return Span(name, rows)
+
+
+def traced(name=None):
+    """
+    Decorator recording a span per call; the row count is len() of the
+    first argument when it has one
+    """
+    def decorate(func):
+        stage = name or func.__name__
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            if not _enabled:
+                return func(*args, **kwargs)
+            rows = None
+            if args and hasattr(args[0], "__len__") and not isinstance(args[0], dict):
+                rows = len(args[0])
+            with Span(stage, rows):
+                return func(*args, **kwargs)
+
+        return wrapper
+    return decorate
+
+
+def records():
+    """
+    Recorded spans in completion order (children before their parent)
+    """
+    return list(_records)
+
+
+def _write_atomic(path, text):
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    temp_path = path + ".tmp"
+    with open(temp_path, "w", encoding="utf-8") as file:
+        file.write(text)
+    os.replace(temp_path, path)
+
+
+def write_json(path):
+    _write_atomic(path, json.dumps({"spans": records()}, indent=2))
+
+
+def write_prometheus(path, prefix="sales_pipeline"):
+    """
+    Writes a node_exporter textfile-collector file; a stage that ran more
+    than once reports its totals
+    """
+    totals = {}
+    for record in _records:
+        entry = totals.setdefault(record["stage"], {"wall": 0.0, "cpu": 0.0, "rows": 0, "calls": 0, "peak": 0.0})
+        entry["wall"] += record["wall_seconds"]
+        entry["cpu"] += record["cpu_seconds"]
+        entry["rows"] += record["rows"] or 0
+        entry["calls"] += 1
+        entry["peak"] = max(entry["peak"], record.get("peak_traced_mb") or record["peak_rss_mb"] or 0.0)
+
+    metrics = (
+        ("wall_seconds", "wall", "Wall-clock seconds spent in the stage"),
+        ("cpu_seconds", "cpu", "CPU seconds spent in the stage"),
+        ("rows", "rows", "Rows handled by the stage"),
+        ("calls", "calls", "Times the stage ran"),
+        ("peak_memory_megabytes", "peak", "Peak memory while the stage ran"),
+    )
+    lines = []
+    for metric, key, help_text in metrics:
+        lines.append(f"# HELP {prefix}_{metric} {help_text}")
+        lines.append(f"# TYPE {prefix}_{metric} gauge")
+        for stage, entry in totals.items():
+            lines.append(f'{prefix}_{metric}{{stage="{stage}"}} {entry[key]}')
+    _write_atomic(path, "\n".join(lines) + "\n")
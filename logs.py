@@ -0,0 +1,274 @@
+import json
+import logging
+import sys
+import time
+
+# Quiet by default: nothing is configured here, so only warnings and
+# errors reach stderr (through logging's last-resort handler). configure()
+# turns on info / debug / row-level trace output.
+LOGGER_NAME = "sales"
+
+# Row-level records, one per transaction; below DEBUG
+TRACE = 5
+logging.addLevelName(TRACE, "TRACE")
+
+# -v count -> level
+VERBOSITY_LEVELS = (logging.WARNING, logging.INFO, logging.DEBUG, TRACE)
+
+_listener = None
+_row_sample = 1
+
+
+def get_logger(name):
+    """
+    Logger for a module, under the package-wide "sales" logger
+    """
+    return logging.getLogger(f"{LOGGER_NAME}.{name}")
+
+
+class SamplingFilter(logging.Filter):
+    """
+    Thins out DEBUG and TRACE records; warnings and above always pass
+
+    sample: keep one in every sample records per call site
+    rate:   then keep at most rate records per second per call site
+    Dropped records are counted in dropped.
+    """
+
+    def __init__(self, sample=1, rate=None):
+        super().__init__()
+        self.sample = max(int(sample), 1)
+        self.rate = rate
+        self.seen = {}     # call site -> records seen
+        self.windows = {}  # call site -> [second, records passed in it]
+        self.dropped = 0
+
+    def filter(self, record):
+        # Row batches from RowTracer are sampled before they are built
+        if record.levelno > logging.DEBUG or hasattr(record, "rows"):
+            return True
+
+        site = (record.name, record.msg)
+        seen = self.seen.get(site, 0)
+        self.seen[site] = seen + 1
+        if seen % self.sample:
+            self.dropped += 1
+            return False
+
+        if self.rate is not None:
+            second = int(time.monotonic())
+            window = self.windows.get(site)
+            if window is None or window[0] != second:
+                window = self.windows[site] = [second, 0]
+            if window[1] >= self.rate:
+                self.dropped += 1
+                return False
+            window[1] += 1
+        return True
+
+
+class RowTracer:
+    """
+    Row-level trace output for hot loops
+
+    add() keeps one row in every sample as a tuple; full batches are
+    handed to the logger as a single TRACE record, which the sink writes
+    out as one line per row. The loop itself only pays for a counter and
+    a list append. Use as a context manager (or call flush()) so the last
+    partial batch is written.
+    """
+
+    def __init__(self, logger, message, columns, sample=1, batch_size=1024):
+        self.logger = logger
+        self.message = message
+        self.columns = tuple(columns)
+        self.sample = max(int(sample), 1)
+        self.batch_size = batch_size
+        self.rows = []
+        self.seen = 0
+
+    def add(self, *values):
+        seen = self.seen
+        self.seen = seen + 1
+        if seen % self.sample:
+            return
+        self.rows.append(values)
+        if len(self.rows) >= self.batch_size:
+            self.flush()
+
+    def flush(self):
+        if self.rows:
+            self.logger.log(TRACE, self.message, extra={"columns": self.columns, "rows": self.rows})
+            self.rows = []
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.flush()
+        return False
+
+
+def row_tracer(logger, message, columns, batch_size=1024):
+    """
+    RowTracer for logger when TRACE output is enabled, else None
+    """
+    if not logger.isEnabledFor(TRACE):
+        return None
+    return RowTracer(logger, message, columns, _row_sample, batch_size)
+
+
+def _entries(record):
+    """
+    (message, fields) per output line: one per row for a RowTracer batch
+    """
+    message = record.getMessage()
+    rows = getattr(record, "rows", None)
+    if rows is None:
+        return [(message, getattr(record, "fields", None) or {})]
+    return [(message, dict(zip(record.columns, row))) for row in rows]
+
+
+class JsonFormatter(logging.Formatter):
+    """
+    One JSON object per line; values passed as extra={"fields": {...}}
+    become top-level keys
+    """
+
+    def format(self, record):
+        entries = []
+        for message, fields in _entries(record):
+            entry = {
+                "time": record.created,
+                "level": record.levelname,
+                "logger": record.name,
+                "message": message
+            }
+            entry.update(fields)
+            entries.append(entry)
+        if record.exc_info:
+            entries[-1]["exception"] = self.formatException(record.exc_info)
+        return "\n".join(json.dumps(entry, default=str) for entry in entries)
+
+
+class TextFormatter(logging.Formatter):
+    """
+    "LEVEL logger: message key=value ..." for humans
+    """
+
+    def format(self, record):
+        prefix = f"{record.levelname} {record.name}: {record.getMessage()}"
+        rows = getattr(record, "rows", None)
+        if rows is not None:
+            # %-formatting is the cheapest per-row formatting in CPython
+            escaped = [text.replace("%", "%%") for text in (prefix,) + record.columns]
+            template = " ".join(escaped[:1] + [f"{column}=%s" for column in escaped[1:]])
+            lines = [template % row for row in rows]
+        else:
+            fields = getattr(record, "fields", None)
+            if fields:
+                prefix += " " + " ".join(f"{key}={value}" for key, value in fields.items())
+            lines = [prefix]
+        if record.exc_info:
+            lines.append(self.formatException(record.exc_info))
+        return "\n".join(lines)
+
+
+class BufferedStreamHandler(logging.StreamHandler):
+    """
+    StreamHandler that collects formatted lines and writes them in one
+    call when capacity lines are waiting or on flush()
+    """
+
+    def __init__(self, stream=None, capacity=1024):
+        super().__init__(stream)
+        self.capacity = capacity
+        self.lines = []
+
+    def emit(self, record):
+        try:
+            self.lines.append(self.format(record) + self.terminator)
+        except Exception:
+            self.handleError(record)
+            return
+        if len(self.lines) >= self.capacity:
+            self.flush()
+
+    def flush(self):
+        self.acquire()
+        try:
+            if self.lines:
+                self.stream.write("".join(self.lines))
+                self.lines.clear()
+            super().flush()
+        finally:
+            self.release()
+
+
+def configure(verbosity=0, sample=1, rate=None, json_format=False, stream=None):
+    """
+    Sets up the "sales" loggers
+
+    verbosity: 0 warnings only, 1 info, 2 debug, 3 row-level trace
+    sample / rate: see SamplingFilter; sample also thins RowTracer rows
+    Records are filtered (SamplingFilter) and queued in the calling thread;
+    a listener thread formats them and writes them out in batches, so
+    logging never waits on the terminal. Call shutdown() to flush.
+    Returns the SamplingFilter (for its dropped count).
+    """
+    # logging.handlers pulls in socket, pickle etc.; only load it when used
+    import logging.handlers
+    import queue
+
+    class Listener(logging.handlers.QueueListener):
+        # Flush the sinks whenever the queue runs dry, so lines are written
+        # in batches under load but never held back while the program idles
+        def dequeue(self, block):
+            try:
+                return self.queue.get(block=False)
+            except queue.Empty:
+                for handler in self.handlers:
+                    handler.flush()
+                return self.queue.get(block=block)
+
+    global _listener, _row_sample
+    shutdown()
+
+    _row_sample = max(int(sample), 1)
+
+    logger = logging.getLogger(LOGGER_NAME)
+    level = VERBOSITY_LEVELS[min(max(verbosity, 0), len(VERBOSITY_LEVELS) - 1)]
+    logger.setLevel(level)
+    logger.propagate = False
+
+    sink = BufferedStreamHandler(stream or sys.stderr)
+    sink.setFormatter(JsonFormatter() if json_format else TextFormatter())
+
+    records = queue.SimpleQueue()
+    handler = logging.handlers.QueueHandler(records)
+    sampling = SamplingFilter(sample, rate)
+    handler.addFilter(sampling)
+    logger.addHandler(handler)
+
+    _listener = Listener(records, sink)
+    _listener.start()
+    return sampling
+
+
+def shutdown():
+    """
+    Writes out queued records, stops the background writer and returns
+    the "sales" loggers to the quiet default
+    """
+    global _listener
+    logger = logging.getLogger(LOGGER_NAME)
+    for handler in list(logger.handlers):
+        logger.removeHandler(handler)
+    logger.setLevel(logging.NOTSET)
+    logger.propagate = True
+
+    if _listener is not None:
+        _listener.stop()
+        for handler in _listener.handlers:
+            handler.flush()
+        _listener = None
@@ -1,195 +1,514 @@
-import pandas as pd
-import utils.api_handler as ah
-import utils.data_processor as dp
-import os
-import utils.file_handler as fh
-
-# Read file with encoding handling
-df = pd.read_csv(
-    "sales_data.txt",
-    delimiter="|",
-    encoding="latin1",
-    engine="python"
-)
-# Display the first few rows of the DataFrame
-print(df.to_string())
-
-def main():
-   
-    try:
-        print("=" * 40)
-        print("SALES ANALYTICS SYSTEM")
-        print("=" * 40)
-
-        # --------------------------------------------------
-        # 1. Read sales data file
-        # --------------------------------------------------
-        print("\n[1/10] Reading sales data...")
-        with open("data/sales_data.txt", "r", encoding="utf-8") as file:
-            raw_lines = file.readlines()
-
-        print(f"✓ Successfully read {len(raw_lines) - 1} transactions")
-
-        # --------------------------------------------------
-        # 2. Parse and clean transactions
-        # --------------------------------------------------
-        print("\n[2/10] Parsing and cleaning data...")
-        transactions = fh.parse_transactions(raw_lines)
-        print(f"✓ Parsed {len(transactions)} records")
-
-        # --------------------------------------------------
-        # 3. Display filter options
-        # --------------------------------------------------
-        print("\n[3/10] Filter Options Available:")
-
-        regions = sorted({t["Region"] for t in transactions if t["Region"]})
-        amounts = [t["Quantity"] * t["UnitPrice"] for t in transactions]
-        min_amt, max_amt = min(amounts), max(amounts)
-
-        print(f"Regions: {', '.join(regions)}")
-        print(f"Amount Range: ₹{min_amt:,.0f} - ₹{max_amt:,.0f}")
-
-        apply_filter = input("\nDo you want to filter data? (y/n): ").strip().lower()
-
-        region_filter = None
-        min_amount = None
-        max_amount = None
-
-        if apply_filter == "y":
-            region_filter = input("Enter region (or press Enter to skip): ").strip()
-            region_filter = region_filter if region_filter else None
-
-            min_val = input("Enter minimum amount (or press Enter to skip): ").strip()
-            max_val = input("Enter maximum amount (or press Enter to skip): ").strip()
-
-            min_amount = float(min_val) if min_val else None
-            max_amount = float(max_val) if max_val else None
-
-        # --------------------------------------------------
-        # 4. Validate and filter transactions
-        # --------------------------------------------------
-        print("\n[4/10] Validating transactions...")
-        valid_txns, invalid_count, summary = fh.validate_and_filter(
-            transactions,
-            region=region_filter,
-            min_amount=min_amount,
-            max_amount=max_amount
-        )
-
-        print(f"✓ Valid: {len(valid_txns)} | Invalid: {invalid_count}")
-
-        # --------------------------------------------------
-        # 5. Analysis
-        # --------------------------------------------------
-        print("\n[5/10] Analyzing sales data...")
-        dp.region_wise_sales(valid_txns)
-        dp.top_selling_products(valid_txns)
-        dp.customer_analysis(valid_txns)
-        dp.daily_sales_trend(valid_txns)
-        dp.find_peak_sales_day(valid_txns)
-        dp.low_performing_products(valid_txns)
-        print("✓ Analysis complete")
-
-        # --------------------------------------------------
-        # 6. Fetch API products
-        # --------------------------------------------------
-        print("\n[6/10] Fetching product data from API...")
-        api_products = ah.fetch_all_products()
-        print(f"✓ Fetched {len(api_products)} products")
-
-        # --------------------------------------------------
-        # 7. Enrich sales data
-        # --------------------------------------------------
-        print("\n[7/10] Enriching sales data...")
-        product_mapping = ah.create_product_mapping(api_products)
-        enriched_transactions = ah.enrich_sales_data(valid_txns, product_mapping)
-
-        enriched_count = sum(1 for t in enriched_transactions if t.get("API_Match"))
-        success_rate = (enriched_count / len(enriched_transactions)) * 100 if enriched_transactions else 0
-
-        print(f"✓ Enriched {enriched_count}/{len(enriched_transactions)} transactions ({success_rate:.1f}%)")
-
-        # --------------------------------------------------
-        # 8. Save enriched data
-        # --------------------------------------------------
-        print("\n[8/10] Saving enriched data...")
-        ah.save_enriched_data(enriched_transactions)
-        print("✓ Saved to: data/enriched_sales_data.txt")
-
-        # --------------------------------------------------
-        # 9. Generate report
-        # --------------------------------------------------
-        print("\n[9/10] Generating report...")
-       # generate_sales_report(valid_txns, enriched_transactions)
-        print("✓ Report saved to: output/sales_report.txt")
-
-        # --------------------------------------------------
-        # 10. Complete
-        # --------------------------------------------------
-        print("\n[10/10] Process Complete!")
-        print("=" * 40)
-
-    except FileNotFoundError:
-        print("❌ Error: Required data file not found. Please check file paths.")
-    except ValueError as ve:
-        print(f"❌ Data format error: {ve}")
-    except Exception as e:
-        print(f"❌ Unexpected error occurred: {e}")
-
-
-if __name__ == "__main__":
-    main()
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-if "ProductName" in df.columns:
-    total_records = len(df)
-    print(f"Total records before cleaning: {total_records}")
-    # Remove empty rows based on all columns    
-    df = df.dropna(how="all")
-
-    # Clean ProductName (remove commas)
-    df["ProductName"] = df["ProductName"].astype(str).str.replace(",", "", regex=False)
-    cleaned_records = len(df)
-    print(f"Total records after cleaning: {cleaned_records}")
-
-    # Clean UnitPrice (remove commas, convert to float)
-    df["UnitPrice"] = (
-        df["UnitPrice"]
-        .astype(str)
-        .str.replace(",", "", regex=False)
-        .astype(float)
-    )
-
-     # Apply INVALID record rules
-    invalid_condition = (
-        df["CustomerID"].isna() |
-        df["Region"].isna() |
-        (df["Quantity"] <= 0) |
-        (df["UnitPrice"] <= 0) |
-        (~df["TransactionID"].astype(str).str.startswith("T"))
-    )
-
-    invalid_records = df[invalid_condition]
-    valid_df = df[~invalid_condition]
-
-    # Print validation output (EXACT FORMAT)
-    print(f"Total records parsed: {total_records}")
-    print(f"Invalid records removed: {len(invalid_records)}")
-    print(f"Valid records after cleaning: {len(valid_df)}")
-
-    valid_df
\ No newline at end of file
+import argparse
+import os
+
+import api_handler as ah
+import backends as bk
+import data_processor as dp
+import file_handler as fh
+import incremental as inc
+import instrumentation as ins
+import logs
+import parallel as pl
+import partitions as pt
+
+log = logs.get_logger(__name__)
+
+DATA_FILE = "sales_data.txt"
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Sales Analytics System")
+    parser.add_argument("--file", default=DATA_FILE,
+                        help="sales data file, or a directory written by partitions.py ingest")
+    parser.add_argument("--region", help="only analyze this region")
+    parser.add_argument("--date-from", metavar="YYYY-MM-DD",
+                        help="only analyze transactions on or after this date")
+    parser.add_argument("--date-to", metavar="YYYY-MM-DD",
+                        help="only analyze transactions on or before this date")
+    parser.add_argument("--min-amount", type=float, metavar="AMOUNT",
+                        help="only analyze transactions of at least this amount")
+    parser.add_argument("--max-amount", type=float, metavar="AMOUNT",
+                        help="only analyze transactions of at most this amount")
+    parser.add_argument("--backend", default="python", choices=bk.backends(),
+                        help="parse / filter / aggregate with pure Python records, a NumPy "
+                             "TransactionTable or a pandas DataFrame (same results)")
+    parser.add_argument("--workers", type=int, default=1,
+                        help="processes used to parse and aggregate the sales file "
+                             "(python backend)")
+    parser.add_argument("--incremental", action="store_true",
+                        help="keep the aggregates in FILE.state and only parse lines appended "
+                             "since the last run (analysis only: no enrichment or output file)")
+    parser.add_argument("--cache", action="store_true",
+                        help="parse the file once into a columnar cache (FILE.colcache) "
+                             "and memory-map it on later runs")
+    parser.add_argument("--approx-error", type=float, default=None,
+                        help="estimate distinct customers/products with this relative error")
+    parser.add_argument("--top-k", type=int, default=None,
+                        help="track only about this many top products (heavy-hitter sketch)")
+    parser.add_argument("--metrics-json", metavar="PATH",
+                        help="write per-stage timing / memory spans as JSON")
+    parser.add_argument("--metrics-prom", metavar="PATH",
+                        help="write per-stage metrics as a Prometheus textfile")
+    parser.add_argument("--trace-memory", action="store_true",
+                        help="track per-stage peak memory with tracemalloc (slower)")
+    parser.add_argument("-v", "--verbose", action="count", default=0,
+                        help="log to stderr: -v info (file totals), -vv debug (counts per range, "
+                             "filter and aggregation), -vvv every parsed transaction (--workers 1 "
+                             "only; costs about as much as printing each row)")
+    parser.add_argument("--log-sample", type=int, default=1, metavar="N",
+                        help="keep one in N debug / trace records")
+    parser.add_argument("--log-rate", type=float, default=None, metavar="PER_SEC",
+                        help="at most this many debug / trace records per second per message")
+    parser.add_argument("--log-json", action="store_true",
+                        help="log one JSON object per line")
+    parser.add_argument("--output", default=ah.ENRICHED_FILE, metavar="PATH",
+                        help="enriched output file; .gz / .zst compress it, "
+                             ".parquet / .arrow write columnar files")
+    args = parser.parse_args(argv)
+    if args.incremental and (args.approx_error or args.top_k):
+        parser.error("--incremental keeps exact aggregates; it cannot be combined with "
+                     "--approx-error or --top-k")
+    if args.incremental and args.cache:
+        parser.error("--incremental and --cache cannot be combined")
+    if args.backend != "python" and (args.incremental or args.cache):
+        parser.error("--incremental / --cache use their own storage; drop --backend")
+    return args
+
+
+def partition_scan(args, approx):
+    """
+    process_file-style result for a partitioned directory: only the
+    partitions the region / date filters can match are read, and the
+    filters are applied while reading
+    """
+    dataset = pt.PartitionedSales(args.file)
+    valid_txns, _, summary = fh.validate_and_filter(
+        dataset,
+        region=args.region,
+        min_amount=args.min_amount,
+        max_amount=args.max_amount,
+        date_from=args.date_from,
+        date_to=args.date_to,
+        verbose=False
+    )
+    # Same stats as process_file: over every parsed row, not just valid ones
+    stats = dataset.parsed_stats()
+
+    return {
+        "line_count": len(dataset),
+        "partitions_read": len(dataset.read_paths),
+        "partitions": len(dataset.partitions),
+        "regions": sorted(stats["regions"]),
+        "min_amount": stats["min_amount"],
+        "max_amount": stats["max_amount"],
+        "summary": summary,
+        "aggregates": dp.aggregate_sales(valid_txns, dp.new_aggregates(**approx)),
+        "transactions": valid_txns
+    }
+
+
+def incremental_scan(args):
+    """
+    process_file-style result from the incremental state of the file:
+    filtered aggregates and parse stats, without the rows
+    """
+    state, mode = inc.refresh(
+        args.file,
+        region=args.region,
+        min_amount=args.min_amount,
+        max_amount=args.max_amount,
+        date_from=args.date_from,
+        date_to=args.date_to
+    )
+    return {
+        "mode": mode,
+        "line_count": state["line_count"],
+        "regions": state["regions"],
+        "min_amount": state["min_amount"],
+        "max_amount": state["max_amount"],
+        "summary": state["summary"],
+        "aggregates": state["aggregates"],
+        "transactions": None
+    }
+
+
+def cache_scan(args, approx):
+    """
+    process_file-style result from the columnar cache of the file: the
+    valid rows are memory-mapped (parsed only when the file changed),
+    then filtered and aggregated
+    """
+    # NumPy is only imported when the cache is used
+    import column_cache as cc
+
+    table, parse_summary = cc.load_table(args.file)
+    valid_txns, _, counts = fh.validate_and_filter(
+        table,
+        region=args.region,
+        min_amount=args.min_amount,
+        max_amount=args.max_amount,
+        date_from=args.date_from,
+        date_to=args.date_to,
+        verbose=False
+    )
+    summary = dict(counts, total_input=parse_summary["total_input"], invalid=parse_summary["invalid"])
+
+    return {
+        "line_count": parse_summary["line_count"],
+        "regions": parse_summary["regions"],
+        "min_amount": parse_summary["min_amount"],
+        "max_amount": parse_summary["max_amount"],
+        "summary": summary,
+        "aggregates": dp.aggregate_sales(valid_txns, dp.new_aggregates(**approx)),
+        "transactions": valid_txns
+    }
+
+
+def backend_scan(args, approx):
+    """
+    process_file-style result from a numpy / pandas backend: the whole
+    file is parsed into its container, then filtered and aggregated
+    vectorized
+    """
+    rows = bk.read(args.file, args.backend)
+    stats = bk.parsed_stats(rows)
+    valid_txns, _, summary = fh.validate_and_filter(
+        rows,
+        region=args.region,
+        min_amount=args.min_amount,
+        max_amount=args.max_amount,
+        date_from=args.date_from,
+        date_to=args.date_to,
+        verbose=False
+    )
+    aggregates = dp.aggregate_sales(valid_txns, dp.new_aggregates(**approx))
+    if getattr(valid_txns, "frame", False):
+        # Enrichment joins records or TransactionTables
+        valid_txns = list(valid_txns.iter_records())
+
+    return dict(stats, line_count=len(rows), summary=summary, aggregates=aggregates, transactions=valid_txns)
+
+
+def analyze_file(args):
+    """
+    Steps 1-5: reads, parses, validates, filters and analyzes the sales
+    file; returns the (filtered) process_file result
+    """
+    # --------------------------------------------------
+    # 1. Read sales data file
+    # --------------------------------------------------
+    print("\n[1/10] Reading sales data...")
+    # Parsed, validated and pre-aggregated range by range; --workers
+    # spreads the ranges over a process pool with identical results
+    approx = {"approx_error": args.approx_error, "top_k": args.top_k}
+    partitioned = os.path.isdir(args.file)
+    if partitioned and not pt.is_partitioned(args.file):
+        raise ValueError(f"{args.file} is a directory but not a partitioned dataset (run partitions.py ingest)")
+    if partitioned and (args.incremental or args.cache or args.backend != "python"):
+        raise ValueError("--incremental / --cache / --backend need a sales file, not a partitioned directory")
+
+    if args.incremental:
+        # Filtered and aggregated as the lines are parsed; only new lines are read
+        with ins.span("incremental_refresh") as span:
+            scan = incremental_scan(args)
+            span.rows = scan["summary"]["final_count"]
+        print(f"✓ Refreshed saved aggregates ({scan['mode']}): {scan['line_count']} transactions")
+    elif args.cache:
+        with ins.span("read_cache") as span:
+            scan = cache_scan(args, approx)
+            span.rows = scan["line_count"]
+        print(f"✓ Loaded {scan['line_count']} transactions (columnar cache)")
+    elif args.backend != "python":
+        with ins.span(f"read_{args.backend}") as span:
+            scan = backend_scan(args, approx)
+            span.rows = scan["line_count"]
+        print(f"✓ Parsed {scan['line_count']} transactions ({args.backend} backend)")
+    elif partitioned:
+        # Filtered while reading; partitions that cannot match are skipped
+        with ins.span("read_partitions") as span:
+            scan = partition_scan(args, approx)
+            span.rows = scan["summary"]["final_count"]
+        print(f"✓ Read {scan['partitions_read']} of {scan['partitions']} partitions "
+              f"({scan['line_count']} transactions in total)")
+    else:
+        # Filtered while reading, so every run sums its rows in the same order
+        with ins.span("read_parse_validate") as span:
+            scan = pl.process_file(
+                args.file,
+                workers=args.workers,
+                region=args.region,
+                min_amount=args.min_amount,
+                max_amount=args.max_amount,
+                date_from=args.date_from,
+                date_to=args.date_to,
+                **approx
+            )
+            span.rows = scan["line_count"]
+
+        print(f"✓ Successfully read {scan['line_count']} transactions")
+
+    # --------------------------------------------------
+    # 2. Parse and clean transactions
+    # --------------------------------------------------
+    print("\n[2/10] Parsing and cleaning data...")
+    print(f"✓ Parsed {scan['summary']['total_input']} records")
+
+    # --------------------------------------------------
+    # 3. Display filter options
+    # --------------------------------------------------
+    print("\n[3/10] Filter Options Available:")
+
+    regions = scan["regions"]
+    min_amt, max_amt = scan["min_amount"], scan["max_amount"]
+    if min_amt is None:
+        raise ValueError("no transactions could be parsed")
+
+    print(f"Regions: {', '.join(regions)}")
+    print(f"Amount Range: ₹{min_amt:,.0f} - ₹{max_amt:,.0f}")
+
+    # Filters come from --region / --date-from / --date-to / --min-amount / --max-amount
+    region_filter = args.region
+    min_amount = args.min_amount
+    max_amount = args.max_amount
+    date_filter = args.date_from is not None or args.date_to is not None
+    if region_filter or date_filter or min_amount is not None or max_amount is not None:
+        print(f"Filter: region={region_filter or 'any'}, "
+              f"dates={args.date_from or '-'}..{args.date_to or '-'}, "
+              f"min={'-' if min_amount is None else min_amount}, "
+              f"max={'-' if max_amount is None else max_amount}")
+
+    # --------------------------------------------------
+    # 4. Validate and filter transactions
+    # --------------------------------------------------
+    print("\n[4/10] Validating transactions...")
+    # Filters were applied while reading
+    result = scan
+
+    valid_count = result["summary"]["final_count"]
+    invalid_count = result["summary"]["invalid"]
+
+    print(f"✓ Valid: {valid_count} | Invalid: {invalid_count}")
+
+    # --------------------------------------------------
+    # 5. Analysis
+    # --------------------------------------------------
+    print("\n[5/10] Analyzing sales data...")
+    # Already aggregated per range; every analysis below is a view over it
+    aggregates = result["aggregates"]
+    with ins.span("analysis", rows=valid_count):
+        dp.region_wise_sales(aggregates)
+        dp.top_selling_products(aggregates)
+        dp.customer_purchase_analysis(aggregates)
+        dp.daily_sales_trend(aggregates)
+        dp.find_peak_sales_day(aggregates)
+        dp.find_peak_periods(aggregates)
+        if not args.top_k:
+            # Needs exact totals for every product
+            dp.low_performing_products(aggregates)
+    print("✓ Analysis complete")
+    return result
+
+
+def fetch_catalog(fetch_products=None):
+    """
+    Fetches the API product catalog (runs alongside analyze_file)
+    Returns None when it cannot be fetched, so the run still completes
+    with unmatched enrichment
+    """
+    with ins.span("fetch_products") as span:
+        try:
+            api_products = (fetch_products or ah.fetch_all_products)()
+        except Exception as e:
+            log.warning("Product catalog unavailable", extra={"fields": {"error": str(e)}})
+            return None
+        span.rows = len(api_products)
+    return api_products
+
+
+def enrich_and_save(args, result, api_products):
+    """
+    Steps 7-8: joins the valid transactions with the catalog and writes
+    them to args.output one batch at a time. Rows that analyze_file did
+    not keep (the default path) are streamed from the file again with the
+    same filters, so memory stays bounded by the chunk size.
+    Returns (rows written, rows matched)
+    """
+    batches = result["transactions"]
+    if batches is None:
+        batches = fh.stream_transactions(
+            args.file,
+            region=args.region,
+            min_amount=args.min_amount,
+            max_amount=args.max_amount,
+            date_from=args.date_from,
+            date_to=args.date_to
+        )
+    else:
+        batches = [batches]
+
+    index = ah.ProductIndex(ah.create_product_mapping(api_products))
+    matched = 0
+
+    def enriched_batches():
+        nonlocal matched
+        for batch in batches:
+            enriched = index.join(batch)
+            matched += enriched.matched
+            yield enriched
+
+    written = ah.save_enriched_data(enriched_batches(), args.output)
+    return written, matched
+
+
+async def run_pipeline(args, fetch_products=None):
+    """
+    Runs the catalog fetch and the file work (steps 1-5) at the same time,
+    each in a worker thread, then enriches and saves as soon as both are
+    done, so the run takes about max(file, network) instead of their sum
+    Returns the number of rows saved (None with --incremental)
+    """
+    import asyncio
+
+    if args.incremental:
+        # Only aggregates are kept between runs; there are no rows to enrich
+        await asyncio.to_thread(analyze_file, args)
+        print("\n[6-9/10] Skipped enrichment and output (--incremental keeps aggregates only)")
+        print("\n[10/10] Process Complete!")
+        print("=" * 40)
+        return None
+
+    catalog = asyncio.create_task(asyncio.to_thread(fetch_catalog, fetch_products))
+    try:
+        result = await asyncio.to_thread(analyze_file, args)
+    except BaseException:
+        # The fetch thread cannot be interrupted; just drop its result
+        catalog.cancel()
+        raise
+
+    # --------------------------------------------------
+    # 6. Fetch API products
+    # --------------------------------------------------
+    print("\n[6/10] Fetching product data from API...")
+    api_products = await catalog
+    if api_products is None:
+        print("⚠ Product API unavailable; continuing without API data")
+        api_products = []
+    else:
+        print(f"✓ Fetched {len(api_products)} products")
+
+    # --------------------------------------------------
+    # 7-8. Enrich and save, batch by batch
+    # --------------------------------------------------
+    print("\n[7-8/10] Enriching and saving sales data...")
+    with ins.span("enrich_save") as span:
+        written, matched = enrich_and_save(args, result, api_products)
+        span.rows = written
+
+    match_rate = (matched / written) * 100 if written else 0
+    print(f"✓ Enriched {matched}/{written} transactions ({match_rate:.1f}%)")
+    print(f"✓ Saved to: {args.output}")
+
+    # --------------------------------------------------
+    # 9. Generate report
+    # --------------------------------------------------
+    print("\n[9/10] Generating report...")
+   # generate_sales_report(valid_txns, enriched_transactions)
+    print("✓ Report saved to: output/sales_report.txt")
+
+    # --------------------------------------------------
+    # 10. Complete
+    # --------------------------------------------------
+    print("\n[10/10] Process Complete!")
+    print("=" * 40)
+    return written
+
+
+def main(argv=None):
+    args = parse_args(argv)
+
+    if args.metrics_json or args.metrics_prom:
+        ins.enable(trace_memory=args.trace_memory)
+    if args.verbose or args.log_json:
+        logs.configure(args.verbose, args.log_sample, args.log_rate, args.log_json)
+
+    try:
+        print("=" * 40)
+        print("SALES ANALYTICS SYSTEM")
+        print("=" * 40)
+
+        # asyncio is only imported when the pipeline actually runs
+        import asyncio
+        asyncio.run(run_pipeline(args))
+
+    except FileNotFoundError:
+        print("❌ Error: Required data file not found. Please check file paths.")
+    except ValueError as ve:
+        print(f"❌ Data format error: {ve}")
+    except Exception as e:
+        print(f"❌ Unexpected error occurred: {e}")
+    finally:
+        if args.metrics_json:
+            ins.write_json(args.metrics_json)
+        if args.metrics_prom:
+            ins.write_prometheus(args.metrics_prom)
+        logs.shutdown()
+
+
+def pandas_cleaning_report(filename=DATA_FILE):
+    """
+    Loads and cleans the sales file with pandas and prints the validation
+    counts. pandas is only imported when this is called.
+    """
+    import pandas as pd
+
+    # Read file with encoding handling
+    df = pd.read_csv(
+        filename,
+        delimiter="|",
+        encoding="latin1",
+        engine="c"
+    )
+
+    if "ProductName" not in df.columns:
+        return df
+
+    total_records = len(df)
+    print(f"Total records before cleaning: {total_records}")
+    # Remove empty rows based on all columns    
+    df = df.dropna(how="all")
+
+    # Clean ProductName (remove commas)
+    df["ProductName"] = df["ProductName"].astype(str).str.replace(",", "", regex=False)
+    cleaned_records = len(df)
+    print(f"Total records after cleaning: {cleaned_records}")
+
+    # Clean UnitPrice (remove commas, convert to float)
+    df["UnitPrice"] = (
+        df["UnitPrice"]
+        .astype(str)
+        .str.replace(",", "", regex=False)
+        .astype(float)
+    )
+
+     # Apply INVALID record rules
+    invalid_condition = (
+        df["CustomerID"].isna() |
+        df["Region"].isna() |
+        (df["Quantity"] <= 0) |
+        (df["UnitPrice"] <= 0) |
+        (~df["TransactionID"].astype(str).str.startswith("T"))
+    )
+
+    invalid_records = df[invalid_condition]
+    valid_df = df[~invalid_condition]
+
+    # Print validation output (EXACT FORMAT)
+    print(f"Total records parsed: {total_records}")
+    print(f"Invalid records removed: {len(invalid_records)}")
+    print(f"Valid records after cleaning: {len(valid_df)}")
+
+    return valid_df
+
+
+if __name__ == "__main__":
+    main()
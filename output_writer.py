@@ -0,0 +1,177 @@
+import os
+
+from api_handler import ENRICHED_HEADERS, TRANSACTION_FIELDS
+
+# Rows formatted and written per write call, and the file buffer size
+BATCH_SIZE = 65536
+BUFFER_SIZE = 1024 * 1024
+
+FORMATS = ("txt", "parquet", "arrow")
+COMPRESSIONS = ("gzip", "zstd")
+
+# Suffix -> (format, compression) used when neither is given
+SUFFIXES = {
+    ".gz": ("txt", "gzip"),
+    ".zst": ("txt", "zstd"),
+    ".parquet": ("parquet", None),
+    ".arrow": ("arrow", None),
+    ".feather": ("arrow", None),
+}
+
+
+def infer_format(path):
+    """
+    Returns (format, compression) for an output path from its suffix
+    """
+    return SUFFIXES.get(os.path.splitext(path)[1].lower(), ("txt", None))
+
+
+def _arrow_schema(pa):
+    types = {"Quantity": pa.int64(), "UnitPrice": pa.float64(),
+             "API_Rating": pa.float64(), "API_Match": pa.bool_()}
+    return pa.schema([(field, types.get(field, pa.string())) for field in ENRICHED_HEADERS])
+
+
+class EnrichedWriter:
+    """
+    Streams enriched batches to one output file
+
+    - txt: pipe-delimited with a header row (as enriched_sales_data.txt),
+      optionally gzip or zstd (zstandard package) compressed
+    - parquet / arrow: columnar output through pyarrow, one row group or
+      record batch per write
+
+    Rows are formatted and written BATCH_SIZE at a time, so memory holds one
+    batch, never the whole dataset. Output goes to path + ".tmp" and is
+    renamed into place by close(); if the with-block raises, the temp
+    file is removed and any previous output is left untouched.
+    """
+
+    def __init__(self, path, fmt=None, compression=None, batch_size=BATCH_SIZE):
+        if fmt is None:
+            fmt, inferred = infer_format(path)
+            compression = compression or inferred
+        if fmt not in FORMATS:
+            raise ValueError(f"Unknown output format: {fmt}")
+        if compression is not None and (fmt != "txt" or compression not in COMPRESSIONS):
+            raise ValueError(f"Unsupported compression for {fmt} output: {compression}")
+
+        self.path = path
+        self.fmt = fmt
+        self.compression = compression
+        self.batch_size = batch_size
+        self.rows = 0
+        self.temp_path = path + ".tmp"
+
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        self._raw = open(self.temp_path, "wb", buffering=BUFFER_SIZE)
+        self._stream = None
+        self._writer = None
+        try:
+            self._open()
+        except BaseException:
+            self._raw.close()
+            os.remove(self.temp_path)
+            raise
+
+    def _open(self):
+        if self.fmt == "txt":
+            if self.compression == "gzip":
+                import gzip
+                self._stream = gzip.GzipFile(fileobj=self._raw, mode="wb", compresslevel=6, mtime=0)
+            elif self.compression == "zstd":
+                try:
+                    import zstandard
+                except ImportError:
+                    raise ImportError("zstd output needs the zstandard package") from None
+                self._stream = zstandard.ZstdCompressor().stream_writer(self._raw, closefd=False)
+            else:
+                self._stream = self._raw
+            self._stream.write(("|".join(ENRICHED_HEADERS) + "\n").encode("utf-8"))
+            return
+
+        try:
+            import pyarrow as pa
+        except ImportError:
+            raise ImportError(f"{self.fmt} output needs the pyarrow package") from None
+        self._pa = pa
+        self._schema = _arrow_schema(pa)
+        if self.fmt == "parquet":
+            import pyarrow.parquet as pq
+            self._writer = pq.ParquetWriter(self._raw, self._schema)
+        else:
+            self._writer = pa.ipc.new_file(self._raw, self._schema)
+
+    def write(self, enriched):
+        """
+        Appends an EnrichedSales batch
+        """
+        for batch in enriched.batches(self.batch_size):
+            if self.fmt == "txt":
+                self._write_text(batch)
+            else:
+                self._write_arrow(batch)
+            self.rows += len(batch)
+
+    def _write_text(self, batch):
+        # Every catalog entry is formatted once; rows pick theirs by slot
+        suffixes = ["|".join(map(str, entry)) for entry in batch.catalog]
+        columns = [map(str, batch.column(field)) for field in TRANSACTION_FIELDS]
+        slots = batch.slots.tolist() if hasattr(batch.slots, "tolist") else batch.slots
+        columns.append([suffixes[slot] for slot in slots])
+
+        lines = "\n".join(map("|".join, zip(*columns)))
+        self._stream.write((lines + "\n").encode("utf-8"))
+
+    def _write_arrow(self, batch):
+        pa = self._pa
+        arrays = [
+            pa.array(batch.column(field), type=self._schema.field(field).type)
+            for field in ENRICHED_HEADERS
+        ]
+        record_batch = pa.RecordBatch.from_arrays(arrays, schema=self._schema)
+        if self.fmt == "parquet":
+            self._writer.write_table(pa.Table.from_batches([record_batch]))
+        else:
+            self._writer.write_batch(record_batch)
+
+    def close(self):
+        """
+        Finishes the file and renames it into place
+        """
+        if self._raw.closed:
+            return
+        if self._writer is not None:
+            self._writer.close()
+        if self._stream is not None and self._stream is not self._raw:
+            self._stream.close()
+        self._raw.close()
+        os.replace(self.temp_path, self.path)
+
+    def abort(self):
+        """
+        Discards the temp file without touching the destination
+        """
+        if self._raw.closed:
+            return
+        for stream in (self._writer, self._stream):
+            if stream is not None and stream is not self._raw:
+                try:
+                    stream.close()
+                except Exception:
+                    pass
+        self._raw.close()
+        os.remove(self.temp_path)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is None:
+            self.close()
+        else:
+            self.abort()
+        return False
@@ -0,0 +1,344 @@
+import csv
+
+import numpy as np
+import pandas as pd
+
+import file_handler as fh
+import records as rc
+
+# Columns read as pandas categoricals: each distinct value is converted or
+# checked once, then every row is just a small integer code
+CATEGORY_FIELDS = ("Date", "ProductID", "ProductName", "Quantity", "UnitPrice", "CustomerID", "Region")
+
+# Same number of fields as parse_rows expects
+_SEPARATORS = len(rc.FIELDS) - 1
+
+
+class SalesFrame:
+    """
+    Parsed transactions held in a pandas DataFrame
+
+    The pandas counterpart of TransactionTable: file_handler.validate_and_filter
+    and data_processor.aggregate_sales (and with it every analysis view)
+    accept it and run vectorized (masks and groupby) instead of looping
+    over records.
+    """
+
+    frame = True
+
+    def __init__(self, df):
+        self.df = df
+
+    def __len__(self):
+        return len(self.df)
+
+    def take(self, mask):
+        return SalesFrame(self.df[mask])
+
+    def category_mask(self, field, predicate):
+        """
+        Evaluates predicate once per distinct value and returns a row mask
+        """
+        column = self.df[field]
+        lookup = np.array([bool(predicate(value)) for value in column.cat.categories.tolist()], dtype=bool)
+        if not len(lookup):
+            return np.zeros(len(column), dtype=bool)
+        return lookup[column.cat.codes.to_numpy()]
+
+    def iter_records(self):
+        """
+        Yields one records.Transaction per row
+        """
+        df = self.df
+        columns = [df[field].tolist() for field in rc.FIELDS]
+        return iter(rc.from_rows(zip(*columns)))
+
+
+def _recode(column, convert):
+    """
+    Applies convert to every category of a categorical column; categories
+    that end up equal are merged
+    """
+    values = {}
+    mapping = [values.setdefault(convert(category), len(values)) for category in column.cat.categories.tolist()]
+    codes = column.cat.codes.to_numpy()
+    if len(codes) and len(mapping):
+        codes = np.array(mapping, dtype=np.int64)[codes]
+    return pd.Categorical.from_codes(codes, categories=list(values))
+
+
+def _numeric(column, convert, dtype):
+    """
+    Converts a categorical column of numbers once per distinct value
+    Returns (values, row mask of values that raised ValueError)
+    convert must raise ValueError for values dtype cannot hold
+    """
+    values = []
+    failed = []
+    for category in column.cat.categories.tolist():
+        try:
+            values.append(convert(category))
+            failed.append(False)
+        except ValueError:
+            values.append(0)
+            failed.append(True)
+
+    codes = column.cat.codes.to_numpy()
+    if not values:
+        return np.zeros(len(codes), dtype=dtype), np.zeros(len(codes), dtype=bool)
+    return np.array(values, dtype=dtype)[codes], np.array(failed, dtype=bool)[codes]
+
+
+def _read_csv(source, encoding):
+    return pd.read_csv(
+        source,
+        sep="|",
+        header=None,
+        skiprows=1,
+        names=rc.FIELDS,
+        dtype={field: "category" if field in CATEGORY_FIELDS else str for field in rc.FIELDS},
+        quoting=csv.QUOTE_NONE,
+        na_filter=False,
+        on_bad_lines="skip",
+        engine="c",
+        encoding=encoding
+    )
+
+
+def _count_separators(filename):
+    """
+    (separators in the header line, separators in the whole file)
+    """
+    with open(filename, "rb") as file:
+        header = file.readline().count(b"|")
+        total = header
+        for block in iter(lambda: file.read(fh.PARSE_BLOCK_SIZE), b""):
+            total += block.count(b"|")
+    return header, total
+
+
+def _read_lines(filename):
+    """
+    Line-by-line fallback: the lines file_handler would parse, rejoined
+    into a frame with only well-formed rows
+    """
+    import io
+
+    lines = [line for line in fh.iter_sales_lines(filename) if line.count("|") == _SEPARATORS]
+    return _read_csv(io.StringIO("\n".join(["|".join(rc.FIELDS)] + lines)), None)
+
+
+def read_frame(filename, encoding=None):
+    """
+    Reads and parses a sales file into a SalesFrame with the C CSV engine
+
+    Gives the same rows as file_handler.parse_transactions: ProductName
+    and UnitPrice are cleaned and Quantity / UnitPrice converted with
+    file_handler.parse_quantity / float() once per distinct value, rows
+    that do not convert are dropped. Files the C tokenizer cannot read the same way (rows with
+    missing fields, lines that do not decode) are read line by line.
+    """
+    encoding = encoding or fh.detect_encoding(filename) or fh.ENCODINGS[0]
+    try:
+        df = _read_csv(filename, encoding)
+        # The C tokenizer pads short rows with empty fields and skips long
+        # ones; either shows up as a separator count that does not add up
+        header, separators = _count_separators(filename)
+        if separators != header + _SEPARATORS * len(df):
+            df = _read_lines(filename)
+    except UnicodeDecodeError:
+        df = _read_lines(filename)
+
+    # Whole lines are stripped by file_handler: only the first and last
+    # fields can carry that whitespace
+    ids = df["TransactionID"]
+    padded = ~ids.str.startswith("T").to_numpy(dtype=bool)
+    if padded.any():
+        padded[padded] = ids[padded].str[:1].str.isspace().to_numpy(dtype=bool)
+    if padded.any():
+        ids = ids.copy()
+        ids[padded] = ids[padded].str.lstrip()
+        df["TransactionID"] = ids
+    df["Region"] = _recode(df["Region"], str.rstrip)
+
+    df["ProductName"] = _recode(df["ProductName"], lambda name: name.replace(",", ""))
+    quantity, bad_quantity = _numeric(df["Quantity"], fh.parse_quantity, np.int64)
+    unit_price, bad_price = _numeric(df["UnitPrice"], lambda price: float(price.replace(",", "")), np.float64)
+    df["Quantity"] = quantity
+    df["UnitPrice"] = unit_price
+    # 0 * inf is NaN, as in Python; no need to warn about it
+    with np.errstate(invalid="ignore"):
+        df["amount"] = quantity * unit_price
+
+    failed = bad_quantity | bad_price
+    if failed.any():
+        df = df[~failed]
+    return SalesFrame(df.reset_index(drop=True))
+
+
+def filter_frame(frame, region=None, min_amount=None, max_amount=None, date_from=None, date_to=None,
+                 collect_stats=False):
+    """
+    Validation rules and filters of file_handler.compile_filter as
+    vectorized masks; same return value as its run()
+    """
+    df = frame.df
+    quantity = df["Quantity"].to_numpy()
+    unit_price = df["UnitPrice"].to_numpy()
+    amount = df["amount"].to_numpy()
+
+    # Written as "not <= 0" like the Python rules, so NaN prices stay valid
+    valid = (
+        ~(quantity <= 0) &
+        ~(unit_price <= 0) &
+        df["TransactionID"].str.startswith("T").to_numpy(dtype=bool) &
+        frame.category_mask("ProductID", lambda v: v.startswith("P")) &
+        frame.category_mask("CustomerID", lambda v: v.startswith("C"))
+    )
+    valid_count = int(np.count_nonzero(valid))
+
+    stats = None
+    if collect_stats:
+        amounts = amount[valid]
+        regions = df["Region"][valid].unique()
+        stats = {
+            "regions": {name for name in regions.tolist() if name},
+            "min_amount": amounts.min().item() if len(amounts) else None,
+            "max_amount": amounts.max().item() if len(amounts) else None
+        }
+
+    keep = valid
+    by_region = 0
+    if region:
+        keep = keep & frame.category_mask("Region", lambda v: v == region)
+        by_region = valid_count - int(np.count_nonzero(keep))
+
+    by_date = 0
+    if date_from is not None or date_to is not None:
+        before = int(np.count_nonzero(keep))
+        keep = keep & frame.category_mask("Date", lambda v: (
+            (date_from is None or v >= date_from) and (date_to is None or v <= date_to)
+        ))
+        by_date = before - int(np.count_nonzero(keep))
+
+    by_amount = 0
+    if min_amount is not None or max_amount is not None:
+        before = int(np.count_nonzero(keep))
+        if min_amount is not None:
+            keep = keep & (amount >= min_amount)
+        if max_amount is not None:
+            keep = keep & (amount <= max_amount)
+        by_amount = before - int(np.count_nonzero(keep))
+
+    counts = {
+        "invalid": len(frame) - valid_count,
+        "filtered_by_region": by_region,
+        "filtered_by_date": by_date,
+        "filtered_by_amount": by_amount
+    }
+    return frame.take(keep), counts, stats
+
+
+def _group(df, field, columns=()):
+    """
+    Row count, amount total and the sums of columns per value of field,
+    in first-seen order: (value, count, amount, sums...) tuples
+
+    Counts and integer sums come from a pandas groupby. Amounts are summed
+    with np.bincount over the category codes, which adds row by row like
+    the Python loop; groupby's float sum is compensated (Kahan) and would
+    round some totals differently.
+    """
+    column = df[field]
+    grouped = df.groupby(field, observed=True, sort=False)
+    result = grouped[list(columns)].sum()
+    result.insert(0, "count", grouped.size())
+    # Same key order as a Python loop over the rows
+    result = result.loc[column.unique()]
+
+    totals = np.bincount(
+        column.cat.codes.to_numpy(), weights=df["amount"].to_numpy(),
+        minlength=len(column.cat.categories)
+    )
+    result.insert(1, "amount", totals[result.index.codes])
+    return zip(result.index.tolist(), *(result[name].tolist() for name in result.columns))
+
+
+def _distinct_pairs(df, field, other):
+    pairs = df[[field, other]].drop_duplicates()
+    return zip(pairs[field].tolist(), pairs[other].tolist())
+
+
+def aggregate_frame(frame, aggregates):
+    """
+    aggregate_sales for a SalesFrame: pandas groupby per dimension
+    """
+    df = frame.df
+
+    approx_error = aggregates["approx_error"]
+    if approx_error:
+        from sketches import HyperLogLog
+
+    def new_distinct():
+        return HyperLogLog(approx_error) if approx_error else {}
+
+    # Region totals
+    regions = aggregates["regions"]
+    for region, count, total in _group(df, "Region"):
+        entry = regions.setdefault(region, [0.0, 0])
+        entry[0] += total
+        entry[1] += count
+
+    # Product revenue and quantity
+    products = aggregates["products"]
+    for product, _, total, qty in _group(df, "ProductName", ("Quantity",)):
+        if aggregates["top_k"]:
+            products.add(product, total, qty)
+            continue
+        entry = products.setdefault(product, [0.0, 0])
+        entry[0] += total
+        entry[1] += qty
+
+    # Customer spend and distinct products
+    customers = aggregates["customers"]
+    for customer, count, total in _group(df, "CustomerID"):
+        entry = customers.get(customer)
+        if entry is None:
+            entry = customers[customer] = [0.0, 0, new_distinct()]
+        entry[0] += total
+        entry[1] += count
+    for customer, product in _distinct_pairs(df, "CustomerID", "ProductName"):
+        if approx_error:
+            customers[customer][2].add(product)
+        else:
+            customers[customer][2][product] = None
+
+    # Daily revenue and distinct customers
+    daily = aggregates["daily"]
+    for date, count, total in _group(df, "Date"):
+        entry = daily.get(date)
+        if entry is None:
+            entry = daily[date] = [0.0, 0, new_distinct()]
+        entry[0] += total
+        entry[1] += count
+    for date, customer in _distinct_pairs(df, "Date", "CustomerID"):
+        if approx_error:
+            daily[date][2].add(customer)
+        else:
+            daily[date][2][customer] = None
+
+    # Row by row, same rounding as the Python loop
+    amount = df["amount"].to_numpy()
+    if len(amount):
+        aggregates["total_revenue"] = float(np.cumsum(np.concatenate(([aggregates["total_revenue"]], amount)))[-1])
+    aggregates["transaction_count"] += len(df)
+
+    # Registered metrics still see one record per row
+    metrics = aggregates["metrics"]
+    extra = [(name, fns[1]) for name, fns in aggregates["metric_fns"].items()]
+    if extra:
+        for tx in frame.iter_records():
+            for name, update in extra:
+                metrics[name] = update(metrics[name], tx, tx.amount)
+
+    return aggregates
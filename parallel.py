@@ -0,0 +1,177 @@
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import data_processor as dp
+import file_handler as fh
+import logs
+import records as rc
+
+log = logs.get_logger(__name__)
+
+# Size of each byte range handed to a worker. The split depends only on
+# this value, never on the number of workers, so every worker count merges
+# the same partial results in the same order and prints identical output.
+BLOCK_SIZE = 32 * 1024 * 1024
+
+
+def plan_ranges(filename, block_size=BLOCK_SIZE):
+    """
+    Splits the file (after the header) into (start, end) byte ranges that
+    begin and end on line boundaries
+    """
+    size = os.path.getsize(filename)
+    ranges = []
+
+    with open(filename, "rb") as file:
+        file.readline()
+        start = file.tell()
+
+        while start < size:
+            end = min(start + block_size, size)
+            if end < size:
+                # Extend the range to the end of the line it stops in
+                file.seek(end)
+                file.readline()
+                end = file.tell()
+            ranges.append((start, end))
+            start = end
+
+    return ranges
+
+
+def _process_range(task):
+    """
+    Worker: parses, validates, filters and pre-aggregates one byte range
+    """
+    filename, start, end, encoding, filters, keep_rows, approx = task
+
+    line_count = 0
+
+    def counted(lines):
+        nonlocal line_count
+        for line in lines:
+            line_count += 1
+            yield line
+
+    transactions = fh.parse_transactions(
+        counted(fh.iter_range_lines(filename, start, end, encoding))
+    )
+
+    # -vvv: every parsed transaction (only reaches the log with workers=1;
+    # worker processes do not share the parent's log queue)
+    tracer = logs.row_tracer(log, "parsed transaction", rc.FIELDS)
+    if tracer is not None:
+        with tracer:
+            for tx in transactions:
+                tracer.add(*tx.values())
+
+    # Stats over every parsed row, shown before the filter prompt
+    regions = {region for region in map(rc.getter(True, "Region"), transactions) if region}
+    # NaN amounts (from "nan" prices) would make min() / max() depend on row order
+    amounts = [amount for amount in map(rc.getter(True, "amount"), transactions) if amount == amount]
+
+    valid, _, summary = fh.validate_and_filter(transactions, verbose=False, **filters)
+
+    aggregates = dp.aggregate_sales(valid, dp.new_aggregates(*approx))
+    # Metric functions may not be picklable; the parent merges with its own
+    aggregates["metric_fns"] = {}
+
+    return {
+        "line_count": line_count,
+        "regions": regions,
+        "min_amount": min(amounts) if amounts else None,
+        "max_amount": max(amounts) if amounts else None,
+        "summary": summary,
+        "aggregates": aggregates,
+        "rows": [tx.values() for tx in valid] if keep_rows else None
+    }
+
+
+def _merge_partials(partials, keep_rows, approx):
+    result = {
+        "line_count": 0,
+        "regions": set(),
+        "min_amount": None,
+        "max_amount": None,
+        "summary": {
+            "total_input": 0,
+            "invalid": 0,
+            "filtered_by_region": 0,
+            "filtered_by_date": 0,
+            "filtered_by_amount": 0,
+            "final_count": 0
+        },
+        "aggregates": dp.new_aggregates(*approx),
+        "transactions": [] if keep_rows else None
+    }
+    # Rows from every range share one symbol table
+    symbols = rc.SymbolTable()
+
+    # partials arrive in range order, which keeps the merge deterministic
+    for number, partial in enumerate(partials):
+        log.debug("Range processed", extra={"fields": dict(
+            range=number, lines=partial["line_count"], **partial["summary"]
+        )})
+        result["line_count"] += partial["line_count"]
+        result["regions"] |= partial["regions"]
+
+        if partial["min_amount"] is not None:
+            if result["min_amount"] is None or partial["min_amount"] < result["min_amount"]:
+                result["min_amount"] = partial["min_amount"]
+            if result["max_amount"] is None or partial["max_amount"] > result["max_amount"]:
+                result["max_amount"] = partial["max_amount"]
+
+        for key, value in partial["summary"].items():
+            result["summary"][key] += value
+
+        dp.merge_aggregates(result["aggregates"], partial["aggregates"])
+
+        if keep_rows:
+            result["transactions"].extend(rc.from_rows(partial["rows"], symbols))
+
+    result["regions"] = sorted(result["regions"])
+    return result
+
+
+def process_file(filename, workers=1, region=None, min_amount=None, max_amount=None,
+                 keep_rows=False, block_size=BLOCK_SIZE, approx_error=None, top_k=None,
+                 date_from=None, date_to=None):
+    """
+    Parses, validates, filters and aggregates a sales file range by range,
+    using a process pool when workers > 1
+
+    Returns a dict with:
+    - line_count, regions, min_amount, max_amount: stats over parsed rows
+    - summary: filter_summary counts as from validate_and_filter
+    - aggregates: merged aggregate_sales result
+    - transactions: the valid records.Transaction rows (only with keep_rows=True)
+
+    approx_error / top_k select the approximate aggregates described in
+    data_processor.new_aggregates; the sketches merge across ranges.
+    """
+    approx = (approx_error, top_k)
+    filters = {
+        "region": region,
+        "min_amount": min_amount,
+        "max_amount": max_amount,
+        "date_from": date_from,
+        "date_to": date_to
+    }
+    encoding = fh.detect_encoding(filename) or fh.ENCODINGS[0]
+    tasks = [
+        (filename, start, end, encoding, filters, keep_rows, approx)
+        for start, end in plan_ranges(filename, block_size)
+    ]
+
+    log.info("Processing sales file", extra={"fields": {
+        "file": filename, "ranges": len(tasks), "workers": workers, **filters
+    }})
+
+    if workers > 1 and len(tasks) > 1:
+        with ProcessPoolExecutor(max_workers=min(workers, len(tasks))) as pool:
+            result = _merge_partials(pool.map(_process_range, tasks), keep_rows, approx)
+    else:
+        result = _merge_partials(map(_process_range, tasks), keep_rows, approx)
+
+    log.info("Processed sales file", extra={"fields": dict(lines=result["line_count"], **result["summary"])})
+    return result
@@ -0,0 +1,301 @@
+import argparse
+import json
+import os
+import shutil
+import tempfile
+from urllib.parse import quote
+
+import file_handler as fh
+import records as rc
+import timeseries as ts
+
+# Bump when the directory layout or metadata change shape
+LAYOUT_VERSION = 2
+METADATA_FILE = "_metadata.json"
+PART_FILE = "part-0.txt"
+
+# Year / month of rows whose Date does not parse
+UNKNOWN = "unknown"
+
+HEADER = "|".join(rc.FIELDS)
+
+
+def partition_key(date):
+    """
+    (year, month) directory values for a Date
+    """
+    parsed = ts.parse_timestamp(date)
+    if parsed is None:
+        return UNKNOWN, UNKNOWN
+    return date[:4], date[5:7]
+
+
+def partition_path(year, month, region):
+    """
+    Partition directory relative to the dataset root; the region is
+    percent-encoded so any value is a valid directory name
+    """
+    return os.path.join(f"year={year}", f"month={month}", f"region={quote(region, safe='')}")
+
+
+def _new_partition(path, year, month, region):
+    return {
+        "path": path,
+        "year": year,
+        "month": month,
+        "region": region,
+        "rows": 0,
+        "invalid": 0,
+        # Ranges of the valid rows (None while there are none)
+        "min_date": None,
+        "max_date": None,
+        "min_amount": None,
+        "max_amount": None,
+        # Amount range of every parsed row, valid or not, as a flat file
+        # reports it before filtering
+        "parsed_min_amount": None,
+        "parsed_max_amount": None
+    }
+
+
+def _update_stats(partition, transactions):
+    """
+    Adds a parsed batch of one partition to its row counts and ranges
+    """
+    valid, counts, stats = fh.compile_filter()(transactions, collect_stats=True)
+    partition["rows"] += len(transactions)
+    partition["invalid"] += counts["invalid"]
+
+    ranges = []
+    amounts = [tx.amount for tx in transactions if tx.amount == tx.amount]
+    if amounts:
+        ranges += [("parsed_min_amount", min(amounts), min), ("parsed_max_amount", max(amounts), max)]
+    if valid:
+        dates = [tx.Date for tx in valid]
+        ranges += [
+            ("min_date", min(dates), min),
+            ("max_date", max(dates), max),
+            ("min_amount", stats["min_amount"], min),
+            ("max_amount", stats["max_amount"], max)
+        ]
+    for key, value, pick in ranges:
+        partition[key] = value if partition[key] is None else pick(partition[key], value)
+
+
+def ingest(source, root, chunk_size=fh.CHUNK_SIZE):
+    """
+    Rewrites a pipe-delimited sales file into a directory partitioned by
+    Date year / month and Region:
+
+        root/year=2024/month=12/region=North/part-0.txt
+        root/_metadata.json
+
+    Each part file is a sales file of its own (same header and lines).
+    _metadata.json holds, per partition, the parsed and invalid row counts,
+    the Date and amount ranges of its valid rows and the amount range of
+    all its parsed rows. Lines that do not parse (wrong field count, bad
+    Quantity or UnitPrice) are left out, as every reader skips them
+    anyway. The directory is built next to root and swapped in, replacing
+    a previous ingest; any other existing root is refused with
+    ValueError. Returns the metadata.
+    """
+    root = os.path.normpath(root)
+    if os.path.lexists(root) and not (os.path.isdir(root) and is_partitioned(root)):
+        raise ValueError(f"{root} exists and was not written by ingest; choose a new directory")
+
+    parent = os.path.dirname(os.path.abspath(root))
+    temp_root = tempfile.mkdtemp(prefix=os.path.basename(root) + ".", suffix=".tmp", dir=parent)
+    try:
+        metadata = _write_partitions(source, temp_root, chunk_size)
+    except BaseException:
+        shutil.rmtree(temp_root, ignore_errors=True)
+        raise
+
+    if os.path.exists(root):
+        # Move the previous ingest aside first: os.replace cannot
+        # overwrite a non-empty directory
+        old_root = tempfile.mkdtemp(prefix=os.path.basename(root) + ".", suffix=".old", dir=parent)
+        os.replace(root, os.path.join(old_root, "data"))
+        os.replace(temp_root, root)
+        shutil.rmtree(old_root, ignore_errors=True)
+    else:
+        os.replace(temp_root, root)
+    return metadata
+
+
+def _write_partitions(source, temp_root, chunk_size):
+    """
+    Writes the part files and _metadata.json of ingest() into temp_root
+    """
+    partitions = {}
+    keys = {}
+    symbols = rc.SymbolTable()
+    for chunk in fh.iter_chunks(fh.iter_sales_lines(source), chunk_size):
+        # Route lines by their Date and Region fields
+        batches = {}
+        for line in chunk:
+            parts = line.split("|")
+            if len(parts) != len(rc.FIELDS) or next(fh.parse_rows((line,)), None) is None:
+                continue
+            date, region = parts[1], parts[7]
+            year_month = keys.get(date)
+            if year_month is None:
+                year_month = keys[date] = partition_key(date)
+            batches.setdefault(year_month + (region,), []).append(line)
+
+        # One part file open at a time, however many partitions there are
+        for key, lines in batches.items():
+            partition = partitions.get(key)
+            path = os.path.join(temp_root, partition_path(*key), PART_FILE)
+            with_header = partition is None
+            if with_header:
+                partition = partitions[key] = _new_partition(partition_path(*key), *key)
+                os.makedirs(os.path.dirname(path))
+            with open(path, "a", encoding="utf-8") as file:
+                if with_header:
+                    file.write(HEADER + "\n")
+                file.write("\n".join(lines) + "\n")
+            _update_stats(partition, fh.parse_transactions(lines, symbols=symbols))
+
+    metadata = {
+        "layout_version": LAYOUT_VERSION,
+        "parser_version": fh.PARSER_VERSION,
+        "source": os.path.abspath(source),
+        "partitions": [partitions[key] for key in sorted(partitions)]
+    }
+    with open(os.path.join(temp_root, METADATA_FILE), "w", encoding="utf-8") as file:
+        json.dump(metadata, file, indent=2)
+    return metadata
+
+
+def is_partitioned(path):
+    return os.path.isfile(os.path.join(path, METADATA_FILE))
+
+
+def _overlaps(low, high, date_from, date_to):
+    if low is None:
+        return False
+    return (date_from is None or high >= date_from) and (date_to is None or low <= date_to)
+
+
+class PartitionedSales:
+    """
+    A directory written by ingest()
+
+    file_handler.validate_and_filter accepts it in place of a transaction
+    list: partitions whose region or Date range cannot match the filters
+    are skipped using the metadata alone, and only the remaining part
+    files are read and filtered. Rows come back in partition order
+    (year, month, region), then file order.
+    """
+
+    partitioned = True
+
+    def __init__(self, root):
+        with open(os.path.join(root, METADATA_FILE), "r", encoding="utf-8") as file:
+            metadata = json.load(file)
+        if metadata.get("layout_version") != LAYOUT_VERSION:
+            raise ValueError(f"{root} was written by another layout version; ingest it again")
+        self.root = root
+        self.metadata = metadata
+        self.partitions = metadata["partitions"]
+        # Paths of the part files read by the last scan (for inspection)
+        self.read_paths = []
+
+    def __len__(self):
+        return sum(partition["rows"] for partition in self.partitions)
+
+    def stats(self):
+        """
+        Regions and amount range of the valid rows, from the metadata
+        """
+        valid = [p for p in self.partitions if p["min_amount"] is not None]
+        return {
+            "regions": {p["region"] for p in valid if p["region"]},
+            "min_amount": min((p["min_amount"] for p in valid), default=None),
+            "max_amount": max((p["max_amount"] for p in valid), default=None)
+        }
+
+    def parsed_stats(self):
+        """
+        Regions and amount range of every parsed row, valid or not: what
+        parallel.process_file reports for the flat file
+        """
+        parsed = [p for p in self.partitions if p["parsed_min_amount"] is not None]
+        return {
+            "regions": {p["region"] for p in self.partitions if p["rows"] and p["region"]},
+            "min_amount": min((p["parsed_min_amount"] for p in parsed), default=None),
+            "max_amount": max((p["parsed_max_amount"] for p in parsed), default=None)
+        }
+
+    def read(self, partition, symbols=None):
+        """
+        Parsed rows (records.Transaction) of one partition
+        """
+        path = os.path.join(self.root, partition["path"], PART_FILE)
+        self.read_paths.append(path)
+        return fh.parse_transactions(fh.read_sales_data(path), symbols=symbols)
+
+    def scan(self, run, region=None, date_from=None, date_to=None, collect_stats=False):
+        """
+        Used by compile_filter: run (the compiled filter) is applied to the
+        partitions that can match; the others only add their valid rows to
+        filtered_by_region / filtered_by_date and their invalid ones to
+        invalid. Same return value as run.
+        """
+        kept = []
+        counts = {"invalid": 0, "filtered_by_region": 0, "filtered_by_date": 0, "filtered_by_amount": 0}
+        check_date = date_from is not None or date_to is not None
+        symbols = rc.SymbolTable()
+        self.read_paths = []
+
+        for partition in self.partitions:
+            valid_rows = partition["rows"] - partition["invalid"]
+            if region and partition["region"] != region:
+                counts["invalid"] += partition["invalid"]
+                counts["filtered_by_region"] += valid_rows
+                continue
+            if check_date and not _overlaps(partition["min_date"], partition["max_date"], date_from, date_to):
+                counts["invalid"] += partition["invalid"]
+                counts["filtered_by_date"] += valid_rows
+                continue
+
+            rows, part_counts, _ = run(self.read(partition, symbols))
+            kept.extend(rows)
+            for key, value in part_counts.items():
+                counts[key] += value
+
+        return kept, counts, self.stats() if collect_stats else None
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Partitioned sales data")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    ingest_ = commands.add_parser("ingest", help="rewrite a sales file into a partitioned directory")
+    ingest_.add_argument("source")
+    ingest_.add_argument("root")
+    ingest_.add_argument("--chunk-size", type=int, default=fh.CHUNK_SIZE)
+
+    show = commands.add_parser("show", help="list the partitions of a directory")
+    show.add_argument("root")
+    args = parser.parse_args(argv)
+
+    if args.command == "ingest":
+        try:
+            metadata = ingest(args.source, args.root, args.chunk_size)
+        except ValueError as error:
+            parser.error(str(error))
+        rows = sum(partition["rows"] for partition in metadata["partitions"])
+        print(f"Wrote {rows:,} rows in {len(metadata['partitions'])} partitions to {args.root}")
+        return 0
+
+    for partition in PartitionedSales(args.root).partitions:
+        print(f"{partition['path']:<40} {partition['rows']:>10,} rows  "
+              f"{partition['invalid']:>8,} invalid  "
+              f"{partition['min_date'] or '-'} .. {partition['max_date'] or '-'}")
+    return 0
+
+
+if __name__ == "__main__":
+    main()
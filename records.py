@@ -0,0 +1,126 @@
+from collections import namedtuple
+from operator import attrgetter, itemgetter
+
+FIELDS = (
+    "TransactionID", "Date", "ProductID", "ProductName",
+    "Quantity", "UnitPrice", "CustomerID", "Region"
+)
+
+_INDEX = {name: position for position, name in enumerate(FIELDS + ("amount",))}
+# Ordered like a transaction dict's keys and usable as a set (keys() >= ...)
+_KEYS = dict.fromkeys(FIELDS).keys()
+
+
+class SymbolTable:
+    """
+    Pool of distinct values; intern() returns the pooled copy, so every
+    row with Region "North" points at the same string object. One table
+    per dataset: it is freed together with the rows.
+    """
+
+    __slots__ = ("symbols",)
+
+    def __init__(self):
+        self.symbols = {}
+
+    def intern(self, value):
+        return self.symbols.setdefault(value, value)
+
+    def __len__(self):
+        return len(self.symbols)
+
+
+class Transaction(namedtuple("Transaction", FIELDS + ("amount",))):
+    """
+    Compact, immutable transaction record
+
+    A tuple of the FIELDS plus amount (Quantity * UnitPrice, computed once),
+    so a row costs one small tuple instead of a dict and its own copies of
+    every string. Fields read as attributes (tx.Region, fastest) or by
+    name like a transaction dict (tx["Region"], tx.get, keys, items), so
+    code written for dicts keeps working; dict(tx) gives the old dict.
+    """
+
+    __slots__ = ()
+
+    def __getitem__(self, key):
+        if key.__class__ is str:
+            return tuple.__getitem__(self, _INDEX[key])
+        return tuple.__getitem__(self, key)
+
+    def get(self, key, default=None):
+        position = _INDEX.get(key)
+        return default if position is None else tuple.__getitem__(self, position)
+
+    def __contains__(self, key):
+        return key in _KEYS
+
+    def keys(self):
+        return _KEYS
+
+    def values(self):
+        return self[:len(FIELDS)]
+
+    def items(self):
+        return zip(FIELDS, self[:len(FIELDS)])
+
+    def to_dict(self):
+        return dict(zip(FIELDS, self))
+
+
+def is_compact(transactions):
+    """
+    True when transactions is a non-empty list of Transactions
+
+    Only the first row is checked, so the test stays O(1) on hot paths:
+    lists come whole from from_rows (or are filtered from one), never
+    mixed with dicts.
+    """
+    return (
+        type(transactions) is list and
+        bool(transactions) and
+        type(transactions[0]) is Transaction
+    )
+
+
+def getter(compact, *fields):
+    """
+    C-level accessor returning the named fields of a row (a tuple for
+    several): by attribute for Transactions (compact=True), by key
+    otherwise, which works for dicts and Transactions alike
+    """
+    return attrgetter(*fields) if compact else itemgetter(*fields)
+
+
+def from_rows(rows, symbols=None):
+    """
+    List of Transactions from parse_rows tuples, with repeated values
+    interned; pass a SymbolTable to share them with rows parsed earlier
+    """
+    if symbols is None:
+        symbols = SymbolTable()
+    pool = symbols.symbols.setdefault
+    new = tuple.__new__
+
+    transactions = []
+    append = transactions.append
+    for transaction_id, date, product_id, product_name, quantity, unit_price, customer_id, region in rows:
+        amount = quantity * unit_price
+        # Prices and amounts repeat too; zeros are left alone because
+        # 0.0 == -0.0 would merge the two, and NaN because NaN != NaN
+        # would add a new entry for every row
+        append(new(Transaction, (
+            transaction_id, pool(date, date), pool(product_id, product_id),
+            pool(product_name, product_name), quantity,
+            pool(unit_price, unit_price) if unit_price and unit_price == unit_price else unit_price,
+            pool(customer_id, customer_id), pool(region, region),
+            pool(amount, amount) if amount and amount == amount else amount
+        )))
+    return transactions
+
+
+def from_records(records, symbols=None):
+    """
+    Transactions from transaction dicts (or Transactions)
+    """
+    return from_rows((tuple(tx[field] for field in FIELDS) for tx in records), symbols)
@@ -0,0 +1,249 @@
+import argparse
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlsplit
+
+import amount_index as ai
+import cube as cb
+import data_processor as dp
+import parallel as pl
+
+DATA_FILE = "sales_data.txt"
+HOST = "127.0.0.1"
+PORT = 8050
+
+# How often (seconds) a request may stat the source file for changes
+RELOAD_INTERVAL = 1.0
+CACHE_SIZE = 256
+
+# Endpoint -> (view, query parameters passed through to it)
+RANKING = ("top_n", "bottom_n", "limit")
+PARAMETER_TYPES = {"granularity": str}  # int unless listed
+ENDPOINTS = {
+    "region_wise_sales": (dp.region_wise_sales, RANKING),
+    "top_selling_products": (dp.top_selling_products, RANKING),
+    "customer_purchase_analysis": (dp.customer_purchase_analysis, RANKING),
+    "daily_sales_trend": (dp.daily_sales_trend, ("granularity",)),
+    "rolling_revenue": (dp.rolling_revenue, ("window", "granularity")),
+    "find_peak_sales_day": (dp.find_peak_sales_day, ()),
+    "find_peak_periods": (dp.find_peak_periods, ()),
+    "low_performing_products": (dp.low_performing_products, ("threshold",) + RANKING),
+}
+FILTERS = ("region", "product", "date_from", "date_to", "min_amount", "max_amount")
+
+
+def _signature(filename):
+    stat = os.stat(filename)
+    return stat.st_mtime_ns, stat.st_size
+
+
+class Dataset:
+    """
+    Valid transactions of one version of the source file, with a SalesCube
+    and an AmountIndex built once at load
+    """
+
+    def __init__(self, filename, workers=1):
+        self.filename = filename
+        self.signature = _signature(filename)
+        scan = pl.process_file(filename, workers=workers, keep_rows=True)
+        self.transactions = scan["transactions"]
+        self.summary = scan["summary"]
+        self.cube = cb.SalesCube.from_transactions(self.transactions).materialize()
+        self.index = ai.AmountIndex.from_transactions(self.transactions)
+        self.loaded_at = time.time()
+
+    def aggregates(self, region=None, product=None, date_from=None, date_to=None,
+                   min_amount=None, max_amount=None):
+        """
+        Aggregates for a filtered slice: a cube slice, or an amount index
+        selection when an amount range is given
+        """
+        if min_amount is None and max_amount is None:
+            return self.cube.aggregates(region=region, product=product,
+                                        date_from=date_from, date_to=date_to)
+
+        rows = ai.take(self.transactions, self.index.select(min_amount, max_amount, region))
+        if product is not None or date_from is not None or date_to is not None:
+            rows = [
+                tx for tx in rows
+                if (product is None or tx["ProductName"] == product) and
+                (date_from is None or tx["Date"] >= date_from) and
+                (date_to is None or tx["Date"] <= date_to)
+            ]
+        return dp.aggregate_sales(rows)
+
+
+class AnalyticsService:
+    """
+    Keeps a Dataset warm, answers view queries from it and caches the
+    encoded results; a changed source file (mtime or size) is reloaded
+    on the next request and the cache dropped
+    """
+
+    def __init__(self, filename=DATA_FILE, workers=1, cache_size=CACHE_SIZE,
+                 reload_interval=RELOAD_INTERVAL):
+        self.filename = filename
+        self.workers = workers
+        self.cache_size = cache_size
+        self.reload_interval = reload_interval
+        self.dataset = Dataset(filename, workers)
+        self.cache = OrderedDict()
+        self.lock = threading.Lock()
+        self.checked_at = time.monotonic()
+        self.reloading = False
+        self.reloads = 0
+
+    def refresh(self):
+        """
+        Reloads the dataset if the source file changed; returns the current one
+        """
+        now = time.monotonic()
+        if now - self.checked_at < self.reload_interval:
+            return self.dataset
+
+        # Only one request claims the reload; the others keep answering
+        # from the current dataset while the new one is built
+        with self.lock:
+            if self.reloading or now - self.checked_at < self.reload_interval:
+                return self.dataset
+            self.checked_at = now
+            self.reloading = True
+
+        try:
+            try:
+                changed = _signature(self.filename) != self.dataset.signature
+            except FileNotFoundError:
+                # Keep serving the last good data while the file is replaced
+                changed = False
+            if changed:
+                dataset = Dataset(self.filename, self.workers)
+                with self.lock:
+                    self.dataset = dataset
+                    self.cache.clear()
+                    self.reloads += 1
+        finally:
+            with self.lock:
+                self.reloading = False
+        return self.dataset
+
+    def query(self, endpoint, params):
+        """
+        Returns the JSON-encoded result of a view for the given filters
+        """
+        view, options = ENDPOINTS[endpoint]
+        dataset = self.refresh()
+
+        filters = {}
+        for name in FILTERS:
+            value = params.get(name)
+            if value:
+                filters[name] = float(value) if name.endswith("_amount") else value
+
+        kwargs = {
+            name: PARAMETER_TYPES.get(name, int)(params[name])
+            for name in options if params.get(name)
+        }
+
+        key = (dataset.signature, endpoint, tuple(sorted(kwargs.items())), tuple(sorted(filters.items())))
+        with self.lock:
+            body = self.cache.get(key)
+            if body is not None:
+                self.cache.move_to_end(key)
+                return body
+
+        result = view(dataset.aggregates(**filters), **kwargs)
+        body = json.dumps(result).encode("utf-8")
+
+        with self.lock:
+            self.cache[key] = body
+            if len(self.cache) > self.cache_size:
+                self.cache.popitem(last=False)
+        return body
+
+    def status(self):
+        dataset = self.refresh()
+        return json.dumps({
+            "file": dataset.filename,
+            "transactions": len(dataset.transactions),
+            "invalid": dataset.summary["invalid"],
+            "loaded_at": dataset.loaded_at,
+            "reloads": self.reloads,
+            "cached_results": len(self.cache),
+            "endpoints": sorted(ENDPOINTS)
+        }).encode("utf-8")
+
+
+class RequestHandler(BaseHTTPRequestHandler):
+    """
+    GET /<view>?region=..&product=..&date_from=..&date_to=..
+        &min_amount=..&max_amount=..[&top_n=..|&bottom_n=..][&limit=..][&threshold=..]
+        [&granularity=hour|day|week|month][&window=..]
+    GET /status
+    """
+
+    service = None
+
+    def do_GET(self):
+        url = urlsplit(self.path)
+        endpoint = url.path.strip("/")
+        params = {name: values[-1] for name, values in parse_qs(url.query).items()}
+
+        try:
+            if endpoint in ("", "status"):
+                self._send(200, self.service.status())
+            elif endpoint in ENDPOINTS:
+                self._send(200, self.service.query(endpoint, params))
+            else:
+                self._send_error(404, f"Unknown endpoint: {endpoint}")
+        except ValueError as error:
+            self._send_error(400, str(error))
+        except Exception as error:
+            self._send_error(500, str(error))
+
+    def _send(self, status, body):
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _send_error(self, status, message):
+        self._send(status, json.dumps({"error": message}).encode("utf-8"))
+
+    def log_message(self, format, *args):
+        # Keep the console quiet; one line per request adds up under load
+        pass
+
+
+def serve(filename=DATA_FILE, host=HOST, port=PORT, workers=1):
+    service = AnalyticsService(filename, workers)
+    handler = type("Handler", (RequestHandler,), {"service": service})
+    server = ThreadingHTTPServer((host, port), handler)
+    print(f"Loaded {len(service.dataset.transactions)} transactions from {filename}")
+    print(f"Serving on http://{host}:{server.server_address[1]}/")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Sales analytics query service")
+    parser.add_argument("--file", default=DATA_FILE)
+    parser.add_argument("--host", default=HOST)
+    parser.add_argument("--port", type=int, default=PORT)
+    parser.add_argument("--workers", type=int, default=1,
+                        help="processes used to parse the sales file on (re)load")
+    args = parser.parse_args(argv)
+    serve(args.file, args.host, args.port, args.workers)
+
+
+if __name__ == "__main__":
+    main()
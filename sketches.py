@@ -0,0 +1,158 @@
+import math
+from hashlib import blake2b
+
+
+def _hash64(value):
+    # Stable across processes and runs (unlike hash()), so sketches built
+    # by different workers or saved to disk can be merged
+    return int.from_bytes(blake2b(str(value).encode("utf-8"), digest_size=8).digest(), "big")
+
+
+class HyperLogLog:
+    """
+    Mergeable distinct-count sketch
+
+    error is the target relative standard error; the sketch uses
+    2**precision one-byte registers with 1.04 / sqrt(2**precision) <= error.
+    Small sketches stay sparse (a dict of touched registers) and switch to
+    a dense bytearray once that would be smaller.
+    """
+
+    __slots__ = ("precision", "registers", "sparse")
+
+    def __init__(self, error=0.02):
+        precision = math.ceil(math.log2((1.04 / error) ** 2))
+        self.precision = min(max(precision, 4), 18)
+        self.sparse = {}
+        self.registers = None
+
+    @property
+    def size(self):
+        return 1 << self.precision
+
+    def add(self, value):
+        h = _hash64(value)
+        index = h >> (64 - self.precision)
+        rest_bits = 64 - self.precision
+        rank = rest_bits - (h & ((1 << rest_bits) - 1)).bit_length() + 1
+
+        if self.registers is not None:
+            if rank > self.registers[index]:
+                self.registers[index] = rank
+            return
+
+        if rank > self.sparse.get(index, 0):
+            self.sparse[index] = rank
+            # A dict entry costs far more than a register byte
+            if len(self.sparse) * 16 > self.size:
+                self._densify()
+
+    def _densify(self):
+        registers = bytearray(self.size)
+        for index, rank in self.sparse.items():
+            registers[index] = rank
+        self.registers = registers
+        self.sparse = None
+
+    def merge(self, other):
+        """
+        Folds other (same error setting) into this sketch
+        """
+        if other.precision != self.precision:
+            raise ValueError("Cannot merge HyperLogLog sketches with different precision")
+
+        if other.registers is None:
+            for index, rank in other.sparse.items():
+                if self.registers is not None:
+                    if rank > self.registers[index]:
+                        self.registers[index] = rank
+                elif rank > self.sparse.get(index, 0):
+                    self.sparse[index] = rank
+            if self.registers is None and len(self.sparse) * 16 > self.size:
+                self._densify()
+            return self
+
+        if self.registers is None:
+            self._densify()
+        self.registers = bytearray(map(max, self.registers, other.registers))
+        return self
+
+    def count(self):
+        m = self.size
+        if self.registers is None:
+            ranks = list(self.sparse.values())
+            zeros = m - len(ranks)
+            harmonic = zeros + sum(2.0 ** -rank for rank in ranks)
+        else:
+            zeros = self.registers.count(0)
+            harmonic = sum(2.0 ** -rank for rank in self.registers)
+
+        alpha = 0.7213 / (1 + 1.079 / m)
+        estimate = alpha * m * m / harmonic
+
+        # Linear counting is more accurate for small cardinalities
+        if estimate <= 2.5 * m and zeros:
+            estimate = m * math.log(m / zeros)
+        return int(round(estimate))
+
+    def __len__(self):
+        return self.count()
+
+
+class TopK:
+    """
+    Mergeable heavy-hitter sketch for weighted totals (batch Space-Saving)
+
+    Tracks at most 2 * capacity keys as key -> [weight, quantity]. When
+    full it keeps the capacity heaviest keys; a new key then starts from
+    the largest weight pruned so far (floor), so reported weights are
+    overestimates by at most floor, and every key whose true weight
+    exceeds floor is guaranteed to be tracked.
+    """
+
+    def __init__(self, capacity=100):
+        self.capacity = capacity
+        self.floor = 0.0
+        self.counters = {}
+
+    def add(self, key, weight, quantity=0):
+        entry = self.counters.get(key)
+        if entry is None:
+            if len(self.counters) >= 2 * self.capacity:
+                self._prune()
+            entry = self.counters[key] = [self.floor, 0]
+        entry[0] += weight
+        entry[1] += quantity
+
+    def _prune(self):
+        ranked = sorted(self.counters.items(), key=lambda item: item[1][0], reverse=True)
+        kept = ranked[:self.capacity]
+        if len(ranked) > self.capacity:
+            self.floor = max(self.floor, ranked[self.capacity][1][0])
+        self.counters = dict(kept)
+
+    def merge(self, other):
+        """
+        Folds other into this sketch; a key missing from one side counts
+        as that side's floor, its largest possible untracked weight
+        """
+        keys = dict.fromkeys(self.counters)
+        keys.update(dict.fromkeys(other.counters))
+
+        merged = {}
+        for key in keys:
+            mine = self.counters.get(key, (self.floor, 0))
+            theirs = other.counters.get(key, (other.floor, 0))
+            merged[key] = [mine[0] + theirs[0], mine[1] + theirs[1]]
+
+        self.floor += other.floor
+        self.counters = merged
+        if len(self.counters) > 2 * self.capacity:
+            self._prune()
+        return self
+
+    def items(self):
+        return self.counters.items()
+
+    def __len__(self):
+        return len(self.counters)
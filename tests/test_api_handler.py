@@ -0,0 +1,168 @@
+import hashlib
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+import pytest
+
+import api_handler as ah
+
+PRODUCTS = [{"id": number, "title": f"Product {number}"} for number in range(1, 251)]
+
+
+def page_etag(body):
+    return '"' + hashlib.sha256(body).hexdigest()[:16] + '"'
+
+
+class CatalogStub(BaseHTTPRequestHandler):
+    """
+    dummyjson-style /products endpoint: limit / skip pages, an ETag per
+    page, and a number of 503 answers before it starts working
+    """
+
+    def do_GET(self):
+        server = self.server
+        query = parse_qs(urlparse(self.path).query)
+        with server.lock:
+            server.requests.append((self.path, dict(self.headers)))
+            failing = server.failures > 0
+            server.failures -= failing
+
+        if failing:
+            self.send_response(503)
+            self.end_headers()
+            return
+
+        limit = int(query.get("limit", ["30"])[0])
+        skip = int(query.get("skip", ["0"])[0])
+        body = json.dumps({
+            "products": server.products[skip:skip + limit],
+            "total": len(server.products),
+            "skip": skip,
+            "limit": limit
+        }).encode()
+        etag = page_etag(body)
+        if self.headers.get("If-None-Match") == etag:
+            self.send_response(304)
+            self.end_headers()
+            return
+
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("ETag", etag)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def stub():
+    server = ThreadingHTTPServer(("127.0.0.1", 0), CatalogStub)
+    server.lock = threading.Lock()
+    server.requests = []
+    server.failures = 0
+    server.products = list(PRODUCTS)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+def make_client(server, tmp_path, **options):
+    options.setdefault("backoff", 0)
+    return ah.CatalogClient(
+        base_url=f"http://127.0.0.1:{server.server_address[1]}/products",
+        cache_file=str(tmp_path / "catalog.json"),
+        page_size=100,
+        **options
+    )
+
+
+def test_fetch_all_reads_every_page_in_order(stub, tmp_path):
+    client = make_client(stub, tmp_path)
+    assert client.fetch_all() == PRODUCTS
+    skips = sorted(parse_qs(urlparse(path).query)["skip"][0] for path, _ in stub.requests)
+    assert skips == ["0", "100", "200"]
+    client.close()
+
+
+def test_fresh_cache_is_used_without_a_request(stub, tmp_path):
+    make_client(stub, tmp_path).fetch_all()
+    stub.requests.clear()
+    assert make_client(stub, tmp_path).fetch_all() == PRODUCTS
+    assert stub.requests == []
+
+
+def test_expired_cache_is_revalidated_page_by_page(stub, tmp_path):
+    make_client(stub, tmp_path).fetch_all()
+    stub.requests.clear()
+
+    assert make_client(stub, tmp_path, ttl=0).fetch_all() == PRODUCTS
+    assert len(stub.requests) == 3
+    assert len({headers.get("If-None-Match") for _, headers in stub.requests}) == 3
+
+
+def test_a_change_on_a_later_page_is_fetched(stub, tmp_path):
+    make_client(stub, tmp_path).fetch_all()
+    stub.products[230] = {"id": 231, "title": "Renamed"}
+
+    products = make_client(stub, tmp_path, ttl=0).fetch_all()
+    assert products == stub.products
+    assert products[230]["title"] == "Renamed"
+
+    # ... and kept in the cache
+    assert make_client(stub, tmp_path).fetch_all() == stub.products
+
+
+def test_retries_with_backoff_on_5xx(stub, tmp_path, monkeypatch):
+    sleeps = []
+    monkeypatch.setattr(ah.time, "sleep", sleeps.append)
+    stub.failures = 2
+
+    client = make_client(stub, tmp_path, retries=3, backoff=0.5)
+    assert client.fetch_all() == PRODUCTS
+    assert sleeps == [0.5, 1.0]
+
+
+def test_gives_up_after_the_last_retry(stub, tmp_path, monkeypatch):
+    import requests
+
+    monkeypatch.setattr(ah.time, "sleep", lambda seconds: None)
+    stub.failures = 10
+    with pytest.raises(requests.HTTPError):
+        make_client(stub, tmp_path, retries=2).fetch_all()
+    assert len(stub.requests) == 3
+
+
+def test_stale_cache_is_returned_when_the_api_is_down(stub, tmp_path, monkeypatch):
+    import requests
+
+    monkeypatch.setattr(ah.time, "sleep", lambda seconds: None)
+    make_client(stub, tmp_path).fetch_all()
+    stub.failures = 10
+
+    assert make_client(stub, tmp_path, ttl=0, retries=1).fetch_all() == PRODUCTS
+
+    (tmp_path / "catalog.json").unlink()
+    with pytest.raises(requests.RequestException):
+        make_client(stub, tmp_path, ttl=0, retries=1).fetch_all()
+
+
+def test_each_thread_gets_its_own_session(stub, tmp_path):
+    client = make_client(stub, tmp_path)
+    sessions = []
+    threads = [threading.Thread(target=lambda: sessions.append(client.session)) for _ in range(3)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert len({id(session) for session in sessions}) == 3
+    assert client.session is client.session
+    client.close()
+    assert client._sessions == []
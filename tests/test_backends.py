@@ -0,0 +1,176 @@
+import os
+import random
+
+import pytest
+
+import backends
+import data_processor as dp
+import generate_sales_data as gen
+import main
+import parallel as pl
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+SALES_FILE = os.path.join(ROOT, "sales_data.txt")
+
+FILTERS = [
+    {},
+    {"region": "North"},
+    {"min_amount": 1000, "max_amount": 200000},
+    {"date_from": "2024-12-05", "date_to": "2024-12-20"},
+    {"region": "East", "min_amount": 5000, "date_to": "2024-12-15"}
+]
+
+
+def same(a, b):
+    """
+    Exact equality that also holds for NaN == NaN and checks key order
+    """
+    if isinstance(a, float) and isinstance(b, float) and a != a:
+        return b != b
+    if isinstance(a, dict):
+        return isinstance(b, dict) and list(a) == list(b) and all(same(a[key], b[key]) for key in a)
+    if isinstance(a, (list, tuple)):
+        return isinstance(b, (list, tuple)) and len(a) == len(b) and all(map(same, a, b))
+    return a == b
+
+
+def views(filename, backend, **filters):
+    valid, summary = backends.load(filename, backend, **filters)
+    aggregates = dp.aggregate_sales(valid)
+    return [
+        summary,
+        aggregates["total_revenue"],
+        dp.region_wise_sales(aggregates),
+        dp.top_selling_products(aggregates, top_n=None),
+        dp.customer_purchase_analysis(aggregates),
+        dp.daily_sales_trend(aggregates),
+        dp.find_peak_sales_day(aggregates),
+        dp.low_performing_products(aggregates)
+    ]
+
+
+def dirty_line(rng, line):
+    """
+    Damages a clean line the way real exports do
+    """
+    fields = line.split("|")
+    kind = rng.randrange(9)
+    if kind == 0:
+        fields[5] = rng.choice(["nan", "NaN", "inf", "-inf"])
+    elif kind == 1:
+        fields[4] = rng.choice(["12345678901234567890", "-99999999999999999999", "9" * 25])
+    elif kind == 2:
+        fields = fields[:rng.randrange(1, 8)]
+    elif kind == 3:
+        fields.append("extra")
+    elif kind == 4:
+        fields[4] = rng.choice(["", "abc", "1.5", "-3", " 7"])
+    elif kind == 5:
+        fields[5] = rng.choice(["", "1,2,3.5", "12.5.1", "0", "-40"])
+    elif kind == 6:
+        fields[7] = rng.choice(["North ", "", "Søuth"])
+    elif kind == 7:
+        return "  " + "|".join(fields) + "\t"
+    else:
+        return ""
+    return "|".join(fields)
+
+
+@pytest.fixture(scope="module", params=[1, 2, 3])
+def dirty_file(request, tmp_path_factory):
+    rng = random.Random(request.param)
+    path = tmp_path_factory.mktemp("dirty") / f"dirty_{request.param}.txt"
+    lines = [gen.HEADER]
+    for line in gen.iter_rows(3000, dirty_ratio=0.2, seed=request.param):
+        lines.append(dirty_line(rng, line) if rng.random() < 0.15 else line)
+    path.write_text("\n".join(lines) + "\n", encoding="utf-8")
+    return str(path)
+
+
+@pytest.mark.parametrize("backend", ["numpy", "pandas"])
+@pytest.mark.parametrize("filters", FILTERS)
+def test_backends_match_python_on_sales_data(backend, filters):
+    assert same(views(SALES_FILE, backend, **filters), views(SALES_FILE, "python", **filters))
+
+
+@pytest.mark.parametrize("backend", ["numpy", "pandas"])
+@pytest.mark.parametrize("filters", FILTERS)
+def test_backends_match_python_on_dirty_data(dirty_file, backend, filters):
+    assert same(views(dirty_file, backend, **filters), views(dirty_file, "python", **filters))
+
+
+def test_quantities_outside_int64_are_rejected_by_every_backend(tmp_path):
+    path = tmp_path / "overflow.txt"
+    path.write_text("\n".join([
+        gen.HEADER,
+        "T001|2024-12-01|P101|Laptop|2|45000|C001|North",
+        "T002|2024-12-01|P101|Laptop|12345678901234567890|45000|C001|North",
+        "T003|2024-12-02|P102|Mouse|9223372036854775807|1|C002|South"
+    ]) + "\n", encoding="utf-8")
+
+    for backend in backends.backends():
+        assert views(str(path), backend)[0]["final_count"] == 2
+
+
+def test_long_text_fields_do_not_widen_the_block(tmp_path, monkeypatch):
+    fp = pytest.importorskip("fast_parser")
+    lines = [gen.HEADER] + list(gen.iter_rows(500, seed=5))
+    fields = lines[100].split("|")
+    fields[3] = "Laptop " + "x" * 5000
+    lines[100] = "|".join(fields)
+    lines[200] = lines[200].replace("|C", "|C" + "9" * 3000, 1)
+    path = tmp_path / "long.txt"
+    path.write_text("\n".join(lines) + "\n", encoding="utf-8")
+
+    widths = []
+    strings = fp._strings
+    monkeypatch.setattr(fp, "_strings", lambda buf, starts, lengths: (
+        widths.append(int(lengths.max()) if len(lengths) else 0) or strings(buf, starts, lengths)
+    ))
+    assert same(views(str(path), "numpy"), views(str(path), "python"))
+    assert widths and max(widths) <= fp.MAX_STRING_WIDTH
+
+
+@pytest.mark.parametrize("backend", backends.backends())
+def test_nan_amounts_do_not_hide_the_amount_range(tmp_path, backend):
+    path = tmp_path / "nan.txt"
+    path.write_text("\n".join([
+        gen.HEADER,
+        "T001|2024-12-01|P101|Laptop|2|nan|C001|North",
+        "T002|2024-12-01|P102|Mouse|3|500|C002|South",
+        "T003|2024-12-02|P103|Cable|1|40|C003|East"
+    ]) + "\n", encoding="utf-8")
+
+    args = main.parse_args(["--file", str(path), "--backend", backend])
+    approx = {"approx_error": None, "top_k": None}
+    scan = main.backend_scan(args, approx) if backend != "python" else pl.process_file(str(path))
+    assert (scan["min_amount"], scan["max_amount"]) == (40.0, 1500.0)
+
+
+@pytest.mark.parametrize("backend", ["numpy", "pandas"])
+def test_main_backend_scan_matches_process_file(dirty_file, backend):
+    args = main.parse_args(["--file", dirty_file, "--backend", backend, "--region", "North"])
+    scan = main.backend_scan(args, {"approx_error": None, "top_k": None})
+    reference = pl.process_file(dirty_file, region="North", keep_rows=True)
+
+    for key in ("regions", "min_amount", "max_amount", "summary"):
+        assert same(scan[key], reference[key]), key
+    assert same(dict(scan["aggregates"], metric_fns=None), dict(reference["aggregates"], metric_fns=None))
+    assert [tx["TransactionID"] for tx in scan["transactions"]] == [
+        tx["TransactionID"] for tx in reference["transactions"]
+    ]
+
+
+def test_main_streams_the_default_path_to_the_same_output(dirty_file, tmp_path):
+    catalog = [{"id": number, "title": f"Product {number}", "category": "misc"} for number in range(101, 111)]
+    outputs = []
+    for backend in ("python", "numpy"):
+        output = str(tmp_path / f"{backend}.txt")
+        args = main.parse_args(["--file", dirty_file, "--backend", backend, "--region", "North",
+                                "--output", output])
+        result = main.analyze_file(args)
+        assert (result["transactions"] is None) == (backend == "python")
+        assert main.enrich_and_save(args, result, catalog)[0] == result["summary"]["final_count"]
+        with open(output, encoding="utf-8") as file:
+            outputs.append(file.read())
+    assert outputs[0] == outputs[1]
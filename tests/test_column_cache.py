@@ -0,0 +1,98 @@
+import os
+
+import pytest
+
+import column_cache as cc
+import file_handler as fh
+import generate_sales_data as gen
+
+pytest.importorskip("numpy")
+
+
+@pytest.fixture
+def sales_file(tmp_path):
+    path = tmp_path / "sales.txt"
+    path.write_text("\n".join([gen.HEADER] + list(gen.iter_rows(800, days=30))) + "\n", encoding="utf-8")
+    return str(path)
+
+
+@pytest.fixture
+def builds(monkeypatch):
+    calls = []
+    build_table = cc.build_table
+
+    def counting(filename):
+        calls.append(filename)
+        return build_table(filename)
+
+    monkeypatch.setattr(cc, "build_table", counting)
+    return calls
+
+
+def test_cache_is_reused_while_the_file_is_unchanged(sales_file, builds):
+    table, summary = cc.load_table(sales_file)
+    cached, cached_summary = cc.load_table(sales_file)
+
+    assert len(builds) == 1
+    assert cached_summary == summary
+    assert cached.column("TransactionID") == table.column("TransactionID")
+    assert cached.amount.tolist() == table.amount.tolist()
+
+
+def test_changed_file_is_parsed_again(sales_file, builds):
+    _, summary = cc.load_table(sales_file)
+    with open(sales_file, "a", encoding="utf-8") as file:
+        file.write("T9001|2024-12-03|P101|Laptop|2|4491|C001|North\n")
+
+    table, new_summary = cc.load_table(sales_file)
+    assert len(builds) == 2
+    assert new_summary["total_input"] == summary["total_input"] + 1
+    assert table.column("TransactionID")[-1] == "T9001"
+
+
+def test_same_size_rewrite_is_parsed_again(sales_file, builds):
+    cc.load_table(sales_file)
+    with open(sales_file, "r+b") as file:
+        data = file.read()
+        file.seek(0)
+        file.write(data.replace(b"North", b"NORTH"))
+    stat = os.stat(sales_file)
+    os.utime(sales_file, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10 ** 9))
+
+    table, summary = cc.load_table(sales_file)
+    assert len(builds) == 2
+    assert "NORTH" in summary["regions"]
+
+
+def test_new_parser_version_invalidates_the_cache(sales_file, builds, monkeypatch):
+    cc.load_table(sales_file)
+    monkeypatch.setattr(fh, "PARSER_VERSION", fh.PARSER_VERSION + 1)
+    cc.load_table(sales_file)
+    cc.load_table(sales_file)
+    assert len(builds) == 2
+
+
+def test_damaged_cache_is_rebuilt(sales_file, builds):
+    cc.load_table(sales_file)
+    cache_dir = cc.default_cache_dir(sales_file)
+    for name in os.listdir(cache_dir):
+        with open(os.path.join(cache_dir, name), "wb") as file:
+            file.write(b"garbage")
+
+    table, summary = cc.load_table(sales_file)
+    assert len(builds) == 2
+    assert len(table) == summary["total_input"] - summary["invalid"]
+
+
+def test_concurrent_builds_do_not_clobber_each_other(sales_file, tmp_path):
+    from concurrent.futures import ThreadPoolExecutor
+
+    with ThreadPoolExecutor(max_workers=4) as pool:
+        results = list(pool.map(lambda _: cc.load_table(sales_file, mmap=False), range(8)))
+
+    assert all(summary == results[0][1] for _, summary in results)
+    assert all(table.column("TransactionID") == results[0][0].column("TransactionID") for table, _ in results)
+    # Only the cache itself is left behind
+    assert sorted(os.listdir(tmp_path)) == ["sales.txt", "sales.txt.colcache"]
+    table, summary = cc.load_table(sales_file)
+    assert summary == results[0][1]
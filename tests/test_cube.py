@@ -0,0 +1,106 @@
+import pytest
+
+import cube as cb
+import generate_sales_data as gen
+import parallel as pl
+
+
+@pytest.fixture(scope="module")
+def sales_file(tmp_path_factory):
+    path = tmp_path_factory.mktemp("cube") / "sales.txt"
+    path.write_text("\n".join([gen.HEADER] + list(gen.iter_rows(3000, days=45))) + "\n", encoding="utf-8")
+    return str(path)
+
+
+@pytest.fixture(scope="module")
+def transactions(sales_file):
+    return pl.process_file(sales_file, keep_rows=True)["transactions"]
+
+
+def brute_force(transactions, by, keep=lambda tx: True):
+    totals = {}
+    for tx in transactions:
+        if not keep(tx):
+            continue
+        key = tx[by[0]] if len(by) == 1 else tuple(tx[field] for field in by)
+        cell = totals.setdefault(key, [0.0, 0, 0])
+        cell[0] += tx["Quantity"] * tx["UnitPrice"]
+        cell[1] += tx["Quantity"]
+        cell[2] += 1
+    return totals
+
+
+def assert_same_totals(result, expected):
+    assert list(result) == list(expected)
+    for key, (amount, quantity, count) in result.items():
+        assert amount == pytest.approx(expected[key][0])
+        assert (quantity, count) == tuple(expected[key][1:])
+
+
+@pytest.mark.parametrize("by", [("Region",), ("ProductName", "Region"), ("Date", "CustomerID"), ("CustomerID",)])
+def test_rollups_match_a_group_by(transactions, by):
+    cube = cb.SalesCube.from_transactions(transactions).materialize()
+    assert_same_totals(cube.query(by=by), brute_force(transactions, by))
+
+
+def test_rollups_are_built_from_the_smallest_materialized_cuboid(transactions, monkeypatch):
+    cube = cb.SalesCube.from_transactions(transactions)
+    by_region_product = cube.cuboid(("Region", "ProductName"))
+    assert set(cube.cuboids) == {cb.DIMENSIONS, ("Region", "ProductName")}
+
+    sources = []
+    roll_up = cb.SalesCube._roll_up
+    monkeypatch.setattr(cb.SalesCube, "_roll_up", staticmethod(
+        lambda source_dims, *args: sources.append(source_dims) or roll_up(source_dims, *args)
+    ))
+    regions = cube.cuboid(("Region",))
+    assert sources == [("Region", "ProductName")]
+    assert sum(cell[2] for cell in regions.values()) == len(transactions)
+    assert sum(cell[2] for cell in by_region_product.values()) == len(transactions)
+
+    # Kept: a second request is not rolled up again
+    assert cube.cuboid(("Region",)) is regions
+    assert len(sources) == 1
+
+
+def test_slices_match_filtered_aggregates(sales_file, transactions):
+    cube = cb.SalesCube.from_transactions(transactions).materialize()
+    filters = {"region": "North", "date_from": "2024-12-10", "date_to": "2024-12-25"}
+
+    exact = pl.process_file(sales_file, **filters)["aggregates"]
+    sliced = cube.aggregates(**filters)
+    assert sliced["transaction_count"] == exact["transaction_count"]
+    assert sliced["total_revenue"] == pytest.approx(exact["total_revenue"])
+    for table in ("regions", "products", "customers", "daily"):
+        assert list(sliced[table]) == list(exact[table])
+        for key, entry in sliced[table].items():
+            assert entry[0] == pytest.approx(exact[table][key][0])
+            assert entry[1:] == exact[table][key][1:]
+
+    expected = brute_force(
+        transactions, ("Region",),
+        lambda tx: tx["ProductName"] in ("Laptop", "Mouse") and tx["CustomerID"] in ("C001", "C002")
+    )
+    amount, quantity, count = cube.total(product=["Laptop", "Mouse"], customer=("C001", "C002"))
+    assert amount == pytest.approx(sum(cell[0] for cell in expected.values()))
+    assert (quantity, count) == (sum(cell[1] for cell in expected.values()), sum(cell[2] for cell in expected.values()))
+
+
+def test_merged_halves_equal_the_whole(transactions):
+    whole = cb.SalesCube.from_transactions(transactions)
+    half = len(transactions) // 2
+    merged = cb.SalesCube.from_transactions(transactions[:half]).merge(
+        cb.SalesCube.from_transactions(transactions[half:])
+    )
+    assert_same_totals(merged.query(by=("Region", "Date")), whole.query(by=("Region", "Date")))
+
+
+def test_table_and_list_cubes_agree(sales_file, transactions):
+    pytest.importorskip("numpy")
+    import column_cache as cc
+
+    table, _ = cc.build_table(sales_file)
+    columnar = cb.SalesCube.from_transactions(table)
+    assert_same_totals(columnar.query(by=("ProductName", "CustomerID")),
+                       cb.SalesCube.from_transactions(transactions).query(by=("ProductName", "CustomerID")))
+    assert len(columnar) == len(cb.SalesCube.from_transactions(transactions))
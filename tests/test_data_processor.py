@@ -0,0 +1,29 @@
+import os
+
+import pytest
+
+import data_processor as dp
+import parallel as pl
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+SALES_FILE = os.path.join(ROOT, "sales_data.txt")
+
+
+@pytest.fixture(scope="module")
+def aggregates():
+    return pl.process_file(SALES_FILE)["aggregates"]
+
+
+def test_low_performers_are_ranked_lowest_first_with_every_option(aggregates):
+    full = dp.low_performing_products(aggregates, threshold=1000)
+    assert len(full) > 3
+    assert [quantity for _, quantity, _ in full] == sorted(quantity for _, quantity, _ in full)
+
+    assert dp.low_performing_products(aggregates, threshold=1000, top_n=3) == full[:3]
+    assert dp.low_performing_products(aggregates, threshold=1000, bottom_n=3) == full[:3]
+    assert dp.low_performing_products(aggregates, threshold=1000, limit=3) == full[:3]
+    pages = dp.low_performing_products(aggregates, threshold=1000, top_n=3, page_size=2)
+    assert [row for page in pages for row in page] == full[:3]
+
+    with pytest.raises(ValueError):
+        dp.low_performing_products(aggregates, top_n=3, bottom_n=3)
@@ -0,0 +1,95 @@
+import json
+
+import pytest
+
+import data_processor as dp
+import generate_sales_data as gen
+import incremental as inc
+import parallel as pl
+
+
+def write(path, rows, newline=True):
+    text = "\n".join([gen.HEADER] + rows) + ("\n" if newline else "")
+    path.write_text(text, encoding="utf-8")
+
+
+def report(result):
+    aggregates = result["aggregates"]
+    return [
+        result["line_count"],
+        result["regions"],
+        result["min_amount"],
+        result["max_amount"],
+        result["summary"],
+        aggregates["total_revenue"],
+        dp.region_wise_sales(aggregates),
+        dp.top_selling_products(aggregates, top_n=None),
+        dp.daily_sales_trend(aggregates)
+    ]
+
+
+def assert_matches_full_run(path, state_file, expected_mode):
+    state, mode = inc.refresh(str(path), state_file=state_file)
+    assert mode == expected_mode
+    assert report(state) == report(pl.process_file(str(path)))
+    return state
+
+
+@pytest.fixture
+def rows():
+    return list(gen.iter_rows(1000, days=30, dirty_ratio=0.05))
+
+
+def test_last_line_without_newline_is_counted(rows, tmp_path):
+    path = tmp_path / "sales.txt"
+    state_file = str(tmp_path / "sales.state")
+    write(path, rows[:500], newline=False)
+
+    assert_matches_full_run(path, state_file, "full")
+    assert_matches_full_run(path, state_file, "unchanged")
+
+    # The unfinished line grows, then more rows follow: counted exactly once
+    with open(path, "a", encoding="utf-8") as file:
+        file.write("0")
+    assert_matches_full_run(path, state_file, "incremental")
+    with open(path, "a", encoding="utf-8") as file:
+        file.write("\n" + "\n".join(rows[500:]))
+    assert_matches_full_run(path, state_file, "incremental")
+
+    # The saved checkpoint stops before the line without a newline
+    with open(state_file, encoding="utf-8") as file:
+        saved = json.load(file)
+    assert saved["line_count"] == len(rows) - 1
+
+
+def test_appended_rows_are_added_to_the_saved_state(rows, tmp_path):
+    path = tmp_path / "sales.txt"
+    state_file = str(tmp_path / "sales.state")
+    write(path, rows[:600])
+    assert_matches_full_run(path, state_file, "full")
+
+    with open(path, "a", encoding="utf-8") as file:
+        file.write("\n".join(rows[600:]) + "\n")
+    assert_matches_full_run(path, state_file, "incremental")
+
+
+def test_rewritten_file_is_rebuilt(rows, tmp_path):
+    path = tmp_path / "sales.txt"
+    state_file = str(tmp_path / "sales.state")
+    write(path, rows[:600])
+    assert_matches_full_run(path, state_file, "full")
+
+    # Same length, different content: the hash of the processed part differs
+    write(path, rows[1:601])
+    assert_matches_full_run(path, state_file, "full")
+
+
+def test_other_filters_are_rebuilt(rows, tmp_path):
+    path = tmp_path / "sales.txt"
+    state_file = str(tmp_path / "sales.state")
+    write(path, rows)
+    inc.refresh(str(path), state_file=state_file)
+
+    state, mode = inc.refresh(str(path), state_file=state_file, region="North")
+    assert mode == "full"
+    assert state["summary"] == pl.process_file(str(path), region="North")["summary"]
@@ -0,0 +1,63 @@
+import pytest
+
+import data_processor as dp
+import file_handler as fh
+import generate_sales_data as gen
+import parallel as pl
+
+BLOCK_SIZE = 16 * 1024
+
+
+@pytest.fixture(scope="module")
+def sales_file(tmp_path_factory):
+    path = tmp_path_factory.mktemp("parallel") / "sales.txt"
+    path.write_text("\n".join([gen.HEADER] + list(gen.iter_rows(6000, days=60))) + "\n", encoding="utf-8")
+    return str(path)
+
+
+def views(result):
+    aggregates = result["aggregates"]
+    return [
+        result["line_count"],
+        result["regions"],
+        result["min_amount"],
+        result["max_amount"],
+        result["summary"],
+        aggregates["total_revenue"],
+        dp.region_wise_sales(aggregates),
+        dp.top_selling_products(aggregates, top_n=None),
+        dp.customer_purchase_analysis(aggregates),
+        dp.daily_sales_trend(aggregates)
+    ]
+
+
+def test_ranges_cover_the_file_on_line_boundaries(sales_file):
+    ranges = pl.plan_ranges(sales_file, BLOCK_SIZE)
+    assert len(ranges) > 4
+
+    with open(sales_file, "rb") as file:
+        data = file.read()
+    assert ranges[0][0] == data.index(b"\n") + 1
+    assert ranges[-1][1] == len(data)
+    for (_, end), (start, _) in zip(ranges, ranges[1:]):
+        assert end == start and data[end - 1:end] == b"\n"
+
+
+@pytest.mark.parametrize("filters", [{}, {"region": "North", "min_amount": 1000}])
+def test_worker_count_does_not_change_the_result(sales_file, filters):
+    results = [
+        pl.process_file(sales_file, workers=workers, block_size=BLOCK_SIZE, keep_rows=True, **filters)
+        for workers in (1, 3)
+    ]
+
+    # Same ranges merged in the same order: identical down to float sums
+    assert views(results[0]) == views(results[1])
+    assert results[0]["transactions"] == results[1]["transactions"]
+
+
+def test_rows_come_back_in_file_order(sales_file):
+    result = pl.process_file(sales_file, workers=3, block_size=BLOCK_SIZE, keep_rows=True, region="South")
+    streamed = [tx for chunk in fh.stream_transactions(sales_file, region="South") for tx in chunk]
+
+    assert result["transactions"] == streamed
+    assert result["summary"]["final_count"] == len(streamed)
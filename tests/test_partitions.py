@@ -0,0 +1,86 @@
+import os
+
+import pytest
+
+import generate_sales_data as gen
+import partitions as pt
+
+
+@pytest.fixture
+def sales_file(tmp_path):
+    path = tmp_path / "sales.txt"
+    path.write_text("\n".join([gen.HEADER] + list(gen.iter_rows(2000, days=60))) + "\n", encoding="utf-8")
+    return str(path)
+
+
+def test_ingest_refuses_a_directory_it_did_not_write(sales_file, tmp_path):
+    existing = tmp_path / "existing"
+    existing.mkdir()
+    (existing / "notes.txt").write_text("keep me")
+
+    with pytest.raises(ValueError):
+        pt.ingest(sales_file, str(existing))
+    assert (existing / "notes.txt").read_text() == "keep me"
+
+    with pytest.raises(ValueError):
+        pt.ingest(sales_file, sales_file)
+    assert os.path.isfile(sales_file)
+
+
+def test_ingest_replaces_a_previous_ingest(sales_file, tmp_path):
+    root = tmp_path / "parts"
+    first = pt.ingest(sales_file, str(root))
+    second = pt.ingest(sales_file, str(root))
+
+    assert first == second
+    assert pt.is_partitioned(str(root))
+    # No temporary or old copies are left next to it
+    assert sorted(os.listdir(tmp_path)) == ["parts", "sales.txt"]
+
+
+def test_partitioned_directory_reports_the_same_stats_as_the_flat_file(sales_file, tmp_path):
+    import main
+    import parallel as pl
+
+    # Negative amounts are parsed (then rejected): they still count for the range
+    with open(sales_file, "a", encoding="utf-8") as file:
+        file.write("T9001|2024-12-03|P101|Laptop|-2|4491|C001|North\n")
+        file.write("T9002|2024-13-45|P102|Mouse|1|20|C002|Atlantis\n")
+    root = str(tmp_path / "parts")
+    pt.ingest(sales_file, root)
+
+    for filters in ([], ["--region", "North"], ["--date-from", "2024-12-10", "--min-amount", "500"]):
+        args = main.parse_args(["--file", root] + filters)
+        scan = main.partition_scan(args, {"approx_error": None, "top_k": None})
+        flat = pl.process_file(
+            sales_file, region=args.region, min_amount=args.min_amount, date_from=args.date_from
+        )
+        assert scan["min_amount"] == flat["min_amount"] == -8982.0
+        assert (scan["max_amount"], scan["regions"]) == (flat["max_amount"], flat["regions"])
+        assert scan["summary"] == flat["summary"]
+
+
+def test_small_chunks_write_the_same_parts_without_unparsable_lines(sales_file, tmp_path):
+    with open(sales_file, "a", encoding="utf-8") as file:
+        file.write("T9001|2024-12-03|P101|Laptop|two|4491|C001|North\n")
+        file.write("T9002|2024-12-03|P101|Laptop|2|n/a|C001|North\n")
+    whole = pt.ingest(sales_file, str(tmp_path / "whole"))
+    chunked = pt.ingest(sales_file, str(tmp_path / "chunked"), chunk_size=7)
+    assert whole["partitions"] == chunked["partitions"]
+
+    for partition in whole["partitions"]:
+        parts = [
+            (tmp_path / name / partition["path"] / pt.PART_FILE).read_text(encoding="utf-8")
+            for name in ("whole", "chunked")
+        ]
+        assert parts[0] == parts[1]
+        assert parts[0].startswith(gen.HEADER + "\n")
+        assert "T9001|" not in parts[0] and "T9002|" not in parts[0]
+
+
+def test_main_refuses_a_directory_without_metadata(tmp_path):
+    import main
+
+    args = main.parse_args(["--file", str(tmp_path)])
+    with pytest.raises(ValueError, match="not a partitioned dataset"):
+        main.analyze_file(args)
@@ -0,0 +1,34 @@
+import math
+
+import records as rc
+
+
+def rows(unit_price, count=100):
+    return [(f"T{number}", "2024-12-01", "P101", "Laptop", 2, unit_price, "C001", "North")
+            for number in range(count)]
+
+
+def test_nan_prices_do_not_grow_the_symbol_table():
+    symbols = rc.SymbolTable()
+    transactions = rc.from_rows(rows(float("nan")), symbols)
+
+    assert len(symbols) == 5
+    assert all(math.isnan(tx.UnitPrice) and math.isnan(tx.amount) for tx in transactions)
+
+
+def test_prices_and_strings_are_pooled():
+    symbols = rc.SymbolTable()
+    first, second = rc.from_rows(rows(4491.0, 2), symbols)
+
+    assert first.Region is second.Region
+    assert first.amount is second.amount
+    assert len(symbols) == 7
+
+
+def test_is_compact():
+    transactions = rc.from_rows(rows(10.0, 3))
+
+    assert rc.is_compact(transactions)
+    assert not rc.is_compact([])
+    assert not rc.is_compact(tuple(transactions))
+    assert not rc.is_compact([tx.to_dict() for tx in transactions])
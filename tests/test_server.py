@@ -0,0 +1,118 @@
+import json
+import os
+import threading
+import urllib.error
+import urllib.request
+from http.server import ThreadingHTTPServer
+
+import pytest
+
+import data_processor as dp
+import generate_sales_data as gen
+import parallel as pl
+import server
+
+
+@pytest.fixture
+def sales_file(tmp_path):
+    path = tmp_path / "sales.txt"
+    path.write_text("\n".join([gen.HEADER] + list(gen.iter_rows(1500, days=30))) + "\n", encoding="utf-8")
+    return str(path)
+
+
+@pytest.fixture
+def service(sales_file):
+    return server.AnalyticsService(sales_file, reload_interval=0)
+
+
+@pytest.fixture
+def base_url(service):
+    handler = type("Handler", (server.RequestHandler,), {"service": service})
+    httpd = ThreadingHTTPServer(("127.0.0.1", 0), handler)
+    thread = threading.Thread(target=httpd.serve_forever, daemon=True)
+    thread.start()
+    yield f"http://127.0.0.1:{httpd.server_address[1]}"
+    httpd.shutdown()
+    httpd.server_close()
+
+
+def get(url):
+    try:
+        with urllib.request.urlopen(url) as response:
+            return response.status, json.loads(response.read())
+    except urllib.error.HTTPError as error:
+        return error.code, json.loads(error.read())
+
+
+def as_json(result):
+    return json.loads(json.dumps(result))
+
+
+def append_rows(filename, rows):
+    with open(filename, "a", encoding="utf-8") as file:
+        file.write("\n".join(rows) + "\n")
+    # Make sure the signature changes even on coarse mtime clocks
+    stat = os.stat(filename)
+    os.utime(filename, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10 ** 9))
+
+
+def test_endpoints_match_data_processor(sales_file, base_url):
+    aggregates = pl.process_file(sales_file)["aggregates"]
+    north = pl.process_file(sales_file, region="North", min_amount=500)["aggregates"]
+
+    assert get(base_url + "/region_wise_sales") == (200, as_json(dp.region_wise_sales(aggregates)))
+    assert get(base_url + "/top_selling_products?top_n=3") == (
+        200, as_json(dp.top_selling_products(aggregates, top_n=3))
+    )
+    assert get(base_url + "/daily_sales_trend?region=North&min_amount=500") == (
+        200, as_json(dp.daily_sales_trend(north))
+    )
+
+    status, body = get(base_url + "/status")
+    assert status == 200
+    assert body["transactions"] == pl.process_file(sales_file)["summary"]["final_count"]
+
+
+def test_bad_requests(base_url):
+    assert get(base_url + "/nope")[0] == 404
+    assert get(base_url + "/top_selling_products?top_n=abc")[0] == 400
+
+
+def test_changed_file_is_reloaded_and_cache_dropped(service, sales_file):
+    before = json.loads(service.query("region_wise_sales", {}))
+    assert service.cache
+
+    append_rows(sales_file, ["T9001|2024-12-03|P101|Laptop|2|4491|C001|North"])
+    after = json.loads(service.query("region_wise_sales", {}))
+
+    assert service.reloads == 1
+    assert after["North"]["total_sales"] == before["North"]["total_sales"] + 8982
+    assert len(service.cache) == 1
+
+
+def test_queries_are_answered_from_the_old_data_during_a_reload(service, sales_file, monkeypatch):
+    before = service.query("region_wise_sales", {})
+    started = threading.Event()
+    release = threading.Event()
+    build = server.Dataset
+
+    def slow_dataset(*args):
+        started.set()
+        release.wait(10)
+        return build(*args)
+
+    monkeypatch.setattr(server, "Dataset", slow_dataset)
+    append_rows(sales_file, ["T9001|2024-12-03|P101|Laptop|2|4491|C001|North"])
+    reload = threading.Thread(target=service.refresh)
+    reload.start()
+    assert started.wait(10)
+
+    # Not blocked by the reload in progress: cached and uncached views
+    assert service.query("region_wise_sales", {}) == before
+    assert json.loads(service.query("find_peak_sales_day", {}))
+    assert reload.is_alive()
+
+    release.set()
+    reload.join(10)
+    assert service.reloads == 1
+    assert service.query("region_wise_sales", {}) != before
@@ -0,0 +1,101 @@
+import random
+
+import pytest
+
+import data_processor as dp
+import generate_sales_data as gen
+import parallel as pl
+from sketches import HyperLogLog, TopK
+
+
+def sketch(values, error=0.02):
+    hll = HyperLogLog(error)
+    for value in values:
+        hll.add(value)
+    return hll
+
+
+@pytest.mark.parametrize("error", [0.01, 0.02, 0.05])
+@pytest.mark.parametrize("count", [10, 1000, 50000])
+def test_hyperloglog_stays_within_three_standard_errors(error, count):
+    estimate = sketch((f"C{number}" for number in range(count)), error).count()
+    assert abs(estimate - count) <= 3 * error * count + 1
+
+
+def test_hyperloglog_ignores_duplicates():
+    assert sketch(["a", "b", "a", "c", "b"] * 100).count() == 3
+
+
+@pytest.mark.parametrize("sizes", [(5, 8), (5, 20000), (20000, 5), (20000, 30000)])
+def test_hyperloglog_merge_equals_the_union(sizes):
+    # Covers every sparse / dense combination
+    left = [f"L{number}" for number in range(sizes[0])]
+    right = [f"R{number}" for number in range(sizes[1])] + left[:3]
+    merged = sketch(left).merge(sketch(right))
+    assert merged.count() == sketch(left + right).count()
+
+
+def test_hyperloglog_refuses_other_precisions():
+    with pytest.raises(ValueError):
+        HyperLogLog(0.01).merge(HyperLogLog(0.05))
+
+
+def heavy_stream(rng, keys=500, rows=20000):
+    # A few heavy keys over a long tail
+    weights = [1000.0 / (rank + 1) for rank in range(keys)]
+    return [(f"K{rank}", weights[rank] * rng.random()) for rank in rng.choices(range(keys), weights, k=rows)]
+
+
+def exact_totals(stream):
+    totals = {}
+    for key, weight in stream:
+        totals[key] = totals.get(key, 0.0) + weight
+    return totals
+
+
+def assert_within_floor(topk, totals):
+    for key, (weight, _) in topk.items():
+        assert totals[key] <= weight + 1e-6
+        assert weight <= totals[key] + topk.floor + 1e-6
+    for key, total in totals.items():
+        if total > topk.floor:
+            assert key in topk.counters
+
+
+def test_topk_overestimates_by_at_most_the_floor():
+    stream = heavy_stream(random.Random(7))
+    topk = TopK(20)
+    for key, weight in stream:
+        topk.add(key, weight)
+
+    assert len(topk) <= 40
+    assert topk.floor > 0
+    assert_within_floor(topk, exact_totals(stream))
+
+
+def test_topk_merge_keeps_the_bound():
+    stream = heavy_stream(random.Random(11))
+    parts = [TopK(20) for _ in range(4)]
+    for number, (key, weight) in enumerate(stream):
+        parts[number % 4].add(key, weight)
+
+    merged = parts[0]
+    for part in parts[1:]:
+        merged.merge(part)
+    assert len(merged) <= 40
+    assert_within_floor(merged, exact_totals(stream))
+
+
+def test_approximate_aggregates_agree_with_the_exact_ones(tmp_path):
+    path = tmp_path / "sales.txt"
+    path.write_text("\n".join([gen.HEADER] + list(gen.iter_rows(5000, days=30))) + "\n", encoding="utf-8")
+
+    exact = pl.process_file(str(path), block_size=32 * 1024)["aggregates"]
+    approx = pl.process_file(str(path), block_size=32 * 1024, approx_error=0.02, top_k=10)["aggregates"]
+
+    assert approx["total_revenue"] == exact["total_revenue"]
+    top = [name for name, _ in dp.top_selling_products(exact, top_n=3)]
+    assert [name for name, _ in dp.top_selling_products(approx, top_n=3)] == top
+    for day, (_, _, customers) in exact["daily"].items():
+        estimate = len(approx["daily"][day][2])
+        assert abs(estimate - len(customers)) <= 3 * 0.02 * len(customers) + 1
@@ -0,0 +1,99 @@
+import datetime
+
+import pytest
+
+import timeseries as ts
+
+DAILY = {
+    "2024-12-02": [100.0, 2, {"C1": None, "C2": None}],
+    "2024-12-03": [0.1, 1, {"C1": None}],
+    "2024-12-06": [250.0, 3, {"C3": None}],
+    "2024-12-09": [50.0, 1, {"C2": None}],
+    "2024-12-31": [0.2, 1, {"C4": None}],
+    "2025-01-01": [75.0, 2, {"C4": None, "C5": None}],
+    "not a date": [9.0, 1, {"C9": None}],
+}
+
+
+def naive_rolling(daily, window):
+    days = {datetime.date.fromisoformat(date): revenue for date, (revenue, _, _) in daily.items()
+            if date != "not a date"}
+    first, last = min(days), max(days)
+    result = {}
+    for offset in range((last - first).days + 1):
+        day = first + datetime.timedelta(days=offset)
+        result[day.isoformat()] = sum(
+            days.get(day - datetime.timedelta(days=back), 0.0) for back in range(window)
+        )
+    return result
+
+
+@pytest.mark.parametrize("window", [1, 3, 7, 30])
+def test_rolling_matches_a_naive_window_including_empty_days(window):
+    rolling = ts.TimeSeries(DAILY).rolling(window)
+    expected = naive_rolling(DAILY, window)
+
+    assert list(rolling) == list(expected)
+    assert rolling == pytest.approx(expected)
+
+
+def test_rolling_drops_rounding_error_once_the_window_is_empty():
+    rolling = ts.TimeSeries(DAILY).rolling(2)
+    # 100.0 + 0.1 - 100.0 - 0.1 is not exactly 0.0 without the reset
+    assert rolling["2024-12-05"] == 0.0
+    assert rolling["2024-12-20"] == 0.0
+
+
+def test_rolling_rejects_an_empty_window():
+    with pytest.raises(ValueError):
+        ts.TimeSeries(DAILY).rolling(0)
+
+
+def test_weekly_and_monthly_series():
+    series = ts.TimeSeries(DAILY)
+
+    weekly = series.series("week")
+    assert list(weekly) == ["2024-W49", "2024-W50", "2025-W01"]
+    assert weekly["2024-W49"] == {"revenue": 350.1, "transaction_count": 6, "unique_customers": 3}
+    # 2024-12-31 and 2025-01-01 share ISO week 1 of 2025
+    assert weekly["2025-W01"]["unique_customers"] == 2
+
+    monthly = series.series("month")
+    assert list(monthly) == ["2024-12", "2025-01"]
+    assert monthly["2024-12"]["transaction_count"] == 8
+    assert series.unparsed == {"not a date": [9.0, 1, {"C9": None}]}
+
+
+def test_hourly_buckets_parse_times():
+    series = ts.TimeSeries({
+        "2024-12-02 09:15": [10.0, 1, {"C1"}],
+        "2024-12-02T09:45": [5.0, 1, {"C2"}],
+        "2024-12-02 23:00": [1.0, 1, {"C1"}],
+        "2024-12-02 24:00": [1.0, 1, {"C1"}],
+    })
+    assert series.series("hour") == {
+        "2024-12-02 09:00": {"revenue": 15.0, "transaction_count": 2, "unique_customers": 2},
+        "2024-12-02 23:00": {"revenue": 1.0, "transaction_count": 1, "unique_customers": 1},
+    }
+    assert list(series.unparsed) == ["2024-12-02 24:00"]
+
+
+def test_peaks_per_granularity():
+    peaks = ts.TimeSeries(DAILY).peaks()
+    assert peaks["day"] == ("2024-12-06", 250.0, 3)
+    assert peaks["week"] == ("2024-W49", pytest.approx(350.1), 6)
+    assert peaks["month"][0] == "2024-12"
+
+
+def test_peaks_take_the_earliest_on_ties_and_none_without_revenue():
+    series = ts.TimeSeries({
+        "2024-12-05": [10.0, 1, set()],
+        "2024-12-01": [10.0, 1, set()],
+    })
+    assert series.peaks(("day",)) == {"day": ("2024-12-01", 10.0, 1)}
+    assert ts.TimeSeries({"2024-12-01": [0.0, 1, set()]}).peaks(("day",)) == {"day": (None, 0.0, 0)}
+
+
+def test_unknown_granularity():
+    with pytest.raises(ValueError):
+        ts.TimeSeries(DAILY).rollup("fortnight")
@@ -0,0 +1,210 @@
+import copy
+import datetime
+
+# Bucket granularities: name -> (key(day ordinal, hour), label(key))
+# Keys are consecutive integers, so rolling windows can step through
+# every bucket of a range, including the ones without sales.
+_granularities = {}
+
+
+def register_granularity(name, key, label):
+    """
+    Registers a bucket granularity for TimeSeries
+
+    key(day, hour) -> integer bucket; one bucket later must be key + 1
+    label(key)     -> the bucket's name in results
+    """
+    _granularities[name] = (key, label)
+
+
+def granularities():
+    return tuple(_granularities)
+
+
+def _day_label(day):
+    return datetime.date.fromordinal(day).isoformat()
+
+
+def _month_key(day, hour):
+    date = datetime.date.fromordinal(day)
+    return date.year * 12 + date.month - 1
+
+
+def _week_label(week):
+    # ISO year and week of the week's Monday
+    year, number, _ = datetime.date.fromordinal(week * 7 + 1).isocalendar()
+    return f"{year}-W{number:02d}"
+
+
+register_granularity("hour", lambda day, hour: day * 24 + hour,
+                     lambda key: f"{_day_label(key // 24)} {key % 24:02d}:00")
+register_granularity("day", lambda day, hour: day, _day_label)
+# Weeks start on Monday; day ordinal 1 (0001-01-01) is a Monday
+register_granularity("week", lambda day, hour: (day - 1) // 7, _week_label)
+register_granularity("month", _month_key, lambda key: f"{key // 12:04d}-{key % 12 + 1:02d}")
+
+
+def parse_timestamp(value):
+    """
+    (day ordinal, hour) for "YYYY-MM-DD", optionally followed by " HH..."
+    or "THH..."; None when value is not such a date
+    """
+    try:
+        day = datetime.date.fromisoformat(value[:10]).toordinal()
+    except (TypeError, ValueError):
+        return None
+
+    rest = value[10:]
+    if not rest:
+        return day, 0
+    hour = rest[1:3]
+    if rest[0] in " T" and hour.isdigit() and int(hour) < 24:
+        return day, int(hour)
+    return None
+
+
+def _distinct(groups):
+    """
+    Number of distinct customers over one or more per-date collections
+    (dicts / sets, or HyperLogLog sketches in approximate mode)
+    """
+    if len(groups) == 1:
+        return len(groups[0])
+    if hasattr(groups[0], "merge"):
+        merged = copy.deepcopy(groups[0])
+        for sketch in groups[1:]:
+            merged.merge(sketch)
+        return len(merged)
+    return len(set().union(*groups))
+
+
+class TimeSeries:
+    """
+    Revenue, transaction count and distinct customers over time
+
+    Built from an aggregates "daily" table (date -> [revenue, count,
+    customers]), so each distinct date string is parsed into a day ordinal
+    (and hour, when it has a time) once, however many rows share it.
+    Rollups to any registered granularity come from one pass over those
+    points, and several granularities can share the pass. Dates that do
+    not parse are kept apart in unparsed.
+    """
+
+    def __init__(self, daily):
+        self.points = {}    # (day, hour) -> [revenue, count, [customers, ...]]
+        self.unparsed = {}  # date string -> [revenue, count, customers]
+        self._rollups = {}
+
+        for raw, (revenue, count, customers) in daily.items():
+            point = parse_timestamp(raw)
+            if point is None:
+                self.unparsed[raw] = [revenue, count, customers]
+                continue
+            entry = self.points.get(point)
+            if entry is None:
+                self.points[point] = [revenue, count, [customers]]
+            else:
+                entry[0] += revenue
+                entry[1] += count
+                entry[2].append(customers)
+
+    def rollups(self, names):
+        """
+        Returns one {bucket key: [revenue, count, [customers, ...]]} per
+        granularity name, in chronological order; the ones not built yet
+        are built together in a single pass
+        """
+        for name in names:
+            if name not in _granularities:
+                raise ValueError(f"Unknown granularity: {name} (expected one of {', '.join(_granularities)})")
+
+        missing = [
+            (name, _granularities[name][0], {})
+            for name in dict.fromkeys(names) if name not in self._rollups
+        ]
+        if missing:
+            for (day, hour), (revenue, count, customers) in self.points.items():
+                for _, key, buckets in missing:
+                    bucket = key(day, hour)
+                    entry = buckets.get(bucket)
+                    if entry is None:
+                        entry = buckets[bucket] = [0.0, 0, []]
+                    entry[0] += revenue
+                    entry[1] += count
+                    entry[2].extend(customers)
+
+            for name, _, buckets in missing:
+                self._rollups[name] = dict(sorted(buckets.items()))
+
+        return [self._rollups[name] for name in names]
+
+    def rollup(self, name):
+        return self.rollups([name])[0]
+
+    def series(self, name="day"):
+        """
+        {label: {revenue, transaction_count, unique_customers}} per bucket
+        with sales, in chronological order
+        """
+        label = _granularities.get(name, (None, None))[1]
+        return {
+            label(key): {
+                "revenue": revenue,
+                "transaction_count": count,
+                "unique_customers": _distinct(customers)
+            }
+            for key, (revenue, count, customers) in self.rollup(name).items()
+        }
+
+    def rolling(self, window=7, name="day"):
+        """
+        {label: revenue of the window buckets ending at label} for every
+        bucket from the first to the last sale, empty buckets included
+
+        A running sum adds the newest bucket and subtracts the one leaving
+        the window, so each step is O(1) whatever the window size.
+        """
+        if window < 1:
+            raise ValueError("window must be at least 1")
+        buckets = self.rollup(name)
+        if not buckets:
+            return {}
+        label = _granularities[name][1]
+
+        result = {}
+        revenue = 0.0
+        count = 0
+        for key in range(next(iter(buckets)), next(reversed(buckets)) + 1):
+            entry = buckets.get(key)
+            if entry is not None:
+                revenue += entry[0]
+                count += entry[1]
+            leaving = buckets.get(key - window)
+            if leaving is not None:
+                revenue -= leaving[0]
+                count -= leaving[1]
+            if not count:
+                # No sales left in the window: drop accumulated rounding error
+                revenue = 0.0
+            result[label(key)] = revenue
+        return result
+
+    def peaks(self, names=("day", "week", "month")):
+        """
+        {name: (label, revenue, transaction_count)} of the highest-revenue
+        bucket per granularity (earliest on ties; (None, 0.0, 0) without
+        positive revenue); all granularities come from the same pass
+        """
+        result = {}
+        for name, buckets in zip(names, self.rollups(names)):
+            peak_key, peak_revenue, peak_count = None, 0.0, 0
+            for key, (revenue, count, _) in buckets.items():
+                if revenue > peak_revenue:
+                    peak_key, peak_revenue, peak_count = key, revenue, count
+            label = _granularities[name][1]
+            result[name] = (
+                None if peak_key is None else label(peak_key),
+                peak_revenue,
+                peak_count
+            )
+        return result
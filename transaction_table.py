@@ -0,0 +1,271 @@
+import json
+import os
+
+import numpy as np
+
+FIELDS = (
+    "TransactionID", "Date", "ProductID", "ProductName",
+    "Quantity", "UnitPrice", "CustomerID", "Region"
+)
+
+# Columns stored as integer codes into a list of distinct values
+CATEGORICAL_FIELDS = ("Date", "ProductID", "ProductName", "CustomerID", "Region")
+
+# Bump when the on-disk layout written by TransactionTable.save changes
+STORAGE_VERSION = 1
+
+
+class TransactionTable:
+    """
+    Columnar store of parsed transactions
+
+    Quantity, UnitPrice and Amount are typed NumPy arrays. Date, ProductID,
+    ProductName, CustomerID and Region are dictionary-encoded: codes[field]
+    is an int32 array indexing into categories[field], which lists the
+    distinct values in first-seen order.
+    """
+
+    # Lets data_processor / file_handler detect the columnar path
+    # without importing NumPy themselves
+    columnar = True
+
+    def __init__(self, transaction_ids, quantity, unit_price, codes, categories, amount=None):
+        self.transaction_ids = transaction_ids
+        self.quantity = quantity
+        self.unit_price = unit_price
+        if amount is None:
+            # 0 * inf is NaN, as in Python; no need to warn about it
+            with np.errstate(invalid="ignore"):
+                amount = quantity * unit_price
+        self.amount = amount
+        self.codes = codes
+        self.categories = categories
+
+    @classmethod
+    def from_rows(cls, rows):
+        """
+        Builds a table from tuples in FIELDS order
+        """
+        lookups = {field: {} for field in CATEGORICAL_FIELDS}
+        codes = {field: [] for field in CATEGORICAL_FIELDS}
+        transaction_ids = []
+        quantity = []
+        unit_price = []
+
+        encoders = [
+            (lookups[field], codes[field].append, FIELDS.index(field))
+            for field in CATEGORICAL_FIELDS
+        ]
+
+        for row in rows:
+            transaction_ids.append(row[0])
+            quantity.append(row[4])
+            unit_price.append(row[5])
+            for lookup, append, position in encoders:
+                value = row[position]
+                code = lookup.get(value)
+                if code is None:
+                    code = lookup[value] = len(lookup)
+                append(code)
+
+        return cls(
+            np.array(transaction_ids, dtype=str),
+            np.array(quantity, dtype=np.int64),
+            np.array(unit_price, dtype=np.float64),
+            {field: np.array(codes[field], dtype=np.int32) for field in CATEGORICAL_FIELDS},
+            {field: list(lookups[field]) for field in CATEGORICAL_FIELDS}
+        )
+
+    @classmethod
+    def concat(cls, tables):
+        """
+        Stacks tables in order; categories are merged in first-seen order
+        """
+        tables = list(tables)
+        if not tables:
+            return cls.from_rows([])
+        if len(tables) == 1:
+            return tables[0]
+
+        codes = {}
+        categories = {}
+        for field in CATEGORICAL_FIELDS:
+            lookup = {}
+            parts = []
+            for table in tables:
+                remap = np.array(
+                    [lookup.setdefault(value, len(lookup)) for value in table.categories[field]],
+                    dtype=np.int32
+                )
+                parts.append(remap[table.codes[field]] if len(remap) else table.codes[field])
+            codes[field] = np.concatenate(parts)
+            categories[field] = list(lookup)
+
+        return cls(
+            np.concatenate([table.transaction_ids for table in tables]),
+            np.concatenate([table.quantity for table in tables]),
+            np.concatenate([table.unit_price for table in tables]),
+            codes,
+            categories,
+            np.concatenate([table.amount for table in tables])
+        )
+
+    @classmethod
+    def from_records(cls, records):
+        """
+        Builds a table from transaction dictionaries
+        """
+        return cls.from_rows(
+            tuple(tx[field] for field in FIELDS) for tx in records
+        )
+
+    def __len__(self):
+        return len(self.quantity)
+
+    def __iter__(self):
+        return self.iter_records()
+
+    def take(self, selector):
+        """
+        Returns a new table with the rows selected by a boolean mask or
+        index array. Category lists are shared with this table.
+        """
+        return TransactionTable(
+            self.transaction_ids[selector],
+            self.quantity[selector],
+            self.unit_price[selector],
+            {field: codes[selector] for field, codes in self.codes.items()},
+            self.categories,
+            self.amount[selector]
+        )
+
+    def column(self, field):
+        """
+        Returns the decoded values of a column as a list
+        """
+        if field == "TransactionID":
+            return self.transaction_ids.tolist()
+        if field == "Quantity":
+            return self.quantity.tolist()
+        if field == "UnitPrice":
+            return self.unit_price.tolist()
+        if field == "Amount":
+            return self.amount.tolist()
+        categories = self.categories[field]
+        return [categories[code] for code in self.codes[field].tolist()]
+
+    def category_mask(self, field, predicate):
+        """
+        Evaluates predicate once per distinct value and returns a row mask
+        """
+        lookup = np.array(
+            [bool(predicate(value)) for value in self.categories[field]],
+            dtype=bool
+        )
+        if not len(lookup):
+            return np.zeros(len(self), dtype=bool)
+        return lookup[self.codes[field]]
+
+    def total_amount(self, start=0.0):
+        """
+        Sums Amount row by row (same rounding as a Python loop)
+        """
+        if not len(self):
+            return start
+        return float(np.cumsum(np.concatenate(([start], self.amount)))[-1])
+
+    def first_seen(self, codes):
+        """
+        Returns the distinct codes in order of first appearance
+        """
+        unique, first_index = np.unique(codes, return_index=True)
+        return unique[np.argsort(first_index, kind="stable")]
+
+    def group_by(self, field, weights=None):
+        """
+        Vectorized group-by on a categorical column
+
+        Returns (codes, sums, counts) with codes in first-seen order, where
+        sums holds the per-group sum of weights (None when not given).
+        Sums are accumulated row by row, in row order.
+        """
+        codes = self.codes[field]
+        size = len(self.categories[field])
+        order = self.first_seen(codes)
+        counts = np.bincount(codes, minlength=size)[order]
+        sums = None
+        if weights is not None:
+            sums = np.bincount(codes, weights=weights, minlength=size)[order]
+        return order, sums, counts
+
+    def distinct_pairs(self, field, other):
+        """
+        Returns the distinct (field, other) code pairs in first-seen order
+        """
+        width = max(len(self.categories[other]), 1)
+        keys = self.codes[field].astype(np.int64) * width + self.codes[other]
+        keys = self.first_seen(keys)
+        return zip((keys // width).tolist(), (keys % width).tolist())
+
+    def iter_records(self):
+        """
+        Compatibility adapter: yields one dictionary per row
+        """
+        columns = [self.column(field) for field in FIELDS]
+        for values in zip(*columns):
+            yield dict(zip(FIELDS, values))
+
+    def to_records(self):
+        return list(self.iter_records())
+
+    def save(self, directory, meta=None):
+        """
+        Writes the table as one .npy file per column plus table.json
+        (categories and caller-supplied meta) into directory
+        """
+        os.makedirs(directory, exist_ok=True)
+        arrays = {
+            "transaction_ids": self.transaction_ids,
+            "quantity": self.quantity,
+            "unit_price": self.unit_price,
+            "amount": self.amount
+        }
+        for field, codes in self.codes.items():
+            arrays["codes_" + field] = codes
+
+        for name, array in arrays.items():
+            np.save(os.path.join(directory, name + ".npy"), np.ascontiguousarray(array))
+
+        with open(os.path.join(directory, "table.json"), "w", encoding="utf-8") as file:
+            json.dump({
+                "storage_version": STORAGE_VERSION,
+                "categories": self.categories,
+                "meta": meta or {}
+            }, file)
+
+    @classmethod
+    def load(cls, directory, mmap=True):
+        """
+        Loads a table written by save; with mmap=True the column arrays
+        are memory-mapped read-only instead of read into memory
+        Returns (table, meta), or (None, None) if the layout is outdated
+        """
+        with open(os.path.join(directory, "table.json"), "r", encoding="utf-8") as file:
+            info = json.load(file)
+        if info.get("storage_version") != STORAGE_VERSION:
+            return None, None
+
+        mmap_mode = "r" if mmap else None
+
+        def array(name):
+            return np.load(os.path.join(directory, name + ".npy"), mmap_mode=mmap_mode)
+
+        table = cls(
+            array("transaction_ids"),
+            array("quantity"),
+            array("unit_price"),
+            {field: array("codes_" + field) for field in CATEGORICAL_FIELDS},
+            info["categories"],
+            array("amount")
+        )
+        return table, info["meta"]